@@ -0,0 +1,111 @@
+"""
+In-process admission control.
+
+``RateLimiter`` keeps a token bucket per key (a user or a client IP): each
+bucket refills at ``rate`` tokens per second up to ``burst``, and a request
+is admitted when every bucket it is charged to holds a token. Buckets are
+updated in O(1) and kept in LRU order, so only the ``max_buckets`` most
+recently used are tracked; an evicted bucket had been idle longest and
+starts full if it comes back.
+
+``ConcurrencyLimit`` caps how many expensive requests run at once.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+
+class RateLimiter:
+    """Token buckets per key with LRU expiry of idle buckets."""
+
+    def __init__(self, rate: float, burst: float, max_buckets: int = 10000):
+        """
+        Args:
+            rate: Tokens added per second to every bucket
+            burst: Bucket capacity (requests allowed in a burst)
+            max_buckets: Maximum number of buckets tracked
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_buckets = max_buckets
+
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _bucket(self, key: str, now: float) -> List[float]:
+        """Refilled ``[tokens, updated_at]`` bucket for ``key``, marked most recently used."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def acquire(self, *keys: str) -> float:
+        """
+        Take one token from the bucket of every key, or from none of them.
+
+        Returns:
+            0.0 if admitted, otherwise seconds until all buckets hold a token
+        """
+        return self.charge({key: 1.0 for key in keys})
+
+    def charge(self, costs: Dict[str, float]) -> float:
+        """
+        Take ``costs[key]`` tokens from the bucket of every key, or from none of them.
+
+        Returns:
+            0.0 if admitted, ``inf`` if a cost exceeds ``burst`` (it can never
+            be admitted), otherwise seconds until all buckets hold their cost
+        """
+        if any(cost > self.burst for cost in costs.values()):
+            return math.inf
+        now = time.monotonic()
+        with self._lock:
+            charges = [(self._bucket(key, now), cost) for key, cost in costs.items()]
+            shortfall = max((cost - bucket[0] for bucket, cost in charges), default=0.0)
+            if shortfall > 0:
+                return shortfall / self.rate
+            for bucket, cost in charges:
+                bucket[0] -= cost
+            return 0.0
+
+
+class ConcurrencyLimit:
+    """Non-blocking cap on concurrently running requests."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def try_acquire(self) -> bool:
+        return self._slots.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._slots.release()
+
+
+class AdmissionCounters:
+    """Thread-safe counters of rejected requests by reason."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def increment(self, reason: str) -> None:
+        with self._lock:
+            self._counts[reason] = self._counts.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
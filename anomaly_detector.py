@@ -0,0 +1,180 @@
+"""
+Online detection of sudden sentiment swings.
+
+The kernel measures volatility as the standard deviation of its last
+``pattern_window`` inputs. The detector keeps the exponentially weighted
+counterpart, an EWMA mean and variance, for the whole stream and for every
+user, updated in O(1) per pulse. A pulse is flagged when its z-score against
+the user's or the global statistics, taken before the pulse is applied,
+exceeds ``threshold``.
+
+Per-user statistics are kept in LRU order and only the ``max_users`` most
+recently active users are tracked; an evicted user starts over with a new
+warm-up. Flagged pulses go to a bounded queue that readers page through by
+anomaly ``id``, optionally long-polling for new ones.
+"""
+
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _update(stats: List[float], value: float, alpha: float) -> None:
+    """Fold ``value`` into ``[mean, variance, count]`` with smoothing factor ``alpha``."""
+    if stats[2] == 0:
+        stats[0] = value
+    else:
+        diff = value - stats[0]
+        increment = alpha * diff
+        stats[0] += increment
+        stats[1] = (1 - alpha) * (stats[1] + diff * increment)
+    stats[2] += 1
+
+
+class AnomalyDetector:
+    """Global and per-user EWMA statistics with a bounded queue of flagged pulses."""
+
+    def __init__(self, alpha: float = 0.1, threshold: float = 3.0, warmup: int = 10, min_std: float = 0.05,
+                 max_users: int = 10000, max_anomalies: int = 1000):
+        """
+        Args:
+            alpha: EWMA smoothing factor; higher values forget faster
+            threshold: Absolute z-score above which a pulse is flagged
+            warmup: Pulses seen before a user's (or the global) statistics are used
+            min_std: Lower bound of the standard deviation, so a user who always
+                sends the same sentiment is not flagged for every small change
+            max_users: Maximum number of users with statistics
+            max_anomalies: Maximum number of flagged pulses kept
+        """
+        self.alpha = alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_std = min_std
+        self.max_users = max_users
+        self.detected = 0
+
+        self._lock = threading.Lock()
+        self._flagged = threading.Condition(self._lock)
+        self._global = [0.0, 0.0, 0]
+        self._users: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._anomalies = deque(maxlen=max_anomalies)
+
+    def __len__(self) -> int:
+        """Number of users with statistics."""
+        return len(self._users)
+
+    def _z_score(self, stats: List[float], value: float) -> Optional[float]:
+        if stats[2] < self.warmup:
+            return None
+        return (value - stats[0]) / max(math.sqrt(stats[1]), self.min_std)
+
+    def _user_stats(self, user: str) -> List[float]:
+        """Statistics of ``user``, marked most recently used."""
+        stats = self._users.get(user)
+        if stats is None:
+            stats = self._users[user] = [0.0, 0.0, 0]
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user)
+        return stats
+
+    def observe(self, seq: int, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Score and apply one pulse entry; returns its anomaly record if it was flagged."""
+        flagged = self.observe_many(seq, [entry])
+        return flagged[0] if flagged else None
+
+    def observe_many(self, first_seq: int, entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Score and apply consecutive pulse entries, the first having sequence number ``first_seq``.
+
+        Returns:
+            Anomaly records of the flagged entries
+        """
+        flagged = []
+        with self._lock:
+            for seq, entry in enumerate(entries, first_seq):
+                sentiment = float(entry["sentiment"])
+                user = str(entry.get("user"))
+                user_stats = self._user_stats(user)
+                user_z = self._z_score(user_stats, sentiment)
+                global_z = self._z_score(self._global, sentiment)
+
+                if (user_z is not None and abs(user_z) > self.threshold) or \
+                        (global_z is not None and abs(global_z) > self.threshold):
+                    self.detected += 1
+                    flagged.append({
+                        "id": self.detected,
+                        "seq": seq,
+                        "timestamp": entry.get("timestamp"),
+                        "user": user,
+                        "event": entry.get("event"),
+                        "sentiment": sentiment,
+                        "user_z": None if user_z is None else round(user_z, 3),
+                        "user_mean": round(user_stats[0], 4),
+                        "global_z": None if global_z is None else round(global_z, 3),
+                        "global_mean": round(self._global[0], 4)
+                    })
+
+                _update(user_stats, sentiment, self.alpha)
+                _update(self._global, sentiment, self.alpha)
+
+            if flagged:
+                self._anomalies.extend(flagged)
+                self._flagged.notify_all()
+        return flagged
+
+    def since(self, after: int = 0, limit: int = 100, user: Optional[str] = None,
+              wait: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Queued anomalies with ``id`` greater than ``after``, oldest first.
+
+        Args:
+            after: Last anomaly id already seen
+            limit: Maximum number of anomalies to return
+            user: Only anomalies of this user
+            wait: Seconds to wait for a new anomaly if none is queued yet
+        """
+        with self._lock:
+            if wait > 0:
+                self._flagged.wait_for(lambda: self.detected > after, wait)
+            matches = []
+            # Ids are consecutive, so the first unseen one is found by offset
+            start = max(0, len(self._anomalies) - (self.detected - after))
+            for i in range(start, len(self._anomalies)):
+                anomaly = self._anomalies[i]
+                if user is None or anomaly["user"] == user:
+                    matches.append(anomaly)
+                    if len(matches) >= limit:
+                        break
+            return matches
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "detected": self.detected,
+                "queued": len(self._anomalies),
+                "tracked_users": len(self._users),
+                "global_mean": round(self._global[0], 4),
+                "global_std": round(math.sqrt(self._global[1]), 4)
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "detected": self.detected,
+                "global": list(self._global),
+                "users": [[user, *stats] for user, stats in self._users.items()],
+                "anomalies": list(self._anomalies)
+            }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        with self._lock:
+            self.detected = snapshot["detected"]
+            self._global = list(snapshot["global"])
+            # Least recently used first, so the newest users survive a smaller max_users
+            users = snapshot["users"][-self.max_users:]
+            self._users = OrderedDict((user, [mean, variance, count]) for user, mean, variance, count in users)
+            self._anomalies.clear()
+            self._anomalies.extend(snapshot["anomalies"])
@@ -1,11 +1,47 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from datetime import datetime
-import json, os
+import functools, gc, hashlib, json, math, os, threading, time
 
+from admission import AdmissionCounters, ConcurrencyLimit, RateLimiter
+from anomaly_detector import AnomalyDetector
+from coalescing import SingleFlight
+from compression import CompressionCache, negotiate, stream_compress
+from dedup_index import DedupIndex
 from euystacio import Euystacio
+from event_index import EventIndex
+from heavy_hitters import HeavyHitters
+from memory_profile import AllocationTracer, measure, object_counts, rss_bytes
+from pattern_index import PatternIndex
+from pulse_archive import PulseArchive, format_timestamp, parse_timestamp
+from pulse_listener import PulseListener
+from pulse_store import PulseStore, merge_bucket_totals
+from replication import FEED_BATCH, FEED_WAIT, ROLES, Follower
+from retention import Compactor, RetentionState
+from serialization import MSGPACK_MIMETYPES, get_serializer, msgpack_loads
+from sharded_store import ShardedPulseStore
+from validation import PulseValidationError, validate_pulse
+
+serializer = get_serializer()
+
+
+class SerializerJSONProvider(JSONProvider):
+    """Route jsonify and request JSON parsing through the pluggable serializer."""
+
+    def dumps(self, obj, **kwargs):
+        return serializer.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return serializer.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(serializer.dumps(obj), mimetype="application/json")
+
 
 app = Flask(__name__)
+app.json = SerializerJSONProvider(app)
 CORS(app)  # Enable CORS for frontend-backend communication
 
 # Initialize enhanced Euystacio with custom configuration
@@ -15,103 +51,804 @@ euystacio_config = {
     'adaptation_factor': 0.08,
     'volatility_threshold': 0.25
 }
-euystacio = Euystacio(config=euystacio_config)
+PATTERN_INDEX_FILE = os.environ.get("PATTERN_INDEX_FILE", "pattern_index.jsonl")
+pattern_index = PatternIndex(PATTERN_INDEX_FILE, serializer=serializer, load=False)
+euystacio = Euystacio(config=euystacio_config, on_pattern=pattern_index.add)
+
+# Read endpoints serve the kernel status from an immutable view that is
+# republished under the ingest lock after every update. Rebinding the
+# global is atomic, so readers take no lock and never wait for /pulse.
+kernel_view = euystacio.read_view()
+
+# The kernel is checkpointed every KERNEL_SNAPSHOT_INTERVAL pulses (0
+# disables) and restored at startup, replaying only the pulses logged since
+KERNEL_SNAPSHOT_FILE = os.environ.get("KERNEL_SNAPSHOT_FILE", "kernel_snapshot.json")
+KERNEL_SNAPSHOT_INTERVAL = int(os.environ.get("KERNEL_SNAPSHOT_INTERVAL", "100"))
+
+# EUYSTACIO_STARTUP=background (default) answers GET / immediately and loads
+# the log, indexes and kernel snapshot on a background thread; other requests
+# wait up to STARTUP_WAIT seconds for it, then get 503 with Retry-After.
+# EUYSTACIO_STARTUP=eager loads everything before the app is served.
+STARTUP_MODE = os.environ.get("EUYSTACIO_STARTUP", "background")
+if STARTUP_MODE not in ("background", "eager"):
+    raise ValueError("EUYSTACIO_STARTUP must be background or eager")
+STARTUP_WAIT = float(os.environ.get("STARTUP_WAIT", "2"))
+STARTUP_EXEMPT_ENDPOINTS = {"api_info", None}
+startup_complete = threading.Event()
+startup_error = None
+startup_seconds = None
+
+# Upper bound on candidates per /kernel/simulate request
+MAX_SIMULATE_CANDIDATES = 10000
+
+# Columnar archive of pulses expired from the log (see RETENTION_ARCHIVE)
+PULSE_ARCHIVE_DIR = os.environ.get("PULSE_ARCHIVE_DIR", "pulse_archive")
+PULSE_ARCHIVE_AFTER_DAYS = float(os.environ.get("PULSE_ARCHIVE_AFTER_DAYS", "0"))
+pulse_archive = PulseArchive(PULSE_ARCHIVE_DIR)  # opened lazily; the store offset is set by warm_up()
+
+# PULSE_SHARDS > 1 partitions the log by user into that many shard files.
+# Every PULSE_SEGMENT_SIZE entries the live file is sealed into a compressed
+# segment (PULSE_SEGMENT_CODEC: gzip, or zstd when installed; 0 disables)
+PULSE_LOG_FILE = os.environ.get("PULSE_LOG_FILE", "pulse_log.json")
+PULSE_SHARDS = int(os.environ.get("PULSE_SHARDS", "1"))
+PULSE_SEGMENT_SIZE = int(os.environ.get("PULSE_SEGMENT_SIZE", "10000"))
+PULSE_SEGMENT_CODEC = os.environ.get("PULSE_SEGMENT_CODEC") or None
+store_options = {"segment_size": PULSE_SEGMENT_SIZE, "codec": PULSE_SEGMENT_CODEC}
+if PULSE_SHARDS > 1:
+    pulse_store = ShardedPulseStore(PULSE_LOG_FILE, PULSE_SHARDS, serializer=serializer, **store_options)
+else:
+    pulse_store = PulseStore(PULSE_LOG_FILE, serializer=serializer, **store_options)
+
+# Retention: the log keeps pulses for RETENTION_DAYS days and at most
+# RETENTION_MAX_ENTRIES pulses (0 disables either limit). Expired pulses are
+# moved to the archive (RETENTION_ARCHIVE=1) or rolled up into
+# ROLLUP_BUCKET_SECONDS totals and dropped, by a background compactor every
+# COMPACTION_INTERVAL seconds. PULSE_ARCHIVE_AFTER_DAYS=N is kept as a
+# shorthand for RETENTION_DAYS=N RETENTION_ARCHIVE=1
+RETENTION_DAYS = float(os.environ.get("RETENTION_DAYS", str(PULSE_ARCHIVE_AFTER_DAYS)))
+RETENTION_MAX_ENTRIES = int(os.environ.get("RETENTION_MAX_ENTRIES", "0"))
+RETENTION_ARCHIVE = os.environ.get("RETENTION_ARCHIVE", "1" if PULSE_ARCHIVE_AFTER_DAYS > 0 else "0") == "1"
+ROLLUP_BUCKET_SECONDS = float(os.environ.get("ROLLUP_BUCKET_SECONDS", "3600"))
+COMPACTION_INTERVAL = float(os.environ.get("COMPACTION_INTERVAL", "3600"))
+RETENTION_FILE = os.environ.get("RETENTION_FILE", os.path.splitext(PULSE_LOG_FILE)[0] + ".retention.json")
+retention_state = RetentionState(RETENTION_FILE, bucket_seconds=ROLLUP_BUCKET_SECONDS, serializer=serializer)
+compactor = Compactor(pulse_store, pulse_archive, retention_state, max_age_days=RETENTION_DAYS,
+                      max_entries=RETENTION_MAX_ENTRIES, use_archive=RETENTION_ARCHIVE, interval=COMPACTION_INTERVAL,
+                      on_trim=lambda expired: prune_indexes(expired))
+
+# Responses of at least RESPONSE_COMPRESSION_MIN_BYTES are compressed per
+# Accept-Encoding; compressed bodies of repeated payloads are cached
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_COMPRESSION_CACHE_BYTES = int(os.environ.get("RESPONSE_COMPRESSION_CACHE_BYTES", str(8 * 1024 * 1024)))
+compression_cache = CompressionCache(RESPONSE_COMPRESSION_CACHE_BYTES)
+
+# Log appends and kernel updates share one lock so the kernel always sees
+# pulses in log order, which is the order replicas apply them in
+ingest_lock = threading.RLock()
+
+# Responses of recent submissions by Idempotency-Key (or pulse "id"), so
+# client retries are answered without appending duplicates
+IDEMPOTENCY_FILE = os.environ.get("IDEMPOTENCY_FILE", os.path.splitext(PULSE_LOG_FILE)[0] + ".dedup.jsonl")
+IDEMPOTENCY_WINDOW = float(os.environ.get("IDEMPOTENCY_WINDOW", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "10000"))
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+dedup_index = DedupIndex(IDEMPOTENCY_FILE, window=IDEMPOTENCY_WINDOW, max_keys=IDEMPOTENCY_MAX_KEYS,
+                         serializer=serializer, load=False)
+
+# Inverted index of event words for /log?q=, persisted next to the pulse log
+EVENT_INDEX_FILE = os.environ.get("EVENT_INDEX_FILE", os.path.splitext(PULSE_LOG_FILE)[0] + ".events.jsonl")
+event_index = EventIndex(EVENT_INDEX_FILE, serializer=serializer, load=False)
+
+# Top users, events and roles for /top: Space-Saving summaries of at most
+# TOP_K_CAPACITY values per dimension, over the whole history and over the
+# last TOP_K_WINDOW seconds (in TOP_K_PANES rotating panes), saved with the
+# kernel snapshot
+TOP_K_CAPACITY = int(os.environ.get("TOP_K_CAPACITY", "1000"))
+TOP_K_WINDOW = float(os.environ.get("TOP_K_WINDOW", "3600"))
+TOP_K_PANES = int(os.environ.get("TOP_K_PANES", "6"))
+heavy_hitters = HeavyHitters(TOP_K_CAPACITY, window=TOP_K_WINDOW, panes=TOP_K_PANES)
+
+# Sentiment swings: pulses more than ANOMALY_THRESHOLD standard deviations
+# from the EWMA mean (smoothing ANOMALY_ALPHA) of their user or of all pulses
+# are queued for /anomalies; statistics of at most ANOMALY_MAX_USERS users
+# and the last ANOMALY_QUEUE_SIZE anomalies are kept, saved with the kernel snapshot
+ANOMALY_ALPHA = float(os.environ.get("ANOMALY_ALPHA", "0.1"))
+ANOMALY_THRESHOLD = float(os.environ.get("ANOMALY_THRESHOLD", "3"))
+ANOMALY_WARMUP = int(os.environ.get("ANOMALY_WARMUP", "10"))
+ANOMALY_MIN_STD = float(os.environ.get("ANOMALY_MIN_STD", "0.05"))
+ANOMALY_MAX_USERS = int(os.environ.get("ANOMALY_MAX_USERS", "10000"))
+ANOMALY_QUEUE_SIZE = int(os.environ.get("ANOMALY_QUEUE_SIZE", "1000"))
+ANOMALY_WAIT = 30.0
+anomaly_detector = AnomalyDetector(alpha=ANOMALY_ALPHA, threshold=ANOMALY_THRESHOLD, warmup=ANOMALY_WARMUP,
+                                   min_std=ANOMALY_MIN_STD, max_users=ANOMALY_MAX_USERS,
+                                   max_anomalies=ANOMALY_QUEUE_SIZE)
+
+# Admission control: token buckets per user and per client IP on POST /pulse
+# (rates in pulses per second, 0 disables) and a cap on concurrent
+# full-history reads (/log without limit, /export)
+RATE_LIMIT_PER_USER = float(os.environ.get("RATE_LIMIT_PER_USER", "0"))
+RATE_LIMIT_PER_IP = float(os.environ.get("RATE_LIMIT_PER_IP", "0"))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MAX_BUCKETS = int(os.environ.get("RATE_LIMIT_MAX_BUCKETS", "10000"))
+RATE_LIMIT_TRUST_PROXY = os.environ.get("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+EXPENSIVE_CONCURRENCY = int(os.environ.get("EXPENSIVE_CONCURRENCY", "4"))
+user_limiter = RateLimiter(RATE_LIMIT_PER_USER, RATE_LIMIT_BURST, RATE_LIMIT_MAX_BUCKETS) if RATE_LIMIT_PER_USER > 0 else None
+ip_limiter = RateLimiter(RATE_LIMIT_PER_IP, RATE_LIMIT_BURST, RATE_LIMIT_MAX_BUCKETS) if RATE_LIMIT_PER_IP > 0 else None
+expensive_limit = ConcurrencyLimit(EXPENSIVE_CONCURRENCY) if EXPENSIVE_CONCURRENCY > 0 else None
+admission_counters = AdmissionCounters()
+
+# Concurrent identical read requests (same route, arguments and state
+# version) share one computation and its serialized response
+REQUEST_COALESCING = os.environ.get("REQUEST_COALESCING", "1") == "1"
+single_flight = SingleFlight()
+
+# POST /pulse/batch accepts at most MAX_BATCH_PULSES pulses per request
+MAX_BATCH_PULSES = int(os.environ.get("MAX_BATCH_PULSES", "10000"))
+
+# PULSE_LISTENER=tcp://HOST:PORT or unix:///PATH also accepts pulses as
+# newline-delimited JSON or length-prefixed MessagePack frames (see pulse_listener.py)
+PULSE_LISTENER = os.environ.get("PULSE_LISTENER") or None
+PULSE_LISTENER_FRAMING = os.environ.get("PULSE_LISTENER_FRAMING", "line")
+PULSE_LISTENER_BATCH = int(os.environ.get("PULSE_LISTENER_BATCH", "1000"))
+pulse_listener = None
+
+# DEBUG_MEMORY=1 serves /debug/memory: sizes of the kernel, store, indexes
+# and trackers, the most common objects and, between POST /debug/memory/mark
+# and the report, the allocations traced with DEBUG_MEMORY_FRAMES stack frames
+DEBUG_MEMORY = os.environ.get("DEBUG_MEMORY", "0") == "1"
+DEBUG_MEMORY_FRAMES = int(os.environ.get("DEBUG_MEMORY_FRAMES", "1"))
+allocation_tracer = AllocationTracer(DEBUG_MEMORY_FRAMES)
+
+# Replication: standalone (default), leader, or follower of EUYSTACIO_LEADER_URL
+REPLICATION_ROLE = os.environ.get("EUYSTACIO_ROLE", "standalone")
+if REPLICATION_ROLE not in ROLES:
+    raise ValueError(f"EUYSTACIO_ROLE must be one of {', '.join(ROLES)}")
+follower = None
+
+
+def ingest(entry, compact=False):
+    """Append a pulse entry to the log and apply it to the kernel, in log order."""
+    with ingest_lock:
+        seq = pulse_store.append(entry)
+        event_index.add(seq, entry["event"])
+        track(seq, [entry])
+        kernel_response = euystacio.receive_input(entry["event"], entry["sentiment"], compact=compact)
+        publish_kernel_view()
+        if KERNEL_SNAPSHOT_INTERVAL > 0 and euystacio.total_inputs % KERNEL_SNAPSHOT_INTERVAL == 0:
+            save_kernel_snapshot(seq + 1)
+    return seq, kernel_response
+
 
-PULSE_LOG_FILE = "pulse_log.json"
+def ingest_batch(entries):
+    """Append pulse entries to the log with one write and apply them to the kernel, in log order; returns the first seq."""
+    with ingest_lock:
+        first = pulse_store.extend(entries)
+        event_index.add_many(first, [entry["event"] for entry in entries])
+        track(first, entries)
+        applied = euystacio.total_inputs
+        # Exact, so the kernel matches followers, which apply the feed pulse by pulse
+        euystacio.replay([entry["event"] for entry in entries], [entry["sentiment"] for entry in entries],
+                         exact=True)
+        publish_kernel_view()
+        if KERNEL_SNAPSHOT_INTERVAL > 0 and \
+                euystacio.total_inputs // KERNEL_SNAPSHOT_INTERVAL > applied // KERNEL_SNAPSHOT_INTERVAL:
+            save_kernel_snapshot(first + len(entries))
+    return first
 
 
-def load_pulse_log():
-    """Load pulse log from file."""
-    if os.path.exists(PULSE_LOG_FILE):
-        with open(PULSE_LOG_FILE, "r") as f:
-            return json.load(f)
-    return []
+def track(first_seq, entries):
+    """Feed consecutive logged pulses to the top-K summaries and the anomaly detector."""
+    heavy_hitters.add_many(entries)
+    anomaly_detector.observe_many(first_seq, entries)
+
+
+def memory_report(sample=1000, top=20):
+    """
+    Memory use per structure, most common objects and traced allocations since the last mark.
+
+    Args:
+        sample: Items walked per container when sizing (None: walk everything)
+        top: Number of object types and allocating source lines to list
+    """
+    structures = {
+        "kernel": euystacio,
+        "kernel.memory": euystacio.memory,
+        "kernel.summary": euystacio._summary.blocks,
+        "kernel.pattern_memory": euystacio.pattern_memory,
+        "kernel.volatility_history": euystacio.volatility_history,
+        "kernel.prediction_errors": euystacio.prediction_errors,
+        "kernel_view": kernel_view,
+        "pulse_store": pulse_store,
+        "event_index": event_index,
+        "pattern_index": pattern_index,
+        "dedup_index": dedup_index,
+        "heavy_hitters": heavy_hitters,
+        "anomaly_detector": anomaly_detector,
+        "retention_state": retention_state,
+        "compression_cache": compression_cache,
+        "single_flight": single_flight
+    }
+    if user_limiter is not None:
+        structures["user_limiter"] = user_limiter
+    if ip_limiter is not None:
+        structures["ip_limiter"] = ip_limiter
+
+    # Ingestion pauses while the kernel, store and indexes are walked
+    with ingest_lock:
+        sizes = measure(structures, sample)
+        memory_entries = len(euystacio.memory)
+
+    return {
+        "rss_bytes": rss_bytes(),
+        "sampled": sample,
+        "kernel": {
+            "memory_entries": memory_entries,
+            "bytes_per_memory_entry": sizes["kernel.memory"].get("bytes_per_item"),
+            "summary_blocks": len(euystacio._summary.blocks)
+        },
+        "structures": sizes,
+        "object_counts": object_counts(top),
+        "gc": {"counts": gc.get_count(), "garbage": len(gc.garbage)},
+        "allocations": allocation_tracer.diff(top)
+    }
+
+
+def prune_indexes(expired):
+    """Drop the search postings and detected patterns of pulses the compactor removed from the log."""
+    event_index.prune(pulse_store.offset)
+    pattern_index.prune(max(parse_timestamp(entry["timestamp"]) for entry in expired))
+
+
+def submit_pulses(items):
+    """
+    Validate submitted pulses and ingest the valid ones as one batch.
+
+    Returns:
+        One result per item, in order: ``{"seq": N}`` or ``{"error": "..."}``
+    """
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    results = []
+    entries = []
+    for item in items:
+        try:
+            if not isinstance(item, dict):
+                raise PulseValidationError("Pulse must be an object")
+            entries.append({"timestamp": timestamp, **validate_pulse(item)})
+            results.append(None)
+        except PulseValidationError as e:
+            results.append({"error": str(e)})
+
+    if entries:
+        seq = ingest_batch(entries)
+        for i, result in enumerate(results):
+            if result is None:
+                results[i] = {"seq": seq}
+                seq += 1
+    return results
+
+
+def admit_listener_pulses(pulses, peer):
+    """
+    Charge every pulse received by the socket listener to its user's and peer's token buckets.
+
+    Returns:
+        One entry per pulse: None if admitted, otherwise its error reply
+    """
+    verdicts = []
+    for pulse in pulses:
+        user = str(pulse.get("user", "anonymous")) if isinstance(pulse, dict) else "None"
+        for reason, limiter, key in (("user_rate", user_limiter, user), ("ip_rate", ip_limiter, peer)):
+            if limiter is None:
+                continue
+            retry_after = limiter.acquire(key)
+            if retry_after:
+                admission_counters.increment(reason)
+                verdicts.append({"error": "Too many requests", "reason": reason,
+                                 "retry_after": round(retry_after, 3)})
+                break
+        else:
+            verdicts.append(None)
+    return verdicts
+
+
+def publish_kernel_view():
+    """Swap in a fresh read view of the kernel; call with ``ingest_lock`` held."""
+    global kernel_view
+    kernel_view = euystacio.read_view()
+
+
+def save_kernel_snapshot(next_seq):
+    """Atomically write the kernel state and streaming statistics, tagged with the first sequence number not applied."""
+    tmp_path = f"{KERNEL_SNAPSHOT_FILE}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(serializer.dumps({"seq": next_seq, "kernel": euystacio.snapshot(),
+                                  "heavy_hitters": heavy_hitters.snapshot(),
+                                  "anomalies": anomaly_detector.snapshot()}))
+    os.replace(tmp_path, KERNEL_SNAPSHOT_FILE)
+
+
+def restore_kernel():
+    """Restore the kernel snapshot, if any, and replay the pulses logged after it; returns pulses replayed."""
+    if not os.path.exists(KERNEL_SNAPSHOT_FILE):
+        # The kernel starts fresh, but streaming statistics cover the whole log
+        track(*logged_entries(0))
+        return 0
+    with open(KERNEL_SNAPSHOT_FILE, "rb") as f:
+        saved = serializer.loads(f.read())
+    euystacio.restore(saved["kernel"])
+    if "heavy_hitters" in saved and "anomalies" in saved:
+        heavy_hitters.restore(saved["heavy_hitters"])
+        anomaly_detector.restore(saved["anomalies"])
+        track(*logged_entries(saved["seq"]))
+    else:
+        # Snapshot written before these statistics were saved: go over the whole log once
+        track(*logged_entries(0))
+    return replay_log(saved["seq"])
+
+
+def logged_entries(start):
+    """
+    Logged pulses from sequence number ``start`` on, from the archive and the store.
+
+    Returns:
+        ``(first_seq, entries)``; ``first_seq`` is later than ``start`` when
+        retention rolled up and dropped the pulses in between
+    """
+    start = max(start, retention_state.available_from())
+    entries = []
+    seq = start
+    while seq < pulse_store.offset:
+        # Only archive runs follow the last dropped run
+        _, run_start, run_end, row = retention_state.run_at(seq)
+        entries.extend(pulse_archive.entries(row + seq - run_start, row + run_end - run_start))
+        seq = run_end
+    entries += pulse_store.entries_at(range(max(0, start - pulse_store.offset), len(pulse_store)))
+    return start, entries
+
+
+def replay_log(start):
+    """Apply the logged pulses from sequence number ``start`` on to the kernel; returns pulses replayed."""
+    _, entries = logged_entries(start)
+    if entries:
+        # Patterns of these pulses were indexed when they first arrived
+        on_pattern, euystacio.on_pattern = euystacio.on_pattern, None
+        try:
+            euystacio.replay([entry["event"] for entry in entries], [entry["sentiment"] for entry in entries])
+        finally:
+            euystacio.on_pattern = on_pattern
+    return len(entries)
 
 
-def save_pulse_log(log):
-    """Save pulse log to file."""
-    with open(PULSE_LOG_FILE, "w") as f:
-        json.dump(log, f, indent=2)
+def warm_up():
+    """Load the pulse log, indexes and kernel state, then start replicating."""
+    global startup_seconds
+
+    started = time.perf_counter()
+    with ingest_lock:
+        # Finish an interrupted compaction before the log is read
+        compactor.recover()
+        pulse_store.offset = retention_state.offset
+        len(pulse_store)
+        pattern_index.load()
+        dedup_index.load()
+        event_index.load()
+        # Postings of pulses a compaction removed before the index was pruned
+        event_index.prune(pulse_store.offset)
+        # Pulses logged but not indexed (an interrupted write, a bulk import)
+        first, entries = logged_entries(event_index.next_seq)
+        event_index.add_many(first, [entry["event"] for entry in entries])
+        restore_kernel()
+        publish_kernel_view()
+    startup_seconds = time.perf_counter() - started
+    startup_complete.set()
+
+    if follower is not None and serving_process:
+        follower.seq = pulse_store.next_seq()
+        follower.start()
+    if pulse_listener is not None and serving_process:
+        pulse_listener.start()
+    if compactor.enabled and COMPACTION_INTERVAL > 0 and serving_process:
+        compactor.start()
+
+
+def warm_up_in_background():
+    """Run ``warm_up`` on a thread, recording a failure for the requests waiting on it."""
+    def run():
+        global startup_error
+        try:
+            warm_up()
+        except Exception as e:
+            startup_error = str(e)
+            startup_complete.set()
+            raise
+
+    threading.Thread(target=run, name="startup", daemon=True).start()
+
+
+if REPLICATION_ROLE == "follower":
+    follower = Follower(os.environ["EUYSTACIO_LEADER_URL"], lambda entry: ingest(entry, compact=True),
+                        serializer=serializer)
+if PULSE_LISTENER:
+    if follower is not None:
+        raise ValueError("PULSE_LISTENER is only available on a leader or standalone backend")
+    pulse_listener = PulseListener(PULSE_LISTENER, submit_pulses, framing=PULSE_LISTENER_FRAMING,
+                                   max_batch=PULSE_LISTENER_BATCH, serializer=serializer,
+                                   admit=admit_listener_pulses if user_limiter or ip_limiter else None)
+
+# Under the debug reloader only the serving child process loads state and replicates
+serving_process = __name__ != "__main__" or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+if STARTUP_MODE == "eager":
+    warm_up()
+elif serving_process:
+    warm_up_in_background()
+
+
+def client_ip():
+    """Client address, taken from X-Forwarded-For only when the proxy is trusted."""
+    if RATE_LIMIT_TRUST_PROXY and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or "unknown"
+
+
+def too_many_requests(reason, retry_after):
+    """429 response with Retry-After, counted under ``reason``."""
+    admission_counters.increment(reason)
+    response = jsonify({"error": "Too many requests", "reason": reason})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+    return response
+
+
+def admit_pulse(user):
+    """Charge a pulse to its user's and client's token buckets; returns a 429 response if refused."""
+    return admit_pulses([user])
+
+
+def batch_over_burst(reason, limiter):
+    """413 response for a batch that needs more tokens than a bucket holds, counted under ``reason``."""
+    admission_counters.increment(reason)
+    return jsonify({
+        "error": f"Batch exceeds the rate limit burst of {limiter.burst:g} pulses per "
+                 f"{'user' if reason == 'user_rate' else 'client'}; split it into smaller batches",
+        "reason": reason
+    }), 413
+
+
+def admit_pulses(users):
+    """
+    Charge a batch of pulses (one per entry of ``users``) to the token buckets.
+
+    Every pulse costs one token, so a batch is admitted only as fast as the
+    same pulses sent one by one.
+
+    Returns:
+        None if admitted, a 429 response if a bucket is short, or a 413
+        response if the batch needs more tokens than a full bucket holds
+    """
+    if user_limiter is not None:
+        costs = {}
+        for user in users:
+            costs[str(user)] = costs.get(str(user), 0) + 1
+        retry_after = user_limiter.charge(costs)
+        if retry_after == math.inf:
+            return batch_over_burst("user_rate", user_limiter)
+        if retry_after:
+            return too_many_requests("user_rate", retry_after)
+    if ip_limiter is not None:
+        retry_after = ip_limiter.charge({client_ip(): len(users)})
+        if retry_after == math.inf:
+            return batch_over_burst("ip_rate", ip_limiter)
+        if retry_after:
+            return too_many_requests("ip_rate", retry_after)
+    return None
+
+
+def request_body():
+    """
+    Decode the request body: MessagePack for the msgpack content types, JSON otherwise.
+
+    Raises:
+        ValueError: If a MessagePack body cannot be decoded
+        RuntimeError: If msgpack is not installed
+    """
+    if request.mimetype in MSGPACK_MIMETYPES:
+        return msgpack_loads(request.get_data())
+    return request.get_json()
+
+
+def read_body():
+    """``(data, None)`` with the decoded request body, or ``(None, error response)``."""
+    try:
+        return request_body(), None
+    except RuntimeError as e:
+        return None, (jsonify({"error": str(e)}), 415)
+    except ValueError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+
+
+def state_version():
+    """Changes whenever the log, archive, pattern history or kernel changes."""
+    return (pulse_store.version, pulse_store.offset, len(pattern_index), kernel_view['total_inputs'])
+
+
+def coalesced(view):
+    """Share one execution of a read-only ``view`` among concurrent identical requests."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not REQUEST_COALESCING:
+            return view(*args, **kwargs)
+
+        def render():
+            response = app.make_response(view(*args, **kwargs))
+            return response.get_data(), response.status_code, list(response.headers.items())
+
+        key = (request.endpoint, tuple(sorted(request.args.items(multi=True))), state_version())
+        # Every request gets its own Response built from the shared bytes
+        body, status, headers = single_flight.do(key, render)
+        return Response(body, status=status, headers=headers)
+
+    return wrapper
+
+
+@app.before_request
+def wait_for_startup():
+    """Hold requests that need the log or kernel until startup has loaded them."""
+    if (startup_complete.is_set() and startup_error is None) or request.endpoint in STARTUP_EXEMPT_ENDPOINTS:
+        return None
+
+    if not startup_complete.wait(STARTUP_WAIT):
+        admission_counters.increment("starting")
+        response = jsonify({"error": "Service starting, retry shortly"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(max(1, int(STARTUP_WAIT)))
+        return response
+    if startup_error is not None:
+        return jsonify({"error": f"Startup failed: {startup_error}"}), 500
+    return None
+
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON responses according to Accept-Encoding."""
+    if (RESPONSE_COMPRESSION_MIN_BYTES <= 0 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers or response.mimetype != "application/json"):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+    body = response.get_data()
+    if encoding is None or len(body) < RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+
+    response.set_data(compression_cache.compress(body, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
 
 
 @app.route("/", methods=["GET"])
 def api_info():
-    """API information and health check."""
-    return jsonify({
+    """API information and health check: 503 once startup has failed."""
+    if startup_error is not None:
+        status = "failed"
+    elif startup_complete.is_set():
+        status = "healthy"
+    else:
+        status = "starting"
+    response = jsonify({
         "name": "Euystacio Backend API",
         "version": "2.0",
-        "status": "healthy",
+        "status": status,
+        "ready": status == "healthy",
+        "startup": {
+            "mode": STARTUP_MODE,
+            "load_seconds": startup_seconds,
+            "error": startup_error
+        },
         "endpoints": {
             "POST /pulse": "Submit new pulse data",
+            "POST /pulse/batch": "Submit many pulses in one request",
             "GET /log": "Retrieve all pulse entries", 
             "GET /status": "Get system status",
             "GET /kernel": "Get detailed kernel status",
+            "POST /kernel/simulate": "Preview kernel state for candidate next sentiments",
             "GET /metrics": "Get performance metrics",
+            "GET /patterns": "Query detected kernel patterns",
+            "GET /series": "Get bucketed sentiment averages over the full history",
+            "GET /top": "Most frequent users, events or roles, overall or recently",
+            "GET /anomalies": "Pulses flagged as sudden sentiment swings",
+            "GET /export": "Download the full history as JSON Lines",
+            "GET /replication": "Replication role and progress",
+            "GET /replication/feed": "Pulse log feed followers tail",
+            **({"GET /debug/memory": "Memory use per structure and traced allocations",
+                "POST /debug/memory/mark": "Start tracing allocations from now",
+                "POST /debug/memory/stop": "Stop tracing allocations"} if DEBUG_MEMORY else {}),
             "GET /": "This API information"
         },
         "kernel_type": "Enhanced Euystacio v2.0"
     })
+    if status == "failed":
+        response.status_code = 503
+    return response
+
+
+def request_fingerprint(body):
+    """SHA-256 of the canonical JSON of a request body, recorded with its idempotency key."""
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def replay_idempotent(scope, key, fingerprint):
+    """
+    Answer a request whose idempotency key ``scope`` already used; call with ``ingest_lock`` held.
+
+    Returns:
+        The original response, 422 if the key came with a different body, or None for a new key
+    """
+    original = dedup_index.get(scope, key)
+    if original is None:
+        return None
+    response, recorded = original
+    if recorded is not None and recorded != fingerprint:
+        return jsonify({"error": "Idempotency key already used with a different request body"}), 422
+    replay = jsonify(response)
+    replay.headers["Idempotent-Replayed"] = "true"
+    return replay
 
 
 @app.route("/pulse", methods=["POST"])
 def post_pulse():
     """Submit new pulse data to the system."""
     try:
-        data = request.get_json()
+        data, error = read_body()
+        if error is not None:
+            return error
         
         if not data:
             return jsonify({"error": "No data provided"}), 400
+        if not isinstance(data, dict):
+            return jsonify({"error": "Pulse must be an object"}), 400
+
+        rejected = admit_pulse(data.get("user", "anonymous"))
+        if rejected is not None:
+            return rejected
+
+        if follower is not None:
+            return forward_to_leader()
 
-        event = data.get("event", "Unnamed Pulse")
-        sentiment = data.get("sentiment")
-        
-        if sentiment is None:
-            return jsonify({"error": "Sentiment value required"}), 400
-            
         try:
-            sentiment = float(sentiment)
-            if not -1 <= sentiment <= 1:
-                return jsonify({"error": "Sentiment must be between -1 and 1"}), 400
-        except (ValueError, TypeError):
-            return jsonify({"error": "Invalid sentiment value"}), 400
-
-        role = data.get("role", "visitor")
-        user = data.get("user", "anonymous")
-        timestamp = datetime.utcnow().isoformat() + "Z"
-
-        new_entry = {
-            "timestamp": timestamp,
-            "event": event,
-            "sentiment": sentiment,
-            "role": role,
-            "user": user,
-        }
-
-        # Save to pulse log
-        pulse_log = load_pulse_log()
-        pulse_log.append(new_entry)
-        save_pulse_log(pulse_log)
-
-        # Process with enhanced Euystacio kernel
-        kernel_response = euystacio.receive_input(event, sentiment)
+            pulse = validate_pulse(data)
+        except PulseValidationError as e:
+            return jsonify({"error": str(e)}), 400
 
-        return jsonify({
-            "status": "success",
-            "message": "Pulse processed successfully",
-            "entry": new_entry,
-            "kernel": kernel_response
-        })
+        idempotency_key = request.headers.get("Idempotency-Key") or data.get("id")
+        if idempotency_key is not None:
+            idempotency_key = str(idempotency_key)
+            if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                return jsonify({"error": f"Idempotency key longer than {MAX_IDEMPOTENCY_KEY_LENGTH} characters"}), 400
+
+        compact = request.args.get('compact', 'false').lower() in ('1', 'true', 'yes')
+
+        # Keys are scoped by user, so clients picking the same simple id do not collide
+        if idempotency_key is not None:
+            fingerprint = request_fingerprint(data)
+
+        with ingest_lock:
+            if idempotency_key is not None:
+                replay = replay_idempotent(pulse["user"], idempotency_key, fingerprint)
+                if replay is not None:
+                    return replay
+
+            new_entry = {
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                **pulse
+            }
+
+            # Save to pulse log and process with enhanced Euystacio kernel;
+            # ?compact=1 skips the kernel metrics
+            seq, kernel_response = ingest(new_entry, compact=compact)
+
+            response = {
+                "status": "success",
+                "message": "Pulse processed successfully",
+                "entry": new_entry,
+                "seq": seq
+            }
+            if not compact:
+                response["kernel"] = kernel_response
+            if idempotency_key is not None:
+                dedup_index.put(pulse["user"], idempotency_key, response, fingerprint)
+
+        return jsonify(response)
         
     except Exception as e:
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
+@app.route("/pulse/batch", methods=["POST"])
+def post_pulse_batch():
+    """Submit a list of pulses, stored with one log write and applied to the kernel together."""
+    try:
+        pulses, error = read_body()
+        if error is not None:
+            return error
+
+        if not isinstance(pulses, list) or not pulses:
+            return jsonify({"error": "Expected a non-empty list of pulses"}), 400
+        if len(pulses) > MAX_BATCH_PULSES:
+            return jsonify({"error": f"Batch larger than {MAX_BATCH_PULSES} pulses"}), 413
+
+        rejected = admit_pulses([pulse.get("user", "anonymous") if isinstance(pulse, dict) else None
+                                 for pulse in pulses])
+        if rejected is not None:
+            return rejected
+
+        if follower is not None:
+            return forward_to_leader()
+
+        idempotency_key = request.headers.get("Idempotency-Key")
+        if idempotency_key is not None:
+            if len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                return jsonify({"error": f"Idempotency key longer than {MAX_IDEMPOTENCY_KEY_LENGTH} characters"}), 400
+            # The scope of a batch key is the set of users in the batch
+            scope = ",".join(sorted({str(pulse.get("user", "anonymous"))
+                                     for pulse in pulses if isinstance(pulse, dict)}))
+            fingerprint = request_fingerprint(pulses)
+
+        with ingest_lock:
+            if idempotency_key is not None:
+                replay = replay_idempotent(scope, idempotency_key, fingerprint)
+                if replay is not None:
+                    return replay
+
+            results = submit_pulses(pulses)
+            seqs = [result["seq"] for result in results if "seq" in result]
+            if not seqs:
+                return jsonify({"error": "No valid pulses in batch", "results": results}), 400
+
+            response = {
+                "status": "success",
+                "message": "Batch processed successfully",
+                "accepted": len(seqs),
+                "rejected": len(results) - len(seqs),
+                "results": results,
+                "last_seq": seqs[-1]
+            }
+            if idempotency_key is not None:
+                dedup_index.put(scope, idempotency_key, response, fingerprint)
+
+        return jsonify(response)
+
+    except Exception as e:
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+def forward_to_leader():
+    """Forward a write to the leader and wait until it has been replicated here."""
+    path = request.full_path.rstrip("?")
+    try:
+        status, body = follower.forward(path, request.get_data(), request.content_type, headers={
+            "Idempotency-Key": request.headers.get("Idempotency-Key"),
+            "X-Forwarded-For": client_ip()
+        })
+    except OSError as e:
+        return jsonify({"error": f"Leader unavailable: {str(e)}"}), 503
+
+    # Read-your-writes: return once this replica has applied the pulse(s)
+    if status == 200:
+        response = serializer.loads(body)
+        seq = response.get("last_seq", response.get("seq"))
+        if seq is not None:
+            follower.wait_for(seq, timeout=FEED_WAIT)
+    return Response(body, status=status, mimetype="application/json")
+
+
 @app.route("/status", methods=["GET"])
+@coalesced
 def get_status():
     """Get basic system status."""
     try:
-        pulse_count = len(load_pulse_log())
-        kernel_status = euystacio.get_status()
+        pulse_count = len(pulse_store) + len(pulse_archive) + retention_state.sentiment_total()[0]
+        kernel_status = kernel_view
         
         return jsonify({
             "status": "healthy",
@@ -127,34 +864,100 @@ def get_status():
 
 
 @app.route("/kernel", methods=["GET"])
+@coalesced
 def get_kernel_status():
-    """Get detailed kernel status and metrics."""
+    """Get detailed kernel status and metrics; ?fields=a,b limits the response to those fields."""
     try:
-        return jsonify(euystacio.get_status())
+        view = kernel_view
+        fields = request.args.get('fields')
+        if fields is None:
+            return jsonify(dict(view))
+
+        fields = [field.strip() for field in fields.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in view]
+        if unknown:
+            return jsonify({"error": f"Unknown fields: {', '.join(unknown)}",
+                            "available_fields": list(view)}), 400
+
+        return jsonify({field: view[field] for field in fields})
         
     except Exception as e:
         return jsonify({"error": f"Kernel status failed: {str(e)}"}), 500
 
 
+@app.route("/kernel/simulate", methods=["POST"])
+def simulate_kernel():
+    """Preview the kernel state after each candidate next sentiment, without applying it."""
+    try:
+        data = request.get_json(silent=True) or {}
+
+        if "sentiments" in data:
+            sentiments = data["sentiments"]
+            if not isinstance(sentiments, list) or not sentiments:
+                return jsonify({"error": "sentiments must be a non-empty list"}), 400
+            try:
+                sentiments = [float(s) for s in sentiments]
+            except (ValueError, TypeError):
+                return jsonify({"error": "Invalid sentiment value"}), 400
+        elif "steps" in data:
+            try:
+                steps = int(data["steps"])
+            except (ValueError, TypeError):
+                return jsonify({"error": "steps must be an integer"}), 400
+            if not 2 <= steps <= MAX_SIMULATE_CANDIDATES:
+                return jsonify({"error": f"steps must be between 2 and {MAX_SIMULATE_CANDIDATES}"}), 400
+            # Evenly spaced candidates across the full sentiment range
+            sentiments = [-1 + 2 * i / (steps - 1) for i in range(steps)]
+        else:
+            return jsonify({"error": "Provide sentiments or steps"}), 400
+
+        if len(sentiments) > MAX_SIMULATE_CANDIDATES:
+            return jsonify({"error": f"At most {MAX_SIMULATE_CANDIDATES} candidates allowed"}), 400
+        if any(not -1 <= s <= 1 for s in sentiments):
+            return jsonify({"error": "Sentiment must be between -1 and 1"}), 400
+
+        # Only capturing the state needs the lock; candidates are evaluated outside it
+        with ingest_lock:
+            context = euystacio.next_input_context()
+            total_inputs = euystacio.total_inputs
+
+        return jsonify({
+            "candidates": len(sentiments),
+            "total_inputs": total_inputs,
+            "results": euystacio.simulate(sentiments, context=context)
+        })
+
+    except Exception as e:
+        return jsonify({"error": f"Kernel simulation failed: {str(e)}"}), 500
+
+
 @app.route("/metrics", methods=["GET"])
+@coalesced
 def get_metrics():
     """Get performance metrics and analytics."""
     try:
-        pulse_log = load_pulse_log()
-        kernel_status = euystacio.get_status()
+        kernel_status = kernel_view
+        memory_limit = kernel_status['config']['memory_limit']
+        
+        # Mergeable (count, sum) totals from the archive and the log
+        archived_count, archived_sum = pulse_archive.sentiment_total()
+        rolled_up_count, rolled_up_sum = retention_state.sentiment_total()
+        log_count, log_sum = pulse_store.sentiment_total()
+        total_pulses = log_count + archived_count + rolled_up_count
         
         # Calculate additional metrics
-        if pulse_log:
-            sentiments = [entry['sentiment'] for entry in pulse_log]
-            avg_sentiment = sum(sentiments) / len(sentiments)
-            recent_sentiments = sentiments[-10:] if len(sentiments) >= 10 else sentiments
+        if total_pulses:
+            avg_sentiment = (log_sum + archived_sum + rolled_up_sum) / total_pulses
+            recent_sentiments = [entry['sentiment'] for entry in pulse_store.tail(10)]
             recent_avg = sum(recent_sentiments) / len(recent_sentiments) if recent_sentiments else 0
         else:
             avg_sentiment = 0
             recent_avg = 0
         
         return jsonify({
-            "total_pulses": len(pulse_log),
+            "total_pulses": total_pulses,
+            "archived_pulses": archived_count,
+            "rolled_up_pulses": rolled_up_count,
             "average_sentiment": round(avg_sentiment, 3),
             "recent_average_sentiment": round(recent_avg, 3),
             "kernel_metrics": {
@@ -164,10 +967,18 @@ def get_metrics():
                 "average_prediction_error": kernel_status['average_prediction_error'],
                 "average_volatility": kernel_status['average_volatility']
             },
+            "coalescing": single_flight.stats(),
+            "listener": pulse_listener.stats() if pulse_listener is not None else None,
+            "anomalies": anomaly_detector.stats(),
+            "compaction": compactor.stats(),
+            "admission": {
+                "rejected": admission_counters.snapshot(),
+                "tracked_buckets": (len(user_limiter) if user_limiter else 0) + (len(ip_limiter) if ip_limiter else 0)
+            },
             "memory_efficiency": {
                 "used": kernel_status['memory_size'],
-                "limit": kernel_status['config']['memory_limit'],
-                "usage_percent": round(100 * kernel_status['memory_size'] / kernel_status['config']['memory_limit'], 1)
+                "limit": memory_limit,
+                "usage_percent": round(100 * kernel_status['memory_size'] / memory_limit, 1)
             }
         })
         
@@ -176,44 +987,290 @@ def get_metrics():
 
 
 @app.route("/log", methods=["GET"])
+@coalesced
 def get_log():
     """Retrieve all pulse entries with optional filtering."""
     try:
-        pulse_log = load_pulse_log()
-        
         # Optional query parameters for filtering
         limit = request.args.get('limit', type=int)
         user_filter = request.args.get('user')
         role_filter = request.args.get('role')
+        query = request.args.get('q')
+
+        # Search hits (archived pulses are not served)
+        hits = None
+        if query is not None:
+            try:
+                hits = event_index.search(query)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
         
-        # Apply filters
-        filtered_log = pulse_log
+        # Reading the whole log is capped by the expensive-request limit
+        limited = expensive_limit is not None and not (limit and limit > 0)
+        if limited and not expensive_limit.try_acquire():
+            return too_many_requests("concurrency", 1)
         
-        if user_filter:
-            filtered_log = [entry for entry in filtered_log if entry.get('user') == user_filter]
-            
-        if role_filter:
-            filtered_log = [entry for entry in filtered_log if entry.get('role') == role_filter]
-            
-        if limit and limit > 0:
-            filtered_log = filtered_log[-limit:]
+        try:
+            # Apply filters, then join the cached per-entry encodings, under one
+            # store lock so a compaction cannot shift the positions in between
+            entries, filtered_count, total_count = pulse_store.encode_selection(
+                user=user_filter, role=role_filter, limit=limit, seqs=hits)
+            body = (b'{"entries":' + entries +
+                    b',"total_count":' + str(total_count).encode() +
+                    b',"filtered_count":' + str(filtered_count).encode() + b'}')
+        finally:
+            if limited:
+                expensive_limit.release()
         
-        return jsonify({
-            "entries": filtered_log,
-            "total_count": len(pulse_log),
-            "filtered_count": len(filtered_log)
-        })
+        return app.response_class(body, mimetype="application/json")
         
     except Exception as e:
         return jsonify({"error": f"Log retrieval failed: {str(e)}"}), 500
 
 
+@app.route("/top", methods=["GET"])
+@coalesced
+def get_top():
+    """Most frequent users, events or roles from the streaming top-K summaries."""
+    try:
+        dimension = request.args.get('dimension', 'user')
+        if dimension not in heavy_hitters.dimensions:
+            return jsonify({"error": f"dimension must be one of {', '.join(heavy_hitters.dimensions)}"}), 400
+        k = request.args.get('k', 10, type=int)
+        if not 1 <= k <= heavy_hitters.capacity:
+            return jsonify({"error": f"k must be between 1 and {heavy_hitters.capacity}"}), 400
+        window = request.args.get('window', 'all')
+        if window not in ("all", "recent"):
+            return jsonify({"error": "window must be all or recent"}), 400
+
+        top = heavy_hitters.top(dimension, k, recent=window == "recent")
+        return jsonify({
+            "dimension": dimension,
+            "window": window,
+            "window_seconds": heavy_hitters.window if window == "recent" else None,
+            "k": k,
+            "items": top["items"],
+            "total": top["total"],
+            "tracked": top["tracked"],
+            "capacity": heavy_hitters.capacity
+        })
+
+    except Exception as e:
+        return jsonify({"error": f"Top-K query failed: {str(e)}"}), 500
+
+
+@app.route("/anomalies", methods=["GET"])
+def get_anomalies():
+    """Pulses flagged by the anomaly detector after id ?after=, long-polling up to ?wait= seconds."""
+    try:
+        after = request.args.get('after', default=0, type=int)
+        limit = min(max(1, request.args.get('limit', default=100, type=int)), ANOMALY_QUEUE_SIZE)
+        wait = min(max(0.0, request.args.get('wait', default=0.0, type=float)), ANOMALY_WAIT)
+        user = request.args.get('user')
+
+        anomalies = anomaly_detector.since(after, limit=limit, user=user, wait=wait)
+        return jsonify({
+            "anomalies": anomalies,
+            "next": anomalies[-1]["id"] if anomalies else max(after, 0),
+            "detected": anomaly_detector.detected,
+            "threshold": anomaly_detector.threshold
+        })
+
+    except Exception as e:
+        return jsonify({"error": f"Anomaly retrieval failed: {str(e)}"}), 500
+
+
+@app.route("/patterns", methods=["GET"])
+@coalesced
+def get_patterns():
+    """Query the persisted history of detected kernel patterns."""
+    try:
+        direction = request.args.get('direction')
+        min_strength = request.args.get('min_strength', type=float)
+        limit = request.args.get('limit', type=int)
+
+        since = request.args.get('since')
+        if since is not None:
+            try:
+                since = float(since)
+            except ValueError:
+                try:
+                    since = parse_timestamp(since)
+                except ValueError:
+                    return jsonify({"error": "since must be epoch seconds or an ISO 8601 timestamp"}), 400
+
+        patterns = pattern_index.query(since=since, direction=direction,
+                                       min_strength=min_strength, limit=limit)
+
+        return jsonify({
+            "patterns": patterns,
+            "total_count": len(pattern_index),
+            "filtered_count": len(patterns)
+        })
+
+    except Exception as e:
+        return jsonify({"error": f"Pattern query failed: {str(e)}"}), 500
+
+
+@app.route("/series", methods=["GET"])
+@coalesced
+def get_series():
+    """Bucketed sentiment averages over rolled-up, archived and recent pulses."""
+    try:
+        bucket = request.args.get('bucket', default=3600, type=int)
+        if bucket <= 0:
+            return jsonify({"error": "bucket must be a positive number of seconds"}), 400
+
+        try:
+            since = parse_timestamp(request.args['since']) if 'since' in request.args else None
+            until = parse_timestamp(request.args['until']) if 'until' in request.args else None
+        except ValueError:
+            return jsonify({"error": "since/until must be ISO 8601 timestamps"}), 400
+
+        totals = merge_bucket_totals([retention_state.bucket_totals(bucket, since, until),
+                                      pulse_archive.bucket_totals(bucket, since, until),
+                                      pulse_store.bucket_totals(bucket, since, until)])
+
+        return jsonify({
+            "bucket_seconds": bucket,
+            "series": [
+                {
+                    "start": format_timestamp(key * bucket),
+                    "count": count,
+                    "average_sentiment": round(total / count, 3)
+                }
+                for key, (count, total) in sorted(totals.items())
+            ]
+        })
+
+    except Exception as e:
+        return jsonify({"error": f"Series calculation failed: {str(e)}"}), 500
+
+
+@app.route("/export", methods=["GET"])
+def export_log():
+    """Stream the full pulse history, archived first, as JSON Lines."""
+    if expensive_limit is not None and not expensive_limit.try_acquire():
+        return too_many_requests("concurrency", 1)
+
+    def generate():
+        # The slot is held until the stream finishes or the client disconnects
+        try:
+            # A compaction in between would move pulses from the store to the
+            # archive: count the archive and copy the store as of one moment
+            with compactor.paused():
+                archived = len(pulse_archive)
+                blobs = pulse_store.blobs(range(len(pulse_store)))
+            for entry in pulse_archive.entries(0, archived):
+                yield serializer.dumps(entry) + b"\n"
+            for blob in blobs:
+                yield blob + b"\n"
+        finally:
+            if expensive_limit is not None:
+                expensive_limit.release()
+
+    encoding = negotiate(request.headers.get("Accept-Encoding", ""))
+    if encoding is None:
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    response = Response(stream_compress(generate(), encoding), mimetype="application/x-ndjson")
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@app.route("/replication", methods=["GET"])
+def replication_status():
+    """Replication role and progress of this node."""
+    status = {"role": REPLICATION_ROLE, "next_seq": pulse_store.next_seq()}
+    if follower is not None:
+        status["follower"] = follower.status()
+    return jsonify(status)
+
+
+@app.route("/replication/feed", methods=["GET"])
+def replication_feed():
+    """Entries of the pulse log from sequence number ?start=, long-polling up to ?wait= seconds."""
+    try:
+        start = request.args.get('start', default=0, type=int)
+        limit = min(max(1, request.args.get('limit', default=FEED_BATCH, type=int)), FEED_BATCH)
+        wait = min(max(0.0, request.args.get('wait', default=0.0, type=float)), FEED_WAIT)
+
+        if wait and start >= pulse_store.offset:
+            pulse_store.wait_for(start, wait)
+
+        # Choose between the archive and the store and read with compactions
+        # held off, so a trim cannot move the entries in between
+        with compactor.paused():
+            if start < pulse_store.offset:
+                # Older entries live in the archive, unless retention dropped them
+                kind, run_start, run_end, row = retention_state.run_at(start)
+                if kind == "dropped":
+                    return jsonify({"error": f"Pulses {run_start} to {run_end - 1} were rolled up and dropped"}), 410
+                stop = min(start + limit, run_end)
+                blobs = [serializer.dumps(entry)
+                         for entry in pulse_archive.entries(row + start - run_start, row + stop - run_start)]
+                next_seq = stop
+            else:
+                blobs, next_seq = pulse_store.read_from(start, limit)
+
+        body = b'{"start":%d,"next":%d,"entries":[' % (start, next_seq) + b",".join(blobs) + b"]}"
+        return Response(body, mimetype="application/json")
+
+    except Exception as e:
+        return jsonify({"error": f"Replication feed failed: {str(e)}"}), 500
+
+
+@app.route("/debug/memory", methods=["GET"])
+def debug_memory():
+    """Memory use per structure (sampling ?sample= items per container, 0 for all) and traced allocations."""
+    if not DEBUG_MEMORY:
+        return not_found(None)
+    try:
+        sample = max(0, request.args.get('sample', default=1000, type=int))
+        top = min(max(1, request.args.get('top', default=20, type=int)), 200)
+        return jsonify(memory_report(sample=sample or None, top=top))
+
+    except Exception as e:
+        return jsonify({"error": f"Memory report failed: {str(e)}"}), 500
+
+
+@app.route("/debug/memory/mark", methods=["POST"])
+def debug_memory_mark():
+    """Start tracing allocations and make now the baseline of the next reports."""
+    if not DEBUG_MEMORY:
+        return not_found(None)
+    try:
+        allocation_tracer.mark()
+        return jsonify({"status": "success", "tracing": True, "marked_at": allocation_tracer.marked_at})
+
+    except Exception as e:
+        return jsonify({"error": f"Allocation tracing failed: {str(e)}"}), 500
+
+
+@app.route("/debug/memory/stop", methods=["POST"])
+def debug_memory_stop():
+    """Stop tracing allocations."""
+    if not DEBUG_MEMORY:
+        return not_found(None)
+    allocation_tracer.stop()
+    return jsonify({"status": "success", "tracing": False})
+
+
+def available_endpoints():
+    """``METHOD /path`` of every registered route, the debug routes only with DEBUG_MEMORY=1."""
+    endpoints = []
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if rule.endpoint == "static" or (rule.rule.startswith("/debug/") and not DEBUG_MEMORY):
+            continue
+        endpoints.extend(f"{method} {rule.rule}" for method in sorted(rule.methods - {"HEAD", "OPTIONS"}))
+    return endpoints
+
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    return jsonify({"error": "Endpoint not found", "available_endpoints": [
-        "GET /", "POST /pulse", "GET /log", "GET /status", "GET /kernel", "GET /metrics"
-    ]}), 404
+    return jsonify({"error": "Endpoint not found", "available_endpoints": available_endpoints()}), 404
 
 
 @app.errorhandler(405)
@@ -0,0 +1,5 @@
+"""
+Euystacio benchmark suite.
+
+Run with ``python -m benchmarks.run`` from the repository root.
+"""
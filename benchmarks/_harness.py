@@ -0,0 +1,131 @@
+"""
+Timing and baseline comparison helpers shared by the benchmark modules.
+"""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(func: Callable[[], Any], ops_per_call: int = 1, min_rounds: int = 3,
+            max_rounds: int = 1000, min_time: float = 0.5,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    Time repeated calls of ``func`` and summarise them per operation.
+
+    Args:
+        func: Zero-argument callable performing ``ops_per_call`` operations
+        ops_per_call: Number of logical operations one call represents
+        min_rounds: Minimum number of timed calls
+        max_rounds: Maximum number of timed calls
+        min_time: Keep calling until this many seconds have been spent
+        setup: Optional untimed callable run before every call
+
+    Returns:
+        Dictionary with per-operation timing statistics in seconds
+    """
+    timings = []
+    started = time.perf_counter()
+
+    while len(timings) < max_rounds:
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - t0) / ops_per_call)
+
+        if len(timings) >= min_rounds and time.perf_counter() - started >= min_time:
+            break
+
+    return summarize(timings, ops_per_call)
+
+
+def summarize(timings: List[float], ops_per_call: int = 1) -> Dict[str, Any]:
+    """
+    Summarise per-operation timings collected by the caller.
+
+    Args:
+        timings: Seconds per operation, one value per timed round
+        ops_per_call: Number of logical operations one round represents
+
+    Returns:
+        Dictionary with the same statistics as ``measure``
+    """
+    median = statistics.median(timings)
+    return {
+        "median_s": median,
+        "min_s": min(timings),
+        "mean_s": statistics.fmean(timings),
+        "stdev_s": statistics.pstdev(timings),
+        "ops_per_s": 1.0 / median if median > 0 else float("inf"),
+        "rounds": len(timings),
+        "ops_per_round": ops_per_call
+    }
+
+
+def environment_info() -> Dict[str, Any]:
+    """Describe the machine the results were produced on."""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Load a results or baseline file written by ``write_results``."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_results(path: str, results: Dict[str, Any]) -> None:
+    """Write results as JSON, creating parent directories if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            default_threshold: float,
+            overrides: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    Compare current results against a baseline.
+
+    A case regresses when its median time per operation exceeds the baseline
+    median by more than its threshold (a fraction, e.g. 0.25 for 25%).
+    Per-case thresholds are looked up in ``overrides`` first, then in the
+    baseline's own ``thresholds`` section, falling back to the default.
+
+    Returns:
+        One comparison record per case present in both result sets
+    """
+    thresholds = {**baseline.get("thresholds", {}), **(overrides or {})}
+    report = []
+
+    for name, result in sorted(current["results"].items()):
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+
+        threshold = thresholds.get(name, default_threshold)
+        ratio = result["median_s"] / reference["median_s"] if reference["median_s"] > 0 else 1.0
+        report.append({
+            "case": name,
+            "baseline_median_s": reference["median_s"],
+            "current_median_s": result["median_s"],
+            "ratio": ratio,
+            "threshold": threshold,
+            "regressed": ratio > 1.0 + threshold
+        })
+
+    return report
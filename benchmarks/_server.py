@@ -0,0 +1,92 @@
+"""
+Start the backend on a local port inside a given working directory.
+
+Used by the load generator and other multi-process harnesses so each server
+gets its own ``pulse_log.json`` and a known process id:
+
+    python -m benchmarks._server --port 5001 --workdir /tmp/euystacio-run
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(port, workdir, env=None, log_path=None, ready_path="/status"):
+    """
+    Launch a backend process and wait until it is ready to serve data.
+
+    ``GET /`` answers while the backend is still loading its log in the
+    background, so readiness is checked on ``ready_path`` instead.
+
+    Args:
+        port: Local port to bind
+        workdir: Working directory holding the server's pulse log
+        env: Extra environment variables for the server process
+        log_path: File receiving the server's stdout/stderr (default: discard)
+        ready_path: Path that must answer 200 before the server counts as ready
+
+    Returns:
+        The ``subprocess.Popen`` handle of the server
+    """
+    os.makedirs(workdir, exist_ok=True)
+    output = open(log_path, "ab") if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks._server", "--port", str(port), "--workdir", workdir],
+        cwd=REPO_ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=output,
+        stderr=subprocess.STDOUT
+    )
+    wait_until_ready(f"http://127.0.0.1:{port}{ready_path}", process)
+    return process
+
+
+def wait_until_ready(url, process=None, timeout=30.0, interval=0.05):
+    """Poll ``url`` every ``interval`` seconds until it responds, failing if the process exits first."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(interval)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout}s")
+
+
+def stop_server(process, timeout=10.0):
+    """Terminate a server started with ``start_server``."""
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Euystacio backend for local harnesses")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--workdir", required=True)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    os.makedirs(args.workdir, exist_ok=True)
+    os.chdir(args.workdir)
+
+    import app as app_module
+    app_module.app.run(host=args.host, port=args.port, threaded=True, debug=False, use_reloader=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmarks for the Flask API hot paths.
+
+Each case runs against a temporary pulse log pre-populated with a given
+number of entries, using Flask's test client so no server is needed.
+"""
+
+import json
+import os
+import random
+import tempfile
+from typing import Any, Dict, List
+
+from benchmarks._harness import measure
+from serialization import msgpack
+
+LOG_SIZES = [1000, 100000, 1000000]
+BATCH_SIZE = 100
+
+USERS = ["hannesmitterer", "Seed-Bringer", "anonymous", "collector-1", "collector-2"]
+ROLES = ["tutor", "visitor", "collector"]
+
+
+def synthetic_log(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Pulse entries shaped like the ones ``post_pulse`` writes."""
+    rng = random.Random(seed)
+    return [
+        {
+            "timestamp": f"2025-08-{1 + (i // 86400) % 28:02d}T"
+                         f"{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}.000000Z",
+            "event": f"Synthetic pulse {i}",
+            "sentiment": round(rng.uniform(-1, 1), 3),
+            "role": rng.choice(ROLES),
+            "user": rng.choice(USERS)
+        }
+        for i in range(count)
+    ]
+
+
+def write_log(path: str, entries: List[Dict[str, Any]]) -> None:
+    """Write a pulse log in the same format the backend uses."""
+    with open(path, "w") as f:
+        json.dump(entries, f, separators=(",", ":"))
+
+
+def _use_log(app_module, path: str) -> None:
+    """Point the backend at ``path`` and give it a fresh kernel."""
+    app_module.PULSE_LOG_FILE = path
+    app_module.pulse_store = app_module.PulseStore(path, serializer=app_module.serializer)
+    app_module.euystacio = app_module.Euystacio(config=app_module.euystacio_config)
+    app_module.event_index = app_module.EventIndex(serializer=app_module.serializer)
+    app_module.event_index.add_many(0, [entry["event"] for entry in app_module.pulse_store.entries()])
+    app_module.heavy_hitters = app_module.HeavyHitters(app_module.TOP_K_CAPACITY, window=app_module.TOP_K_WINDOW,
+                                                       panes=app_module.TOP_K_PANES)
+    app_module.anomaly_detector = app_module.AnomalyDetector(
+        alpha=app_module.ANOMALY_ALPHA, threshold=app_module.ANOMALY_THRESHOLD, warmup=app_module.ANOMALY_WARMUP,
+        min_std=app_module.ANOMALY_MIN_STD, max_users=app_module.ANOMALY_MAX_USERS,
+        max_anomalies=app_module.ANOMALY_QUEUE_SIZE)
+    app_module.track(0, app_module.pulse_store.entries())
+    app_module.publish_kernel_view()
+
+
+def _bench_endpoints(app_module, client, size: int, options: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Time every endpoint case against a log of ``size`` entries."""
+    results = {}
+    timing = {'min_rounds': options['min_rounds'], 'min_time': options['min_time']}
+    pulse = {"event": "Benchmark pulse", "sentiment": 0.5, "role": "tutor", "user": "bench"}
+
+    def check(response):
+        if response.status_code != 200:
+            raise RuntimeError(f"Unexpected status {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+    batch = [dict(pulse, event=f"Benchmark pulse {i}") for i in range(BATCH_SIZE)]
+
+    cases = {
+        "post_pulse": lambda: check(client.post("/pulse", json=pulse)),
+        "log": lambda: check(client.get("/log")),
+        "log_limit_50": lambda: check(client.get("/log?limit=50")),
+        "log_user": lambda: check(client.get("/log?user=hannesmitterer")),
+        "log_search": lambda: check(client.get("/log?q=synthetic+pulse+42*&limit=50")),
+        "metrics": lambda: check(client.get("/metrics")),
+        "status": lambda: check(client.get("/status")),
+        "top": lambda: check(client.get("/top?dimension=user&k=10")),
+        "anomalies": lambda: check(client.get("/anomalies?limit=100")),
+    }
+
+    if msgpack is not None:
+        body = msgpack.packb(pulse)
+        cases["post_pulse_msgpack"] = lambda: check(client.post("/pulse", data=body,
+                                                                content_type="application/msgpack"))
+
+    for case, func in cases.items():
+        name = f"api.{case}[log_size={size}]"
+        results[name] = measure(func, **timing)
+        options['report'](name, results[name])
+
+    # Per pulse, so it compares directly with post_pulse
+    name = f"api.post_pulse_batch[batch={BATCH_SIZE},log_size={size}]"
+    results[name] = measure(lambda: check(client.post("/pulse/batch", json=batch)), ops_per_call=BATCH_SIZE, **timing)
+    options['report'](name, results[name])
+
+    return results
+
+
+def run(options: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Run every API case and return results keyed by case name."""
+    import app as app_module
+
+    app_module.startup_complete.wait()
+    client = app_module.app.test_client()
+    original_log_file = app_module.PULSE_LOG_FILE
+    original_store = app_module.pulse_store
+    original_kernel = app_module.euystacio
+    original_event_index = app_module.event_index
+    original_heavy_hitters = app_module.heavy_hitters
+    original_anomaly_detector = app_module.anomaly_detector
+    original_snapshot_interval = app_module.KERNEL_SNAPSHOT_INTERVAL
+    # Benchmark pulses must not checkpoint over the real kernel snapshot
+    app_module.KERNEL_SNAPSHOT_INTERVAL = 0
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix="euystacio-bench-") as workdir:
+        try:
+            for size in options.get('log_sizes', LOG_SIZES):
+                path = os.path.join(workdir, f"pulse_log_{size}.json")
+                write_log(path, synthetic_log(size))
+                _use_log(app_module, path)
+                results.update(_bench_endpoints(app_module, client, size, options))
+                os.remove(path)
+        finally:
+            app_module.PULSE_LOG_FILE = original_log_file
+            app_module.pulse_store = original_store
+            app_module.euystacio = original_kernel
+            app_module.event_index = original_event_index
+            app_module.heavy_hitters = original_heavy_hitters
+            app_module.anomaly_detector = original_anomaly_detector
+            app_module.publish_kernel_view()
+            app_module.KERNEL_SNAPSHOT_INTERVAL = original_snapshot_interval
+
+    return results
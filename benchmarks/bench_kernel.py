@@ -0,0 +1,143 @@
+"""
+Benchmarks for the Euystacio kernel hot paths.
+
+Covers ``receive_input`` throughput across memory and pattern window sizes,
+both while memory is still filling and once every input triggers the
+overflow/eviction cleanup, ``get_status`` latency, and bulk ``replay`` with
+the pure-Python and NumPy backends.
+"""
+
+import random
+from typing import Any, Dict, List
+
+from euystacio import Euystacio
+
+from benchmarks._harness import measure
+
+MEMORY_LIMITS = [100, 1000, 10000]
+PATTERN_WINDOWS = [20, 200, 1000]
+INPUTS_PER_ROUND = 500
+REPLAY_INPUTS = 20000
+REPLAY_TOLERANCE = 1e-6
+
+
+def _sentiment_stream(count: int, seed: int = 42) -> List[float]:
+    """Random-walk sentiments in [-1, 1] so trends and volatility both occur."""
+    rng = random.Random(seed)
+    value = 0.0
+    stream = []
+    for _ in range(count):
+        value = max(-1.0, min(1.0, value + rng.uniform(-0.3, 0.3)))
+        stream.append(round(value, 3))
+    return stream
+
+
+def _prefilled_kernel(memory_limit: int, pattern_window: int) -> Euystacio:
+    """Kernel whose memory is already at its limit."""
+    kernel = Euystacio(config={'memory_limit': memory_limit, 'pattern_window': pattern_window})
+    for i, sentiment in enumerate(_sentiment_stream(memory_limit, seed=7)):
+        kernel.receive_input(f"prefill {i}", sentiment)
+    return kernel
+
+
+def bench_receive_input(memory_limit: int, pattern_window: int, regime: str,
+                        options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Time ``receive_input`` per input.
+
+    In the ``fill`` regime each round starts from an empty kernel and stays
+    below ``memory_limit``; in the ``overflow`` regime the kernel is kept at
+    its limit so inputs run through eviction.
+    """
+    batch = min(INPUTS_PER_ROUND, memory_limit) if regime == "fill" else INPUTS_PER_ROUND
+    stream = _sentiment_stream(batch)
+    events = [f"bench event {i}" for i in range(batch)]
+    state = {}
+
+    if regime == "fill":
+        def setup():
+            state['kernel'] = Euystacio(config={'memory_limit': memory_limit, 'pattern_window': pattern_window})
+    else:
+        state['kernel'] = _prefilled_kernel(memory_limit, pattern_window)
+        setup = None
+
+    def run():
+        kernel = state['kernel']
+        for event, sentiment in zip(events, stream):
+            kernel.receive_input(event, sentiment)
+
+    return measure(run, ops_per_call=batch, setup=setup,
+                   min_rounds=options['min_rounds'], min_time=options['min_time'])
+
+
+def bench_get_status(memory_limit: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Time ``get_status`` on a kernel with full memory and histories."""
+    kernel = _prefilled_kernel(memory_limit, 20)
+    calls = 1000
+
+    def run():
+        for _ in range(calls):
+            kernel.get_status()
+
+    return measure(run, ops_per_call=calls,
+                   min_rounds=options['min_rounds'], min_time=options['min_time'])
+
+
+def _replay(backend: str, stream: List[float], events: List[str]) -> Dict[str, Any]:
+    kernel = Euystacio(config={'memory_limit': 500, 'backend': backend})
+    return kernel.replay(events, stream)
+
+
+def bench_replay(backend: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Time ``replay`` of a long input stream per input.
+
+    The NumPy backend is first checked against the Python reference so a
+    fast but wrong backend cannot pass as an improvement.
+    """
+    stream = _sentiment_stream(REPLAY_INPUTS, seed=11)
+    events = [f"replay event {i}" for i in range(REPLAY_INPUTS)]
+
+    if backend == 'numpy':
+        reference = _replay('python', stream, events)
+        result = _replay('numpy', stream, events)
+        for key in ('balance_metric', 'learning_rate', 'adaptation_score',
+                    'average_prediction_error', 'average_volatility'):
+            if abs(reference[key] - result[key]) > REPLAY_TOLERANCE:
+                raise RuntimeError(f"NumPy replay diverges on {key}: {result[key]} != {reference[key]}")
+
+    return measure(lambda: _replay(backend, stream, events), ops_per_call=REPLAY_INPUTS,
+                   min_rounds=options['min_rounds'], min_time=options['min_time'])
+
+
+def run(options: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Run every kernel case and return results keyed by case name."""
+    results = {}
+
+    for memory_limit in options.get('memory_limits', MEMORY_LIMITS):
+        for pattern_window in options.get('pattern_windows', PATTERN_WINDOWS):
+            if pattern_window > memory_limit:
+                continue
+            for regime in ("fill", "overflow"):
+                name = (f"kernel.receive_input[memory_limit={memory_limit},"
+                        f"pattern_window={pattern_window},regime={regime}]")
+                results[name] = bench_receive_input(memory_limit, pattern_window, regime, options)
+                options['report'](name, results[name])
+
+        name = f"kernel.get_status[memory_limit={memory_limit}]"
+        results[name] = bench_get_status(memory_limit, options)
+        options['report'](name, results[name])
+
+    backends = ['python']
+    try:
+        import numpy  # noqa: F401
+        backends.append('numpy')
+    except ImportError:
+        pass
+
+    for backend in backends:
+        name = f"kernel.replay[backend={backend},inputs={REPLAY_INPUTS}]"
+        results[name] = bench_replay(backend, options)
+        options['report'](name, results[name])
+
+    return results
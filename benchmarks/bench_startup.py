@@ -0,0 +1,74 @@
+"""
+Benchmarks for backend cold start.
+
+Each round launches a fresh server process against a pulse log of a given
+size and times how long it takes until ``GET /`` answers (the health check a
+host waits for) and until ``GET /status`` answers (log and kernel loaded),
+in both startup modes.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+from benchmarks._harness import summarize
+from benchmarks._server import REPO_ROOT, stop_server, wait_until_ready
+from benchmarks.bench_api import synthetic_log, write_log
+
+LOG_SIZES = [1000, 100000, 1000000]
+MODES = ["background", "eager"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def cold_start(workdir: str, mode: str) -> tuple:
+    """
+    Start a server in ``workdir`` and time its first responses.
+
+    Returns:
+        ``(first_response_s, ready_s)`` measured from process launch
+    """
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks._server", "--port", str(port), "--workdir", workdir],
+        cwd=REPO_ROOT,
+        env={**os.environ, "EUYSTACIO_STARTUP": mode},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_until_ready(f"http://127.0.0.1:{port}/", process, timeout=120.0, interval=0.005)
+        first_response = time.perf_counter() - started
+        wait_until_ready(f"http://127.0.0.1:{port}/status", process, timeout=120.0, interval=0.005)
+        ready = time.perf_counter() - started
+    finally:
+        stop_server(process)
+    return first_response, ready
+
+
+def run(options: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Run every startup case and return results keyed by case name."""
+    results = {}
+    rounds = max(1, options['min_rounds'])
+
+    with tempfile.TemporaryDirectory(prefix="euystacio-startup-") as workdir:
+        for size in options.get('log_sizes', LOG_SIZES):
+            write_log(os.path.join(workdir, "pulse_log.json"), synthetic_log(size))
+
+            for mode in MODES:
+                timings = [cold_start(workdir, mode) for _ in range(rounds)]
+                for index, case in enumerate(("first_response", "ready")):
+                    name = f"startup.{case}[mode={mode},log_size={size}]"
+                    results[name] = summarize([timing[index] for timing in timings])
+                    options['report'](name, results[name])
+
+    return results
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Local regression checks of the storage and admission invariants.
+
+Every check builds its own store, index or app in a temporary working
+directory and verifies one invariant that unit timings cannot catch:
+
+    python -m benchmarks.consistency_check
+    python -m benchmarks.consistency_check --only sharded_order
+
+Exits with status 1 if any check fails.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+
+_app_dir = None
+
+
+def _app():
+    """The app module, loaded once per run in its own temporary working directory."""
+    global _app_dir
+    if _app_dir is None:
+        _app_dir = tempfile.mkdtemp(prefix="euystacio-app-")
+        os.chdir(_app_dir)
+        os.environ.update(EUYSTACIO_STARTUP="eager", COMPACTION_INTERVAL="0", PULSE_LISTENER="",
+                          KERNEL_SNAPSHOT_INTERVAL="0")
+    import app
+
+    return app
+
+
+def check_sharded_order(workdir: str) -> str:
+    """Reopening a sharded store keeps the sequence numbers of pulses with equal timestamps."""
+    from sharded_store import ShardedPulseStore
+
+    path = f"{workdir}/pulse_log.json"
+    store = ShardedPulseStore(path, shards=3)
+    batch = [{"timestamp": "2024-01-01T00:00:00Z", "user": f"u{i}", "event": f"e{i}", "sentiment": 0.0}
+             for i in range(6)]
+    store.extend(batch)
+    for i in range(6, 12):
+        store.append({"timestamp": "2024-01-01T00:00:00Z", "user": f"u{i}", "event": f"e{i}", "sentiment": 0.0})
+    written = [entry["event"] for entry in store.entries()]
+    assert written == [f"e{i}" for i in range(12)], f"appended as {written}"
+
+    reopened = [entry["event"] for entry in ShardedPulseStore(path, shards=3).entries()]
+    assert reopened == written, f"reopened as {reopened}, appended as {written}"
+
+    # Trimming the oldest pulses keeps the order of the rest
+    plan = store.prepare_trim(4)
+    store.write_trim(plan)
+    store.commit_trim(plan)
+    reopened = [entry["event"] for entry in ShardedPulseStore(path, shards=3).entries()]
+    assert reopened == written[plan["count"]:], f"after trimming {plan['count']}, reopened as {reopened}"
+    return f"{len(written)} tied pulses in append order, also after a trim"
+
+
+def check_batch_rate_limit(workdir: str) -> str:
+    """Batches and socket frames are admitted no faster than single pulses."""
+    from admission import RateLimiter
+    from pulse_listener import PulseListener
+
+    app = _app()
+    client = app.app.test_client()
+    saved = app.user_limiter
+    app.user_limiter = RateLimiter(1, 10)
+    try:
+        started = time.monotonic()
+        flood = [{"event": f"flood {i}", "sentiment": 0.1, "user": "flooder"} for i in range(1000)]
+        response = client.post("/pulse/batch", json=flood)
+        assert response.status_code == 413, f"1000-pulse batch got {response.status_code}"
+
+        accepted = 0
+        for _ in range(20):
+            response = client.post("/pulse/batch", json=flood[:10])
+            if response.status_code == 200:
+                accepted += 10
+            else:
+                assert response.status_code == 429, f"batch of 10 got {response.status_code}"
+
+        listener = PulseListener("tcp://127.0.0.1:0", app.submit_pulses, admit=app.admit_listener_pulses)
+        frames = [app.serializer.dumps(pulse) for pulse in flood]
+        replies = [app.serializer.loads(reply) for reply in listener.process(frames, "127.0.0.1")]
+        accepted += sum("seq" in reply for reply in replies)
+
+        allowed = 10 + (time.monotonic() - started) * 1 + 1
+        assert accepted <= allowed, f"{accepted} pulses accepted, the limit allows {allowed:.0f}"
+        return f"{accepted} of 1200 pulses accepted at 1 pulse/s with a burst of 10"
+    finally:
+        app.user_limiter = saved
+
+
+def check_batch_kernel_state(workdir: str) -> str:
+    """Pulses ingested as a batch leave the kernel as they would one at a time, as on a follower."""
+    import random
+
+    app = _app()
+    client = app.app.test_client()
+    follower = app.Euystacio(config=app.euystacio_config)
+    with app.ingest_lock:
+        follower.restore(app.euystacio.snapshot())
+
+    rng = random.Random(3)
+    # Batches larger than the kernel's memory limit
+    pulses = [{"event": f"batch kernel {i}", "sentiment": round(rng.uniform(-1, 1), 3)} for i in range(2100)]
+    for start in range(0, len(pulses), 700):
+        response = client.post("/pulse/batch", json=pulses[start:start + 700])
+        assert response.status_code == 200, f"batch got {response.status_code}"
+    for pulse in pulses:
+        follower.receive_input(pulse["event"], pulse["sentiment"], compact=True)
+
+    fields = ["total_inputs", "memory_size", "summarized_inputs", "summary_blocks", "balance_metric",
+              "learning_rate", "adaptation_score"]
+    leader, replica = app.euystacio.get_status(fields), follower.get_status(fields)
+    differing = {field: (leader[field], replica[field]) for field in fields if leader[field] != replica[field]}
+    assert not differing, f"batch vs one at a time: {differing}"
+    return f"{leader['memory_size']} memory entries and {leader['summary_blocks']} summary blocks either way"
+
+
+def check_idempotency_scope(workdir: str) -> str:
+    """Idempotency keys are scoped by user and bound to the body they were first sent with."""
+    app = _app()
+    client = app.app.test_client()
+
+    first = client.post("/pulse", json={"id": "1", "user": "alice", "event": "alice pulse", "sentiment": 0.1})
+    retry = client.post("/pulse", json={"id": "1", "user": "alice", "event": "alice pulse", "sentiment": 0.1})
+    assert retry.headers.get("Idempotent-Replayed") == "true" and retry.get_json()["seq"] == first.get_json()["seq"], \
+        "a retry was not answered with the original response"
+
+    other = client.post("/pulse", json={"id": "1", "user": "bob", "event": "bob pulse", "sentiment": 0.2})
+    assert other.status_code == 200 and "Idempotent-Replayed" not in other.headers, \
+        "another user's pulse with the same id was discarded"
+    assert other.get_json()["seq"] != first.get_json()["seq"], "another user got alice's response"
+
+    changed = client.post("/pulse", json={"id": "1", "user": "alice", "event": "other pulse", "sentiment": 0.3})
+    assert changed.status_code == 422, f"a reused key with a different body got {changed.status_code}"
+
+    batch = [{"user": "carol", "event": "carol pulse", "sentiment": 0.0}]
+    headers = {"Idempotency-Key": "batch-1"}
+    assert client.post("/pulse/batch", json=batch, headers=headers).status_code == 200
+    replayed = client.post("/pulse/batch", json=batch, headers=headers)
+    assert replayed.headers.get("Idempotent-Replayed") == "true", "a batch retry was stored again"
+    dave = client.post("/pulse/batch", json=[{**batch[0], "user": "dave"}], headers=headers)
+    assert dave.status_code == 200 and "Idempotent-Replayed" not in dave.headers, \
+        "another user's batch with the same key was discarded"
+    mismatch = client.post("/pulse/batch", json=batch + batch, headers=headers)
+    assert mismatch.status_code == 422, f"a reused batch key with a different body got {mismatch.status_code}"
+    return "retries replayed, other users' keys independent, changed bodies refused with 422"
+
+
+def check_index_retention(workdir: str) -> str:
+    """Compactions keep the event and pattern indexes as bounded as the log."""
+    from event_index import EventIndex
+    from pattern_index import PatternIndex
+    from pulse_archive import PulseArchive, format_timestamp, parse_timestamp
+    from pulse_store import PulseStore
+    from retention import Compactor, RetentionState
+
+    store = PulseStore(f"{workdir}/pulse_log.json", segment_size=50)
+    events = EventIndex(f"{workdir}/pulse_log.events.jsonl")
+    patterns = PatternIndex(f"{workdir}/pattern_index.jsonl")
+
+    def prune(expired):
+        events.prune(store.offset)
+        patterns.prune(max(parse_timestamp(entry["timestamp"]) for entry in expired))
+
+    compactor = Compactor(store, PulseArchive(f"{workdir}/archive"), RetentionState(f"{workdir}/retention.json"),
+                          max_entries=100, on_trim=prune)
+    sizes = []
+    for round_ in range(20):
+        entries = [{"timestamp": format_timestamp(1.7e9 + round_ * 100 + i), "user": "u",
+                    "event": f"round{round_} pulse{i}", "sentiment": 0.0} for i in range(100)]
+        first = store.extend(entries)
+        events.add_many(first, [entry["event"] for entry in entries])
+        patterns.add({"timestamp": 1.7e9 + round_ * 100 + 99, "direction": "positive", "strength": 0.5})
+        compactor.run_once()
+        sizes.append((len(events), os.path.getsize(events.path), len(patterns)))
+
+    # Only the digits of the sequence numbers in the file may grow
+    tokens, file_bytes, kept_patterns = sizes[-1]
+    assert tokens == sizes[5][0] and file_bytes <= 1.25 * sizes[5][1] and kept_patterns <= 2, \
+        f"index sizes grew across compactions: {sizes}"
+    assert events.search("round0") == [], "search returned pulses removed from the log"
+    assert min(events.search("pulse1")) >= store.offset, "search returned seqs below the store offset"
+    assert EventIndex(events.path).search("round0") == [], "the reloaded index kept removed pulses"
+    return f"{tokens} tokens, {file_bytes:,} bytes and {kept_patterns} pattern(s) after 20 compactions"
+
+
+def check_endpoint_lists(workdir: str) -> str:
+    """The 404 response and ``GET /`` list every route the app serves."""
+    app = _app()
+    client = app.app.test_client()
+    listed = client.get("/no-such-endpoint").get_json()["available_endpoints"]
+    documented = client.get("/").get_json()["endpoints"]
+    routes = set()
+    for rule in app.app.url_map.iter_rules():
+        if rule.endpoint != "static" and (app.DEBUG_MEMORY or not rule.rule.startswith("/debug/")):
+            routes.update(f"{method} {rule.rule}" for method in rule.methods - {"HEAD", "OPTIONS"})
+    assert set(listed) == routes, f"404 lists {sorted(set(listed) ^ routes)} wrongly"
+    assert set(documented) == routes, f"GET / lists {sorted(set(documented) ^ routes)} wrongly"
+    return f"{len(routes)} endpoints listed by the 404 response and GET /"
+
+
+def check_startup_health(workdir: str) -> str:
+    """``GET /`` reports a starting or failed startup, and a failed one with 503."""
+    app = _app()
+    client = app.app.test_client()
+    states = {}
+    try:
+        app.startup_complete.clear()
+        states["starting"] = client.get("/")
+        app.startup_complete.set()
+        states["healthy"] = client.get("/")
+        app.startup_error = "pulse log unreadable"
+        states["failed"] = client.get("/")
+    finally:
+        app.startup_error = None
+        app.startup_complete.set()
+
+    codes = {"starting": 200, "healthy": 200, "failed": 503}
+    for status, response in states.items():
+        reported = response.get_json()
+        assert (response.status_code, reported["status"], reported["ready"]) == \
+               (codes[status], status, status == "healthy"), \
+            f"{status} startup answered {response.status_code} with {reported['status']!r}"
+    return "starting 200, healthy 200, failed 503"
+
+
+def check_log_during_compaction(workdir: str) -> str:
+    """Search results and the recent window stay correct while compactions trim the log."""
+    import json
+    import threading
+
+    from pulse_store import PulseStore
+    from sharded_store import ShardedPulseStore
+
+    reads = 0
+    for store in (PulseStore(f"{workdir}/pulse_log.json", segment_size=50),
+                  ShardedPulseStore(f"{workdir}/sharded_log.json", shards=3, segment_size=50)):
+        def pulses(count):
+            first = store.next_seq()
+            return [{"timestamp": "2024-01-01T00:00:00Z", "user": f"u{seq % 7}", "event": f"pulse {seq}",
+                     "sentiment": 0.0} for seq in range(first, first + count)]
+
+        store.extend(pulses(1000))
+        done = threading.Event()
+
+        def compact():
+            try:
+                for _ in range(100):
+                    if done.is_set():
+                        break
+                    store.extend(pulses(50))
+                    plan = store.prepare_trim(50)
+                    store.write_trim(plan)
+                    store.commit_trim(plan)
+            finally:
+                done.set()
+
+        compactor = threading.Thread(target=compact)
+        compactor.start()
+        try:
+            while not done.is_set():
+                hits = list(range(store.next_seq() - 1050, store.next_seq(), 3))
+                encoded, matched, _ = store.encode_selection(seqs=hits)
+                events = [entry["event"] for entry in json.loads(encoded)]
+                assert len(events) == matched, f"{len(events)} entries encoded, {matched} matched"
+                wanted = {f"pulse {seq}" for seq in hits}
+                assert set(events) <= wanted, \
+                    f"{type(store).__name__} returned {sorted(set(events) - wanted)[:3]}, which are not search hits"
+                recent = [int(entry["event"].split()[1]) for entry in store.tail(10)]
+                assert recent == list(range(recent[0], recent[0] + 10)), f"recent window {recent}"
+                reads += 1
+        finally:
+            done.set()
+            compactor.join()
+    return f"{reads} searches and recent windows read during 200 trims"
+
+
+def check_export_during_compaction(workdir: str) -> str:
+    """``/export`` and the replication feed keep every pulse at its seq while compactions archive the log."""
+    import json
+    import threading
+
+    app = _app()
+    client = app.app.test_client()
+    saved = app.compactor.max_entries, app.compactor.use_archive
+    app.compactor.max_entries, app.compactor.use_archive = 30, True
+    base = app.pulse_store.next_seq()
+    done = threading.Event()
+
+    def ingest_and_compact():
+        try:
+            for _ in range(150):
+                if done.is_set():
+                    break
+                first = app.pulse_store.next_seq()
+                app.submit_pulses([{"event": f"pulse {seq}", "sentiment": 0.0} for seq in range(first, first + 20)])
+                app.compactor.run_once()
+        finally:
+            done.set()
+
+    writer = threading.Thread(target=ingest_and_compact)
+    writer.start()
+    exports = 0
+    feed_seq = base
+    try:
+        while not done.is_set():
+            response = client.get("/export")
+            assert response.status_code == 200, f"/export answered {response.status_code}"
+            exported = [int(entry["event"].split()[1]) for entry in map(json.loads, response.data.splitlines())
+                        if entry["event"].startswith("pulse ")]
+            assert exported == list(range(base, base + len(exported))), \
+                f"/export skipped or repeated pulses after {base}: {exported[:3]}...{exported[-3:]}"
+            exports += 1
+
+            feed = client.get(f"/replication/feed?start={feed_seq}&limit=50").get_json()
+            assert feed["start"] == feed_seq, f"feed asked from {feed_seq} started at {feed['start']}"
+            events = [entry["event"] for entry in feed["entries"]]
+            assert events == [f"pulse {seq}" for seq in range(feed_seq, feed["next"])], \
+                f"feed from {feed_seq} returned {events[:3]}"
+            feed_seq = feed["next"]
+    finally:
+        done.set()
+        writer.join()
+        app.compactor.max_entries, app.compactor.use_archive = saved
+    return f"{exports} exports and the feed up to seq {feed_seq} complete during 150 compactions"
+
+
+def check_pattern_load(workdir: str) -> str:
+    """Loading the pattern index scales linearly and its strength index matches a full scan."""
+    import random
+
+    from pattern_index import PatternIndex
+
+    rng = random.Random(7)
+    timings = {}
+    for count in (50_000, 200_000):
+        path = f"{workdir}/patterns-{count}.jsonl"
+        index = PatternIndex(path)
+        with open(path, "wb") as f:
+            f.write(b"".join(index.serializer.dumps({"timestamp": 1.7e9 + i, "strength": rng.random(),
+                                                     "direction": rng.choice(["positive", "negative"])}) + b"\n"
+                             for i in range(count)))
+        started = time.perf_counter()
+        index = PatternIndex(path)
+        timings[count] = time.perf_counter() - started
+
+        for _ in range(2):
+            strong = index.query(min_strength=0.99)
+            scanned = [pattern for pattern in index.query() if pattern["strength"] >= 0.99]
+            assert strong == scanned, f"min_strength found {len(strong)} patterns, a scan {len(scanned)}"
+            index.prune(1.7e9 + count / 2)
+
+    # Four times the patterns; an insort per pattern grows quadratically
+    ratio = timings[200_000] / timings[50_000]
+    assert ratio < 8, f"loading 4x the patterns took {ratio:.1f}x as long: {timings}"
+    return f"200,000 patterns loaded in {timings[200_000]:.2f}s, {ratio:.1f}x the time of 50,000"
+
+
+def check_import_order(workdir: str) -> str:
+    """Bulk imports reject rows older than the log tail instead of logging them out of order."""
+    import contextlib
+    import io
+    import json
+
+    import pulse_import
+    from pulse_archive import format_timestamp, parse_timestamp
+
+    app = _app()
+    client = app.app.test_client()
+    client.post("/pulse", json={"event": "live pulse", "sentiment": 0.1})
+    newest = parse_timestamp(app.pulse_store.entries_at([len(app.pulse_store) - 1])[0]["timestamp"])
+    before = len(app.pulse_store)
+
+    # Two batches: the second holds rows older than the first one's
+    path = f"{workdir}/import.jsonl"
+    offsets = [10, 30, 20, 40, -50, 5, 60, -10]
+    with open(path, "w", encoding="utf-8") as f:
+        for i, offset in enumerate(offsets):
+            f.write(json.dumps({"timestamp": format_timestamp(newest + offset), "event": f"row {i}",
+                                "sentiment": 0.0}) + "\n")
+    saved_argv, saved_chunk = sys.argv, pulse_import.VALIDATE_CHUNK_ROWS
+    pulse_import.VALIDATE_CHUNK_ROWS = 4
+    sys.argv = ["pulse_import.py", path, "--workers", "1", "--batch-size", "4", "--errors", f"{workdir}/errors.jsonl"]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert pulse_import.main() == 0, "the import failed"
+    finally:
+        sys.argv, pulse_import.VALIDATE_CHUNK_ROWS = saved_argv, saved_chunk
+
+    stamps = [parse_timestamp(entry["timestamp"]) for entry in app.pulse_store.entries()]
+    assert stamps == sorted(stamps), "the log is out of chronological order"
+    imported = len(app.pulse_store) - before
+    with open(f"{workdir}/errors.jsonl", encoding="utf-8") as f:
+        rejected = [json.loads(line)["row"] for line in f]
+    # Rows 5, 6 and 8 (1-based) are older than row 4, the newest of the first batch
+    assert imported == 5 and sorted(rejected) == [5, 6, 8], f"imported {imported}, rejected rows {rejected}"
+    return f"{imported} rows imported in order, rows {sorted(rejected)} rejected as older than the log tail"
+
+
+CHECKS = {
+    "sharded_order": check_sharded_order,
+    "batch_rate_limit": check_batch_rate_limit,
+    "batch_kernel_state": check_batch_kernel_state,
+    "idempotency_scope": check_idempotency_scope,
+    "index_retention": check_index_retention,
+    "endpoint_lists": check_endpoint_lists,
+    "startup_health": check_startup_health,
+    "log_during_compaction": check_log_during_compaction,
+    "export_during_compaction": check_export_during_compaction,
+    "pattern_load": check_pattern_load,
+    "import_order": check_import_order,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check storage and admission invariants")
+    parser.add_argument("--only", action="append", choices=sorted(CHECKS), help="Run only this check (repeatable)")
+    args = parser.parse_args()
+
+    failures = 0
+    for name in args.only or CHECKS:
+        workdir = tempfile.mkdtemp(prefix=f"euystacio-{name}-")
+        try:
+            print(f"  ✅ {name}: {CHECKS[name](workdir)}")
+        except Exception:
+            failures += 1
+            print(f"  ❌ {name}:\n{traceback.format_exc()}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if _app_dir is not None:
+        shutil.rmtree(_app_dir, ignore_errors=True)
+    if failures:
+        print(f"❌ {failures} check(s) failed")
+        return 1
+    print("🎉 All checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Local check of every ingest path.
+
+Starts a backend with the socket listener enabled in a temporary working
+directory, sends the same number of pulses through ``POST /pulse`` (JSON and
+MessagePack), ``POST /pulse/batch`` and the TCP listener (line and
+length-prefixed framing), prints pulses/s per path and verifies that the
+kernel applied every pulse:
+
+    python -m benchmarks.ingest_check --pulses 2000
+
+Exits with status 1 if any pulse is rejected or missing.
+"""
+
+import argparse
+import json
+import shutil
+import socket
+import struct
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List
+
+from benchmarks._server import start_server, stop_server
+from serialization import msgpack
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _post(url: str, body: bytes, content_type: str) -> Dict[str, Any]:
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": content_type}, method="POST")
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def _read_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Listener closed the connection")
+        data += chunk
+    return data
+
+
+def send_http(base_url: str, pulses: List[Dict[str, Any]], binary: bool) -> int:
+    """One ``POST /pulse?compact=1`` per pulse; returns rejected pulses."""
+    rejected = 0
+    for pulse in pulses:
+        if binary:
+            reply = _post(f"{base_url}/pulse?compact=1", msgpack.packb(pulse), "application/msgpack")
+        else:
+            reply = _post(f"{base_url}/pulse?compact=1", json.dumps(pulse).encode(), "application/json")
+        rejected += reply.get("status") != "success"
+    return rejected
+
+
+def send_batches(base_url: str, pulses: List[Dict[str, Any]], batch_size: int) -> int:
+    """``POST /pulse/batch`` in chunks of ``batch_size``; returns rejected pulses."""
+    rejected = 0
+    for start in range(0, len(pulses), batch_size):
+        reply = _post(f"{base_url}/pulse/batch", json.dumps(pulses[start:start + batch_size]).encode(),
+                      "application/json")
+        rejected += reply["rejected"]
+    return rejected
+
+
+def send_socket(port: int, pulses: List[Dict[str, Any]], framing: str) -> int:
+    """Stream all pulses over one connection and read every reply; returns rejected pulses."""
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        if framing == "line":
+            sock.sendall(b"".join(json.dumps(pulse).encode() + b"\n" for pulse in pulses))
+            replies = sock.makefile("rb")
+            return sum("error" in json.loads(replies.readline()) for _ in pulses)
+
+        frames = [msgpack.packb(pulse) for pulse in pulses]
+        sock.sendall(b"".join(struct.pack(">I", len(frame)) + frame for frame in frames))
+        rejected = 0
+        for _ in frames:
+            (size,) = struct.unpack(">I", _read_exact(sock, 4))
+            rejected += "error" in msgpack.unpackb(_read_exact(sock, size))
+        return rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send pulses through every ingest path and verify them")
+    parser.add_argument("--pulses", type=int, default=1000, help="Pulses per path (default: 1000)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Pulses per /pulse/batch request")
+    args = parser.parse_args()
+
+    if msgpack is None:
+        print("❌ msgpack is required for the MessagePack paths (pip install msgpack)")
+        return 1
+
+    workdir = tempfile.mkdtemp(prefix="euystacio-ingest-")
+    port = _free_port()
+    paths = ["http_json", "http_msgpack", "http_batch", "socket_line", "socket_length"]
+    listener_ports = {"line": _free_port(), "length": _free_port()}
+    servers = []
+    try:
+        total = 0
+        for framing, listener_port in listener_ports.items():
+            # One server per framing; the HTTP paths run against the first
+            server_port = port if framing == "line" else _free_port()
+            servers.append((server_port, start_server(server_port, f"{workdir}/{framing}", env={
+                "PULSE_LISTENER": f"tcp://127.0.0.1:{listener_port}",
+                "PULSE_LISTENER_FRAMING": framing
+            })))
+
+        base_url = f"http://127.0.0.1:{port}"
+        failures = 0
+        for path in paths:
+            pulses = [{"event": f"{path} {i}", "sentiment": round((i % 21) / 10 - 1, 1), "user": f"edge-{i % 5}"}
+                      for i in range(args.pulses)]
+            started = time.perf_counter()
+            if path == "http_json":
+                rejected = send_http(base_url, pulses, binary=False)
+            elif path == "http_msgpack":
+                rejected = send_http(base_url, pulses, binary=True)
+            elif path == "http_batch":
+                rejected = send_batches(base_url, pulses, args.batch_size)
+            else:
+                rejected = send_socket(listener_ports[path.split("_")[1]], pulses, path.split("_")[1])
+            elapsed = time.perf_counter() - started
+            failures += rejected
+            print(f"  {path:<14} {args.pulses / elapsed:>10,.0f} pulses/s  ({rejected} rejected)")
+
+        for server_port, _ in servers:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server_port}/status", timeout=10) as response:
+                total += json.loads(response.read())["total_inputs"]
+        expected = args.pulses * len(paths)
+        if failures or total != expected:
+            print(f"❌ Kernels applied {total} of {expected} pulses ({failures} rejected)")
+            return 1
+        print(f"✅ All {expected} pulses stored and applied")
+        return 0
+    finally:
+        for _, process in servers:
+            stop_server(process)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Euystacio Load Generator
+Synthetic load and soak testing for the pulse API.
+
+Drives ``POST /pulse`` at a configurable rate and concurrency while simulated
+dashboards replay ``connect.html``'s polling cadence (``/log?limit=50`` every
+15 s, ``/status`` every 30 s) and optional closed-loop readers hit a weighted
+mix of read endpoints. Every reporting interval it prints throughput, latency
+percentiles per endpoint, server RSS and on-disk store size.
+
+By default a fresh backend is started locally in a temporary directory, so no
+external services are involved:
+
+    python -m benchmarks.loadgen --duration 120 --pulse-rate 50 --dashboards 20
+    python -m benchmarks.loadgen --seed-log 100000 --time-scale 0.1 --output soak.json
+    python -m benchmarks.loadgen --url http://127.0.0.1:5000 --server-pid 1234
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from benchmarks import _harness
+from benchmarks._server import start_server, stop_server
+
+# Polling cadence of connect.html (seconds): ui.refreshInterval and healthCheck
+DASHBOARD_SCHEDULE = [
+    ("/log?limit=50", 15.0),
+    ("/status", 30.0),
+]
+
+READ_ENDPOINTS = {
+    "log": "/log?limit=50",
+    "log_full": "/log",
+    "status": "/status",
+    "metrics": "/metrics",
+    "kernel": "/kernel",
+}
+
+USERS = ["hannesmitterer", "Seed-Bringer", "anonymous", "collector-1", "collector-2"]
+ROLES = ["tutor", "visitor", "collector"]
+
+
+class Recorder:
+    """Thread-safe collector of request latencies for the current interval."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = defaultdict(list)
+        self._errors = defaultdict(int)
+        self.totals = defaultdict(int)
+        self.total_errors = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self._latencies[endpoint].append(seconds)
+                self.totals[endpoint] += 1
+            else:
+                self._errors[endpoint] += 1
+                self.total_errors[endpoint] += 1
+
+    def drain(self):
+        """Return and reset the latencies and errors gathered so far."""
+        with self._lock:
+            latencies, errors = self._latencies, self._errors
+            self._latencies, self._errors = defaultdict(list), defaultdict(int)
+        return latencies, errors
+
+
+class Client:
+    """Persistent HTTP connection that reconnects after failures."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parsed = urllib.parse.urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.https = parsed.scheme == "https"
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> int:
+        if self.conn is None:
+            factory = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self.conn = factory(self.host, self.port, timeout=self.timeout)
+        try:
+            self.conn.request(method, path, body=body, headers=headers or {})
+            response = self.conn.getresponse()
+            response.read()
+            if response.getheader("Connection", "").lower() == "close":
+                self.close()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def _timed(client: Client, recorder: Recorder, name: str, method: str, path: str,
+           body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None) -> None:
+    t0 = time.perf_counter()
+    try:
+        ok = client.request(method, path, body, headers) < 400
+    except (OSError, http.client.HTTPException):
+        ok = False
+    recorder.record(name, time.perf_counter() - t0, ok)
+
+
+def pulse_writer(base_url: str, rate: float, stop: threading.Event, recorder: Recorder,
+                 seed: int, timeout: float) -> None:
+    """Send pulses at ``rate`` per second (closed loop when rate is 0)."""
+    rng = random.Random(seed)
+    client = Client(base_url, timeout)
+    headers = {"Content-Type": "application/json"}
+    interval = 1.0 / rate if rate > 0 else 0.0
+    next_send = time.perf_counter()
+    sequence = 0
+
+    while not stop.is_set():
+        if interval:
+            delay = next_send - time.perf_counter()
+            if delay > 0 and stop.wait(delay):
+                break
+            next_send += interval
+
+        sequence += 1
+        body = json.dumps({
+            "event": f"Load pulse {seed}-{sequence}",
+            "sentiment": round(rng.uniform(-1, 1), 3),
+            "role": rng.choice(ROLES),
+            "user": rng.choice(USERS)
+        }).encode()
+        _timed(client, recorder, "POST /pulse", "POST", "/pulse", body, headers)
+
+    client.close()
+
+
+def dashboard(base_url: str, time_scale: float, stop: threading.Event, recorder: Recorder,
+              seed: int, timeout: float) -> None:
+    """Replay one connect.html dashboard's polling schedule."""
+    rng = random.Random(seed)
+    client = Client(base_url, timeout)
+    start = time.perf_counter()
+    # Dashboards load their initial data on page load, then poll on timers
+    # whose phase depends on when the page was opened.
+    schedule = [(path, period * time_scale, start + rng.uniform(0, period * time_scale))
+                for path, period in DASHBOARD_SCHEDULE]
+    for path, _, _ in schedule:
+        _timed(client, recorder, f"GET {path}", "GET", path)
+
+    while not stop.is_set():
+        index, (path, period, due) = min(enumerate(schedule), key=lambda item: item[1][2])
+        delay = due - time.perf_counter()
+        if delay > 0 and stop.wait(delay):
+            break
+        _timed(client, recorder, f"GET {path}", "GET", path)
+        schedule[index] = (path, period, due + period)
+
+    client.close()
+
+
+def reader(base_url: str, mix: Dict[str, float], stop: threading.Event, recorder: Recorder,
+           seed: int, timeout: float) -> None:
+    """Closed-loop reader choosing endpoints by weight."""
+    rng = random.Random(seed)
+    client = Client(base_url, timeout)
+    paths = [READ_ENDPOINTS[name] for name in mix]
+    weights = list(mix.values())
+
+    while not stop.is_set():
+        path = rng.choices(paths, weights)[0]
+        _timed(client, recorder, f"GET {path}", "GET", path)
+
+    client.close()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def read_rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """Resident set size of ``pid`` from /proc, or psutil when available."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+def directory_bytes(path: Optional[str]) -> Optional[int]:
+    """Total size of the files under the server's working directory."""
+    if path is None or not os.path.isdir(path):
+        return None
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def summarize_interval(elapsed: float, window: float, latencies, errors, rss, store_bytes) -> Dict[str, Any]:
+    endpoints = {}
+    for name in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(name, []))
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "throughput_rps": len(values) / window if window > 0 else 0.0,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": (values[-1] if values else 0.0) * 1000
+        }
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "window_s": round(window, 3),
+        "total_rps": sum(e["requests"] for e in endpoints.values()) / window if window > 0 else 0.0,
+        "rss_bytes": rss,
+        "store_bytes": store_bytes,
+        "endpoints": endpoints
+    }
+
+
+def print_interval(sample: Dict[str, Any]) -> None:
+    rss = f"{sample['rss_bytes'] / 2**20:.1f} MiB" if sample['rss_bytes'] is not None else "n/a"
+    size = f"{sample['store_bytes'] / 2**20:.2f} MiB" if sample['store_bytes'] is not None else "n/a"
+    print(f"⏱️  t={sample['elapsed_s']:>7.1f}s  {sample['total_rps']:>8.1f} req/s  RSS {rss}  store {size}")
+    for name, stats in sample["endpoints"].items():
+        print(f"     {name:<22} {stats['throughput_rps']:>8.1f}/s  p50 {stats['p50_ms']:>8.1f}ms"
+              f"  p95 {stats['p95_ms']:>8.1f}ms  p99 {stats['p99_ms']:>8.1f}ms  errors {stats['errors']}")
+
+
+def seed_log(workdir: str, count: int) -> None:
+    """Pre-populate the server's pulse log before it starts."""
+    from benchmarks.bench_api import synthetic_log, write_log
+    write_log(os.path.join(workdir, "pulse_log.json"), synthetic_log(count))
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in READ_ENDPOINTS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown endpoint {name!r}; choose from {', '.join(READ_ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Synthetic load generator and soak test for the Euystacio pulse API"
+    )
+    parser.add_argument("--url", help="Target an already running backend instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="PID of the --url server, for RSS sampling")
+    parser.add_argument("--server-dir", help="Working directory of the --url server, for store size sampling")
+    parser.add_argument("--port", type=int, default=5055, help="Port for the locally started server")
+    parser.add_argument("--workdir", help="Working directory for the local server (default: temporary)")
+    parser.add_argument("--seed-log", type=int, default=0, help="Pre-populate the local pulse log with N entries")
+    parser.add_argument("--duration", type=float, default=60.0, help="Test duration in seconds")
+    parser.add_argument("--interval", type=float, default=5.0, help="Reporting interval in seconds")
+    parser.add_argument("--pulse-rate", type=float, default=10.0,
+                        help="Total target pulses/sec across writers (0 = as fast as possible)")
+    parser.add_argument("--writers", type=int, default=2, help="Concurrent pulse writers")
+    parser.add_argument("--dashboards", type=int, default=10, help="Simulated connect.html dashboards")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Multiplier for dashboard polling periods (0.1 = ten times faster)")
+    parser.add_argument("--readers", type=int, default=0, help="Closed-loop readers using --read-mix")
+    parser.add_argument("--read-mix", type=parse_mix, default=parse_mix("log=3,status=1,metrics=1"),
+                        help="Weighted read endpoints, e.g. log=3,status=1,metrics=1,kernel=1,log_full=1")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", help="Write the time series and summary as JSON")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment variable for the local server; may be repeated")
+
+    args = parser.parse_args()
+
+    print("🌑 Euystacio Load Generator")
+    print("=" * 30)
+
+    process = None
+    temp_dir = None
+    base_url = args.url
+    server_pid = args.server_pid
+    server_dir = args.server_dir
+
+    if base_url is None:
+        server_dir = args.workdir or tempfile.mkdtemp(prefix="euystacio-load-")
+        temp_dir = None if args.workdir else server_dir
+        os.makedirs(server_dir, exist_ok=True)
+        if args.seed_log:
+            print(f"🌱 Seeding pulse log with {args.seed_log} entries...")
+            seed_log(server_dir, args.seed_log)
+        env = dict(item.split("=", 1) for item in args.server_env)
+        print(f"🚀 Starting backend on port {args.port} in {server_dir}")
+        process = start_server(args.port, server_dir, env=env,
+                               log_path=os.path.join(server_dir, "server.log"))
+        base_url = f"http://127.0.0.1:{args.port}"
+        server_pid = process.pid
+
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = []
+
+    for i in range(args.writers):
+        rate = args.pulse_rate / args.writers if args.pulse_rate > 0 else 0.0
+        threads.append(threading.Thread(target=pulse_writer, daemon=True,
+                                        args=(base_url, rate, stop, recorder, 1000 + i, args.timeout)))
+    for i in range(args.dashboards):
+        threads.append(threading.Thread(target=dashboard, daemon=True,
+                                        args=(base_url, args.time_scale, stop, recorder, 2000 + i, args.timeout)))
+    for i in range(args.readers):
+        threads.append(threading.Thread(target=reader, daemon=True,
+                                        args=(base_url, args.read_mix, stop, recorder, 3000 + i, args.timeout)))
+
+    print(f"📈 {args.writers} writer(s) at {args.pulse_rate or 'max'} pulses/s, "
+          f"{args.dashboards} dashboard(s), {args.readers} reader(s) for {args.duration:.0f}s\n")
+
+    samples = []
+    started = time.perf_counter()
+    deadline = started + args.duration
+    last = started
+    try:
+        for thread in threads:
+            thread.start()
+        while last < deadline:
+            time.sleep(max(0.0, min(last + args.interval, deadline) - time.perf_counter()))
+            now = time.perf_counter()
+            latencies, errors = recorder.drain()
+            sample = summarize_interval(now - started, now - last, latencies, errors,
+                                        read_rss_bytes(server_pid), directory_bytes(server_dir))
+            samples.append(sample)
+            print_interval(sample)
+            last = now
+    except KeyboardInterrupt:
+        print("\n⚠️  Interrupted, stopping load")
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=args.timeout)
+        if process is not None:
+            stop_server(process)
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        "duration_s": round(elapsed, 3),
+        "requests": dict(recorder.totals),
+        "errors": dict(recorder.total_errors),
+        "pulses_per_s": recorder.totals.get("POST /pulse", 0) / elapsed if elapsed > 0 else 0.0,
+        "final_rss_bytes": samples[-1]["rss_bytes"] if samples else None,
+        "final_store_bytes": samples[-1]["store_bytes"] if samples else None,
+    }
+
+    print(f"\n📊 Sustained {summary['pulses_per_s']:.1f} pulses/s over {elapsed:.1f}s; "
+          f"{sum(summary['errors'].values())} failed request(s)")
+
+    if args.output:
+        _harness.write_results(args.output, {
+            "environment": _harness.environment_info(),
+            "config": {k: v for k, v in vars(args).items() if k != "read_mix"} | {"read_mix": args.read_mix},
+            "samples": samples,
+            "summary": summary
+        })
+        print(f"📝 Results written to {args.output}")
+
+    if temp_dir is not None:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Multi-process replication check.
+
+Starts a leader and several followers locally, each in its own working
+directory, sends pulses to all of them concurrently (followers forward writes
+to the leader) and verifies that every replica converges to the same kernel
+state:
+
+    python -m benchmarks.replica_check --followers 3 --pulses 500
+
+Exits with status 1 if the replicas do not converge within ``--timeout``.
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Any, Dict, List
+
+from benchmarks._server import start_server, stop_server
+
+CONVERGED_FIELDS = ("balance_metric", "learning_rate", "adaptation_score", "total_inputs")
+
+
+def _post_pulse(base_url: str, payload: Dict[str, Any]) -> int:
+    request = urllib.request.Request(f"{base_url}/pulse?compact=1", data=json.dumps(payload).encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.status
+
+
+def _kernel_state(base_url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(f"{base_url}/kernel?fields={','.join(CONVERGED_FIELDS)}", timeout=10) as response:
+        return json.loads(response.read())
+
+
+def send_pulses(urls: List[str], count: int, concurrency: int, seed: int) -> int:
+    """Send ``count`` random-walk pulses spread over all nodes; returns failures."""
+    rng = random.Random(seed)
+    value = 0.0
+    payloads = []
+    for i in range(count):
+        value = max(-1.0, min(1.0, value + rng.uniform(-0.3, 0.3)))
+        payloads.append({"event": f"replica check {i}", "sentiment": round(value, 3), "user": f"user-{i % 7}"})
+
+    failures = []
+    lock = threading.Lock()
+
+    def worker(offset):
+        for i in range(offset, count, concurrency):
+            try:
+                _post_pulse(urls[i % len(urls)], payloads[i])
+            except OSError as e:
+                with lock:
+                    failures.append(str(e))
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(failures)
+
+
+def wait_for_convergence(urls: List[str], expected_inputs: int, timeout: float) -> List[Dict[str, Any]]:
+    """Poll every node until all report the same state with ``expected_inputs`` applied."""
+    deadline = time.time() + timeout
+    while True:
+        states = [_kernel_state(url) for url in urls]
+        if all(state == states[0] for state in states) and states[0]["total_inputs"] == expected_inputs:
+            return states
+        if time.time() > deadline:
+            return states
+        time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that leader and follower replicas converge")
+    parser.add_argument("--followers", type=int, default=2, help="Number of follower processes (default: 2)")
+    parser.add_argument("--pulses", type=int, default=300, help="Pulses to send (default: 300)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent writers (default: 4)")
+    parser.add_argument("--port", type=int, default=5301, help="Leader port; followers use the next ones")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for convergence")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="euystacio-replicas-")
+    leader_url = f"http://127.0.0.1:{args.port}"
+    processes = []
+    try:
+        processes.append(start_server(args.port, f"{root}/leader", env={"EUYSTACIO_ROLE": "leader"}))
+        for i in range(1, args.followers + 1):
+            processes.append(start_server(args.port + i, f"{root}/follower-{i}", env={
+                "EUYSTACIO_ROLE": "follower",
+                "EUYSTACIO_LEADER_URL": leader_url
+            }))
+        urls = [f"http://127.0.0.1:{args.port + i}" for i in range(args.followers + 1)]
+        print(f"🚀 Leader on {urls[0]}, {args.followers} follower(s) on {', '.join(urls[1:])}")
+
+        started = time.time()
+        failures = send_pulses(urls, args.pulses, args.concurrency, args.seed)
+        print(f"📤 Sent {args.pulses} pulse(s) in {time.time() - started:.1f}s ({failures} failed)")
+
+        states = wait_for_convergence(urls, args.pulses - failures, args.timeout)
+        for url, state in zip(urls, states):
+            print(f"   {url}: " + ", ".join(f"{field}={state[field]}" for field in CONVERGED_FIELDS))
+
+        if failures or any(state != states[0] for state in states):
+            print("❌ Replicas did not converge")
+            return 1
+        print("✅ All replicas converged")
+        return 0
+
+    finally:
+        for process in processes:
+            stop_server(process)
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Euystacio Benchmark Runner
+Runs the kernel, API and startup benchmarks, writes JSON results and compares them
+against a stored baseline.
+
+Examples:
+    python -m benchmarks.run
+    python -m benchmarks.run --suite kernel --output bench_output.json
+    python -m benchmarks.run --suite startup --log-sizes 1000,100000
+    python -m benchmarks.run --log-sizes 1000,100000 --threshold 0.3
+    python -m benchmarks.run --save-baseline
+"""
+
+import argparse
+import os
+import sys
+
+from benchmarks import _harness
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _threshold_overrides(values):
+    overrides = {}
+    for value in values or []:
+        case, _, threshold = value.rpartition("=")
+        if not case:
+            raise argparse.ArgumentTypeError(f"Expected CASE=THRESHOLD, got {value!r}")
+        overrides[case] = float(threshold)
+    return overrides
+
+
+def _report(name, result):
+    print(f"  {name:<90} {result['median_s'] * 1e6:>12.1f} µs/op  ({result['rounds']} rounds)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run Euystacio benchmarks and check for regressions"
+    )
+    parser.add_argument(
+        "--suite",
+        choices=["kernel", "api", "startup", "all"],
+        default="all",
+        help="Which benchmark suite to run (default: all)"
+    )
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument(
+        "--baseline",
+        default=DEFAULT_BASELINE,
+        help="Baseline JSON file to compare against (default: benchmarks/baseline.json)"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the new baseline instead of comparing"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown as a fraction of the baseline median (default: 0.25)"
+    )
+    parser.add_argument(
+        "--case-threshold",
+        action="append",
+        metavar="CASE=THRESHOLD",
+        help="Per-case threshold override; may be given multiple times"
+    )
+    parser.add_argument("--memory-limits", type=_int_list, help="Comma-separated kernel memory limits")
+    parser.add_argument("--pattern-windows", type=_int_list, help="Comma-separated kernel pattern windows")
+    parser.add_argument("--log-sizes", type=_int_list, help="Comma-separated pulse log sizes for API and startup cases")
+    parser.add_argument("--min-rounds", type=int, default=3, help="Minimum timed rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds spent per case")
+
+    args = parser.parse_args()
+    overrides = _threshold_overrides(args.case_threshold)
+
+    options = {
+        'min_rounds': args.min_rounds,
+        'min_time': args.min_time,
+        'report': _report
+    }
+    if args.memory_limits:
+        options['memory_limits'] = args.memory_limits
+    if args.pattern_windows:
+        options['pattern_windows'] = args.pattern_windows
+    if args.log_sizes:
+        options['log_sizes'] = args.log_sizes
+
+    print("🌑 Euystacio Benchmarks")
+    print("=" * 30)
+
+    results = {}
+    if args.suite in ["kernel", "all"]:
+        from benchmarks import bench_kernel
+        print("🧠 Kernel")
+        results.update(bench_kernel.run(options))
+
+    if args.suite in ["api", "all"]:
+        from benchmarks import bench_api
+        print("🌐 API")
+        results.update(bench_api.run(options))
+
+    if args.suite in ["startup", "all"]:
+        from benchmarks import bench_startup
+        print("🚀 Startup")
+        results.update(bench_startup.run(options))
+
+    output = {"environment": _harness.environment_info(), "results": results}
+
+    if args.output:
+        _harness.write_results(args.output, output)
+        print(f"\n📝 Results written to {args.output}")
+
+    if args.save_baseline:
+        if os.path.exists(args.baseline):
+            previous = _harness.load_results(args.baseline)
+            output["thresholds"] = previous.get("thresholds", {})
+            output["results"] = {**previous.get("results", {}), **results}
+        _harness.write_results(args.baseline, output)
+        print(f"📋 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  No baseline found at {args.baseline}; use --save-baseline to create one")
+        return 0
+
+    report = _harness.compare(output, _harness.load_results(args.baseline), args.threshold, overrides)
+    regressions = [r for r in report if r['regressed']]
+
+    print(f"\n📊 Compared {len(report)} cases against {args.baseline}")
+    for r in report:
+        marker = "❌" if r['regressed'] else "✅"
+        print(f"  {marker} {r['case']:<90} x{r['ratio']:.2f} (limit x{1 + r['threshold']:.2f})")
+
+    if args.output:
+        output["comparison"] = report
+        _harness.write_results(args.output, output)
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) detected")
+        return 1
+
+    print("\n🎉 No regressions detected")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
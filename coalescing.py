@@ -0,0 +1,74 @@
+"""
+Single-flight coalescing of identical concurrent computations.
+
+When several threads ask for the same key at once, the first one runs the
+computation and the others wait for its result instead of repeating it.
+Nothing is cached: once the computation finishes, the next request for the
+key starts a new one. Keys should include everything the result depends on
+(route, arguments and a version of the underlying state).
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """One in-flight computation and the threads waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one computation per key at a time and shares its result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.requests = 0
+        self.executions = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Return ``func()``, sharing one execution among concurrent callers with the same key.
+
+        Raises:
+            Whatever ``func`` raised, in every caller that shared the execution
+        """
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+
+        if leader:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+        return call.result
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests seen, computations run and the share of requests that were coalesced."""
+        with self._lock:
+            requests, executions = self.requests, self.executions
+        coalesced = requests - executions
+        return {
+            'requests': requests,
+            'executions': executions,
+            'coalesced': coalesced,
+            'ratio': round(coalesced / requests, 4) if requests else 0.0
+        }
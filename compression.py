@@ -0,0 +1,138 @@
+"""
+Compression for stored pulse segments and HTTP responses.
+
+gzip is always available; zstandard (``zstd``) and brotli (``br``) are used
+when their packages are installed.
+"""
+
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# File extension of each segment codec
+SEGMENT_CODECS = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+def available_codecs():
+    """Segment codecs usable in this environment, preferred first."""
+    return (['zstd'] if zstandard is not None else []) + ['gzip']
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compress ``data`` with ``gzip``/``zstd`` (segments) or ``br`` (responses)."""
+    if codec == 'gzip':
+        return gzip.compress(data, compresslevel=6)
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if codec == 'br':
+        return brotli.compress(data, quality=5)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'gzip':
+        return gzip.decompress(data)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst segments")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def codec_for_path(path: str) -> Optional[str]:
+    """Segment codec implied by a file name, or None if uncompressed."""
+    for codec, extension in SEGMENT_CODECS.items():
+        if path.endswith(extension):
+            return codec
+    return None
+
+
+def stream_compress(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a streamed response body chunk by chunk (``gzip`` or ``br``)."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=5)
+        process, flush = compressor.process, compressor.finish
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        process, flush = compressor.compress, compressor.flush
+
+    for chunk in chunks:
+        compressed = process(chunk)
+        if compressed:
+            yield compressed
+    yield flush()
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an ``Accept-Encoding`` header.
+
+    Returns:
+        ``br`` (when brotli is installed) or ``gzip``, or None if neither is accepted
+    """
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionCache:
+    """
+    LRU cache of compressed response bodies keyed by a digest of the raw body.
+
+    Repeated payloads (the same ``/log`` page polled by many dashboards) are
+    compressed once; hashing the body is far cheaper than compressing it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._bodies: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._size = 0
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        key = (encoding, len(body), hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            cached = self._bodies.get(key)
+            if cached is not None:
+                self._bodies.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        compressed = compress(body, encoding)
+        if len(compressed) > self.max_bytes:
+            return compressed
+
+        with self._lock:
+            if key not in self._bodies:
+                self._bodies[key] = compressed
+                self._size += len(compressed)
+                while self._size > self.max_bytes:
+                    _, evicted = self._bodies.popitem(last=False)
+                    self._size -= len(evicted)
+        return compressed
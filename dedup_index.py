@@ -0,0 +1,127 @@
+"""
+Time-windowed index of idempotency keys for pulse submission.
+
+Maps each client-supplied key, within the scope of the user that sent it, to
+the response of the request that first used it and a fingerprint of that
+request's body. Retries are answered without touching the store or the
+kernel, and a key reused for a different body is told apart. Keys live in a
+dict with a FIFO expiry queue; both are bounded by a time window and a
+maximum key count. Every new key is appended to a JSON Lines file next to
+the pulse log, which is reloaded (expired keys skipped) on start and
+compacted when it holds mostly stale lines.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from serialization import JSONSerializer, get_serializer
+
+
+class DedupIndex:
+    """Bounded, expiring map of ``(scope, key)`` to the original response and body fingerprint."""
+
+    def __init__(self, path: Optional[str] = None, window: float = 86400.0, max_keys: int = 10000,
+                 serializer: Optional[JSONSerializer] = None, load: bool = True):
+        """
+        Load the index from ``path`` (a JSON Lines file), if given.
+
+        Args:
+            path: File keys are persisted to; ``None`` keeps them in memory only
+            window: Seconds a key is remembered
+            max_keys: Maximum number of keys kept; the oldest are dropped first
+            serializer: Serializer for the file (default: fastest available)
+            load: Read ``path`` now; pass False to defer it to ``load()``
+        """
+        self.path = path
+        self.window = window
+        self.max_keys = max_keys
+        self.serializer = serializer or get_serializer()
+
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple[str, str], Tuple[Any, Optional[str]]] = {}
+        self._expiry = deque()
+        self._file_lines = 0
+
+        if load:
+            self.load()
+
+    def load(self) -> None:
+        """Remember the unexpired keys persisted in ``path``, if it exists."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        now = time.time()
+        with self._lock, open(self.path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = self.serializer.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    continue
+                self._file_lines += 1
+                if record['expires'] > now and 'scope' in record:
+                    # Unscoped keys of older versions can no longer match and are skipped
+                    self._remember((record['scope'], record['key']), record['expires'],
+                                   (record['response'], record.get('fingerprint')))
+
+    def _remember(self, key: Tuple[str, str], expires: float, value: Tuple[Any, Optional[str]]) -> None:
+        if key not in self._responses:
+            self._expiry.append((expires, key))
+        self._responses[key] = value
+        while len(self._expiry) > self.max_keys:
+            _, oldest = self._expiry.popleft()
+            self._responses.pop(oldest, None)
+
+    def _expire(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, key = self._expiry.popleft()
+            self._responses.pop(key, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.time())
+            return len(self._responses)
+
+    def get(self, scope: str, key: str) -> Optional[Tuple[Any, Optional[str]]]:
+        """
+        Look up a key sent by ``scope`` (e.g. the user).
+
+        Returns:
+            ``(response, fingerprint)`` of the request that first used the key, or None if unseen or expired
+        """
+        with self._lock:
+            self._expire(time.time())
+            return self._responses.get((scope, key))
+
+    def put(self, scope: str, key: str, response: Any, fingerprint: Optional[str] = None) -> None:
+        """Record the response and body fingerprint of the first request ``scope`` sent with ``key``."""
+        expires = time.time() + self.window
+        with self._lock:
+            self._remember((scope, key), expires, (response, fingerprint))
+            if not self.path:
+                return
+
+            with open(self.path, "ab") as f:
+                f.write(self.serializer.dumps({'scope': scope, 'key': key, 'expires': expires,
+                                               'fingerprint': fingerprint, 'response': response}) + b"\n")
+            self._file_lines += 1
+
+            # Rewrite the file once most of its lines are expired or evicted
+            if self._file_lines > 2 * len(self._responses) + 1000:
+                self._compact()
+
+    def _compact(self) -> None:
+        self._expire(time.time())
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            for expires, (scope, key) in self._expiry:
+                response, fingerprint = self._responses[(scope, key)]
+                f.write(self.serializer.dumps({'scope': scope, 'key': key, 'expires': expires,
+                                               'fingerprint': fingerprint, 'response': response}) + b"\n")
+        os.replace(tmp_path, self.path)
+        self._file_lines = len(self._expiry)
@@ -1,6 +1,165 @@
+import heapq
 import time
 import math
-from typing import Dict, List, Any, Optional
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Callable, Mapping
+
+
+class _RunningWindow:
+    """Last ``size`` values of a stream with running sum and sum of squares."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values = deque()
+        self.total = 0.0
+        self.total_squares = 0.0
+        self._since_resync = 0
+
+    def push(self, value: float) -> None:
+        self.values.append(value)
+        self.total += value
+        self.total_squares += value * value
+        if len(self.values) > self.size:
+            old = self.values.popleft()
+            self.total -= old
+            self.total_squares -= old * old
+
+        # Recompute occasionally so floating point drift cannot accumulate
+        self._since_resync += 1
+        if self._since_resync >= self.size:
+            self._since_resync = 0
+            self.total = sum(self.values)
+            self.total_squares = sum(v * v for v in self.values)
+
+    def reset(self, values) -> None:
+        """Replace the contents with the last ``size`` of ``values``."""
+        self.values.clear()
+        self.values.extend(list(values)[-self.size:])
+        self._since_resync = 0
+        self.total = sum(self.values)
+        self.total_squares = sum(v * v for v in self.values)
+
+    def mean(self) -> float:
+        return self.total / len(self.values) if self.values else 0.0
+
+    def std(self) -> float:
+        count = len(self.values)
+        mean = self.total / count
+        return math.sqrt(max(0.0, self.total_squares / count - mean * mean))
+
+
+class _TrendWindow:
+    """
+    Last ``size`` values of a stream split into an older and a newer half,
+    each with a running sum, so the half-window trend costs O(1) per input.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.first_size = size // 2
+        self.second_size = size - self.first_size
+        self.first = deque()
+        self.second = deque()
+        self.first_sum = 0.0
+        self.second_sum = 0.0
+        self._since_resync = 0
+
+    def push(self, value: float) -> None:
+        # New values enter the newer half; its oldest value crosses the
+        # midpoint into the older half, whose oldest value leaves the window.
+        self.second.append(value)
+        self.second_sum += value
+        if len(self.second) > self.second_size:
+            crossing = self.second.popleft()
+            self.second_sum -= crossing
+            self.first.append(crossing)
+            self.first_sum += crossing
+            if len(self.first) > self.first_size:
+                self.first_sum -= self.first.popleft()
+
+        self._since_resync += 1
+        if self._since_resync >= self.size:
+            self._since_resync = 0
+            self.first_sum = sum(self.first)
+            self.second_sum = sum(self.second)
+
+    def is_full(self) -> bool:
+        return len(self.first) == self.first_size and len(self.second) == self.second_size
+
+    def half_averages(self) -> tuple:
+        return self.first_sum / self.first_size, self.second_sum / self.second_size
+
+
+class _SummaryTier:
+    """
+    Consolidated history of memories evicted from the raw tier.
+
+    Every cleanup of the raw memory becomes one level-0 block holding the
+    count, sum, sum of squares, min/max and time span of the evicted
+    sentiments plus their ``extremes`` most extreme entries. Whenever a
+    level holds more than ``BLOCKS_PER_LEVEL`` blocks, its two oldest are
+    merged into one block of the next level, so older history is kept at
+    ever coarser granularity and the tier holds O(log history) blocks.
+    """
+
+    BLOCKS_PER_LEVEL = 2
+
+    def __init__(self, extremes: int, blocks: Optional[List[Dict[str, Any]]] = None):
+        self.extremes = extremes
+        self.blocks: List[Dict[str, Any]] = list(blocks or [])  # oldest first; levels never increase towards the end
+        self.count = sum(block['count'] for block in self.blocks)
+
+    def add(self, entries: List[Dict[str, Any]]) -> None:
+        """Consolidate evicted memory entries into a new block."""
+        if not entries:
+            return
+        sentiments = [entry['sentiment'] for entry in entries]
+        self.add_block({
+            'level': 0,
+            'count': len(sentiments),
+            'sum': sum(sentiments),
+            'squares': sum(s * s for s in sentiments),
+            'min': min(sentiments),
+            'max': max(sentiments),
+            'start': entries[0]['timestamp'],
+            'end': entries[-1]['timestamp'],
+            'extremes': self._top(entries)
+        })
+
+    def add_block(self, block: Dict[str, Any]) -> None:
+        """Append a level-0 block built elsewhere (e.g. by a bulk replay) and merge as needed."""
+        self.blocks.append(block)
+        self.count += block['count']
+        level = 0
+        while True:
+            positions = [i for i, b in enumerate(self.blocks) if b['level'] == level]
+            if len(positions) <= self.BLOCKS_PER_LEVEL:
+                break
+            i = positions[0]
+            self.blocks[i:i + 2] = [self._merge(self.blocks[i], self.blocks[i + 1])]
+            level += 1
+
+    def _top(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return heapq.nlargest(self.extremes, entries, key=lambda entry: abs(entry['sentiment']))
+
+    def _merge(self, older: Dict[str, Any], newer: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'level': max(older['level'], newer['level']) + 1,
+            'count': older['count'] + newer['count'],
+            'sum': older['sum'] + newer['sum'],
+            'squares': older['squares'] + newer['squares'],
+            'min': min(older['min'], newer['min']),
+            'max': max(older['max'], newer['max']),
+            'start': min(older['start'], newer['start']),
+            'end': max(older['end'], newer['end']),
+            'extremes': self._top(older['extremes'] + newer['extremes'])
+        }
+
+    def most_extreme(self, count: int) -> List[Dict[str, Any]]:
+        """The ``count`` most extreme summarized entries, most extreme first."""
+        return heapq.nlargest(count, (entry for block in self.blocks for entry in block['extremes']),
+                              key=lambda entry: abs(entry['sentiment']))
 
 
 class Euystacio:
@@ -14,12 +173,15 @@ class Euystacio:
     - Configurable memory limits and cleanup mechanisms
     """
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 on_pattern: Optional[Callable[[Dict[str, Any]], None]] = None):
         """
         Initialize Euystacio with optional configuration.
         
         Args:
             config: Dictionary with configuration parameters
+            on_pattern: Optional callback receiving every detected pattern,
+                        e.g. to persist history beyond ``pattern_memory``
         """
         # Default configuration
         default_config = {
@@ -29,36 +191,55 @@ class Euystacio:
             'decay_factor': 0.99,
             'decay_interval': 10,
             'pattern_window': 20,
-            'volatility_threshold': 0.3
+            'pattern_windows': None,  # trend windows, e.g. [20, 200, 1000]; default [pattern_window]
+            'volatility_threshold': 0.3,
+            'backend': 'auto'  # replay backend: 'auto' (NumPy when installed), 'numpy' or 'python'
         }
         
         self.config = {**default_config, **(config or {})}
+        if not self.config['pattern_windows']:
+            self.config['pattern_windows'] = [self.config['pattern_window']]
         
-        # Core state
+        # Core state: recent inputs in a raw tier of at most memory_limit
+        # entries; evicted inputs are consolidated into summary blocks
         self.memory = []
+        self._summary = _SummaryTier(self._important_count())
+        self._summarized_prefix = 0  # leading raw entries already in the summary tier
         self.balance_metric = 0.0
         self.learning_rate = self.config['base_learning_rate']
         
         # Enhanced tracking
         self.last_update_time = time.time()
-        self.volatility_history = []
+        # Last 50 volatilities; the deque is owned by a running window so the
+        # average is maintained incrementally
+        self._volatility_stats = _RunningWindow(50)
+        self.volatility_history = self._volatility_stats.values
         self.pattern_memory = []
         self.adaptation_score = 0.0
+        self.on_pattern = on_pattern
         
         # Performance metrics
         self.total_inputs = 0
-        self.prediction_errors = []
+        self._error_stats = _RunningWindow(100)
+        self._recent_error_stats = _RunningWindow(10)
+        self.prediction_errors = self._error_stats.values
+        
+        # Incrementally maintained windows over the input stream
+        self._recent_sentiments = deque(maxlen=5)
+        self._volatility_window = _RunningWindow(self.config['pattern_window'])
+        self._trend_windows = [_TrendWindow(size) for size in self.config['pattern_windows']]
 
-    def receive_input(self, event: str, sentiment: float) -> Dict[str, Any]:
+    def receive_input(self, event: str, sentiment: float, compact: bool = False) -> Optional[Dict[str, Any]]:
         """
         Process new input with enhanced self-evolving behavior.
         
         Args:
             event: Description of the event
             sentiment: Sentiment value (-1 to 1)
+            compact: Skip building the result dictionary (returns None)
             
         Returns:
-            Dictionary with processing results and metrics
+            Dictionary with processing results and metrics, or None if compact
         """
         current_time = time.time()
         
@@ -72,6 +253,7 @@ class Euystacio:
         
         # Add to memory with limit management
         self._add_to_memory(memory_entry)
+        self._observe(sentiment)
         
         # Calculate sentiment volatility
         volatility = self._calculate_volatility()
@@ -85,9 +267,8 @@ class Euystacio:
         
         # Track prediction error for self-improvement
         prediction_error = abs(sentiment - previous_balance)
-        self.prediction_errors.append(prediction_error)
-        if len(self.prediction_errors) > 100:
-            self.prediction_errors.pop(0)
+        self._error_stats.push(prediction_error)
+        self._recent_error_stats.push(prediction_error)
         
         # Pattern detection and consolidation
         self._detect_patterns()
@@ -99,6 +280,9 @@ class Euystacio:
         self.total_inputs += 1
         self.last_update_time = current_time
         
+        if compact:
+            return None
+        
         return {
             "balance_metric": self.balance_metric,
             "learning_rate": self.learning_rate,
@@ -106,7 +290,242 @@ class Euystacio:
             "adaptation_score": self.adaptation_score,
             "memory_size": len(self.memory),
             "prediction_error": prediction_error,
-            "average_error": sum(self.prediction_errors) / len(self.prediction_errors) if self.prediction_errors else 0.0
+            "average_error": self._error_stats.mean()
+        }
+
+    def replay(self, events: List[str], sentiments: List[float], exact: bool = False) -> Dict[str, Any]:
+        """
+        Process many inputs in order, e.g. to rebuild state from history.
+        
+        With the ``auto`` or ``numpy`` backend and NumPy installed, window
+        statistics are computed for the whole batch at once (see
+        ``euystacio_numpy``). The metrics match calling ``receive_input`` for
+        each pair, but memory is rebuilt from the batch extremes with the rest
+        folded into one summary block. Otherwise, or with ``exact``, inputs
+        are processed one by one.
+        
+        Args:
+            events: Event descriptions
+            sentiments: Sentiment values (-1 to 1), one per event
+            exact: Leave the kernel exactly as ``receive_input`` calls would,
+                memory and summary blocks included
+            
+        Returns:
+            Status after the last input (as ``get_status``)
+        """
+        if len(events) != len(sentiments):
+            raise ValueError("events and sentiments must have the same length")
+        
+        backend = self.config['backend']
+        if backend != 'python' and not exact and len(sentiments):
+            try:
+                import euystacio_numpy
+            except ImportError:
+                if backend == 'numpy':
+                    raise
+            else:
+                if euystacio_numpy.supports(self):
+                    euystacio_numpy.replay(self, events, sentiments)
+                    return self.get_status()
+                if backend == 'numpy':
+                    raise ValueError("Configuration not supported by the NumPy backend")
+        
+        for event, sentiment in zip(events, sentiments):
+            self.receive_input(event, sentiment, compact=True)
+        return self.get_status()
+
+    def simulate(self, sentiments: List[float],
+                 context: Optional[Dict[str, Any]] = None) -> Dict[str, List[float]]:
+        """
+        Evaluate candidate next inputs without changing any state.
+        
+        Each candidate is evaluated independently against the current
+        state, as if it were the next ``receive_input``. With NumPy
+        installed (and backend not ``python``) all candidates are evaluated
+        in one vectorized pass.
+        
+        Args:
+            sentiments: Candidate sentiment values (-1 to 1)
+            context: State captured earlier by ``next_input_context``
+                     (default: the current state)
+            
+        Returns:
+            Dictionary of lists, one value per candidate, with the keys
+            ``sentiment``, ``balance_metric``, ``learning_rate``,
+            ``volatility``, ``adaptation_score``, ``prediction_error`` and
+            ``average_error``
+        """
+        if context is None:
+            context = self.next_input_context()
+        
+        if self.config['backend'] != 'python':
+            try:
+                import euystacio_numpy
+            except ImportError:
+                if self.config['backend'] == 'numpy':
+                    raise
+            else:
+                return euystacio_numpy.simulate(context, sentiments)
+        
+        results = {key: [] for key in ('sentiment', 'balance_metric', 'learning_rate', 'volatility',
+                                       'adaptation_score', 'prediction_error', 'average_error')}
+        c = context
+        for sentiment in sentiments:
+            # Volatility over the window including the candidate
+            if c['volatility_count'] >= 2:
+                mean = (c['volatility_sum'] + sentiment) / c['volatility_count']
+                mean_squares = (c['volatility_squares'] + sentiment * sentiment) / c['volatility_count']
+                volatility = math.sqrt(max(0.0, mean_squares - mean * mean))
+            else:
+                volatility = 0.0
+            
+            target_rate = c['base_learning_rate'] * (1 + min(volatility * 2, 0.5)) * c['error_adjustment']
+            learning_rate = c['learning_rate'] * (1 - c['adaptation_factor']) + target_rate * c['adaptation_factor']
+            learning_rate = max(0.01, min(learning_rate, 0.5))
+            
+            momentum = 0.0
+            if c['momentum_ready']:
+                momentum = (c['momentum_recent_sum'] + sentiment) / 3 - c['momentum_older_avg']
+            
+            balance = c['balance_metric']
+            new_balance = (1 - learning_rate) * balance + learning_rate * sentiment + 0.1 * momentum
+            if volatility > c['volatility_threshold']:
+                new_balance = 0.8 * balance + 0.2 * new_balance
+            
+            score = c['adaptation_score']
+            for first_sum, second_base, first_size, second_size in c['trend_windows']:
+                if abs((second_base + sentiment) / second_size - first_sum / first_size) > 0.3:
+                    score = min(1.0, score + 0.05)
+            
+            new_balance *= c['decay_factor']
+            score *= c['score_decay']
+            
+            prediction_error = abs(sentiment - balance)
+            results['sentiment'].append(sentiment)
+            results['balance_metric'].append(new_balance)
+            results['learning_rate'].append(learning_rate)
+            results['volatility'].append(volatility)
+            results['adaptation_score'].append(score)
+            results['prediction_error'].append(prediction_error)
+            results['average_error'].append((c['error_sum'] + prediction_error) / c['error_count'])
+        
+        return results
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Capture the learned state as a JSON-serializable dictionary.
+
+        The configuration and ``on_pattern`` listener are not included;
+        ``restore`` keeps those of the kernel it is called on.
+
+        Returns:
+            Dictionary accepted by ``restore``
+        """
+        # The longest input window holds every recent input the other
+        # windows need, oldest first
+        windows = [self._volatility_window.values] + [list(w.first) + list(w.second) for w in self._trend_windows]
+        return {
+            'memory': list(self.memory),
+            'summarized_prefix': self._summarized_prefix,
+            'summary_blocks': list(self._summary.blocks),
+            'balance_metric': self.balance_metric,
+            'learning_rate': self.learning_rate,
+            'last_update_time': self.last_update_time,
+            'adaptation_score': self.adaptation_score,
+            'total_inputs': self.total_inputs,
+            'pattern_memory': list(self.pattern_memory),
+            'prediction_errors': list(self.prediction_errors),
+            'recent_errors': list(self._recent_error_stats.values),
+            'volatility_history': list(self.volatility_history),
+            'recent_inputs': list(max(windows, key=len))
+        }
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Replace the learned state with one captured by ``snapshot``.
+
+        Args:
+            snapshot: Dictionary returned by ``snapshot``, possibly from a
+                      kernel with different window sizes
+        """
+        self.memory = list(snapshot['memory'])[-self.config['memory_limit']:]
+        self._summarized_prefix = max(0, snapshot.get('summarized_prefix', 0) -
+                                      (len(snapshot['memory']) - len(self.memory)))
+        self._summary = _SummaryTier(self._important_count(), snapshot.get('summary_blocks'))
+        self.balance_metric = snapshot['balance_metric']
+        self.learning_rate = snapshot['learning_rate']
+        self.last_update_time = snapshot['last_update_time']
+        self.adaptation_score = snapshot['adaptation_score']
+        self.total_inputs = snapshot['total_inputs']
+        self.pattern_memory = list(snapshot['pattern_memory'])
+        self._error_stats.reset(snapshot['prediction_errors'])
+        self._recent_error_stats.reset(snapshot['recent_errors'])
+        self._volatility_stats.reset(snapshot['volatility_history'])
+
+        self._recent_sentiments.clear()
+        self._volatility_window = _RunningWindow(self.config['pattern_window'])
+        self._trend_windows = [_TrendWindow(size) for size in self.config['pattern_windows']]
+        for sentiment in snapshot['recent_inputs']:
+            self._observe(sentiment)
+
+    def next_input_context(self) -> Dict[str, Any]:
+        """
+        Collect every quantity the next ``receive_input`` needs that does not
+        depend on the new sentiment, so candidates can be evaluated in bulk.
+        """
+        now = time.time()
+        
+        window = self._volatility_window
+        evicted = window.values[0] if len(window.values) >= window.size else 0.0
+        
+        if self.prediction_errors:
+            error_adjustment = max(0.5, 1 - self._recent_error_stats.mean())
+        else:
+            error_adjustment = 1.0
+        errors = self.prediction_errors
+        dropped_error = errors[0] if len(errors) >= self._error_stats.size else 0.0
+        
+        recent = list(self._recent_sentiments)[-4:]
+        
+        # Trend windows that will be full once the candidate is pushed:
+        # the newer half's oldest value crosses the midpoint and the older
+        # half's oldest value leaves.
+        trend_windows = []
+        for trend in self._trend_windows:
+            if trend.size < 10 or len(trend.first) + len(trend.second) + 1 < trend.size:
+                continue
+            crossing = trend.second[0]
+            leaving = trend.first[0] if len(trend.first) >= trend.first_size else 0.0
+            trend_windows.append((trend.first_sum + crossing - leaving, trend.second_sum - crossing,
+                                  trend.first_size, trend.second_size))
+        
+        # Decay timing, counting the candidate as one more recent memory
+        recent_activity = self._recent_activity(now) + 1
+        adaptive_interval = self.config['decay_interval'] * min(recent_activity / 10, 2.0)
+        decays = self.total_inputs % max(1, int(adaptive_interval)) == 0
+        decay_factor = self.config['decay_factor']
+        if now - self.last_update_time > 3600:
+            decay_factor *= 0.95
+        
+        return {
+            'balance_metric': self.balance_metric,
+            'learning_rate': self.learning_rate,
+            'adaptation_score': self.adaptation_score,
+            'base_learning_rate': self.config['base_learning_rate'],
+            'adaptation_factor': self.config['adaptation_factor'],
+            'volatility_threshold': self.config['volatility_threshold'],
+            'volatility_count': min(len(window.values) + 1, window.size),
+            'volatility_sum': window.total - evicted,
+            'volatility_squares': window.total_squares - evicted * evicted,
+            'error_adjustment': error_adjustment,
+            'error_sum': self._error_stats.total - dropped_error,
+            'error_count': min(len(errors) + 1, self._error_stats.size),
+            'momentum_ready': len(recent) == 4,
+            'momentum_recent_sum': sum(recent[-2:]),
+            'momentum_older_avg': sum(recent[:2]) / 2,
+            'trend_windows': trend_windows,
+            'decay_factor': decay_factor if decays else 1.0,
+            'score_decay': 0.98 if decays else 1.0
         }
 
     def _add_to_memory(self, memory_entry: Dict[str, Any]) -> None:
@@ -115,9 +534,12 @@ class Euystacio:
         
         # Apply memory limit with intelligent cleanup
         if len(self.memory) > self.config['memory_limit']:
-            # Keep recent memories and important patterns
+            # Consolidate the entries leaving the raw tier, then keep recent
+            # memories and the most extreme summarized ones
+            recent_count = int(self.config['memory_limit'] * 0.7)
+            recent_memories = self.memory[len(self.memory) - recent_count:]
+            self._summary.add(self.memory[self._summarized_prefix:len(self.memory) - recent_count])
             important_memories = self._select_important_memories()
-            recent_memories = self.memory[-int(self.config['memory_limit'] * 0.7):]
             
             # Combine and deduplicate
             combined = important_memories + recent_memories
@@ -130,37 +552,58 @@ class Euystacio:
                     unique_memories.append(mem)
             
             self.memory = list(reversed(unique_memories))[:self.config['memory_limit']]
+            # Surviving important memories lead the raw tier and are already
+            # summarized; recent duplicates dropped above are summarized now
+            important_ids = {id(mem) for mem in important_memories}
+            self._summarized_prefix = sum(1 for mem in self.memory if id(mem) in important_ids)
+            if len(self.memory) - self._summarized_prefix < len(recent_memories):
+                kept_ids = {id(mem) for mem in self.memory}
+                self._summary.add([mem for mem in recent_memories if id(mem) not in kept_ids])
+
+    def _recent_activity(self, now: float) -> int:
+        """
+        Count memories from the last 5 minutes, up to the 20 at which the
+        activity factor saturates.
+        
+        The raw tier is in input order, so the scan runs backwards from the
+        newest entry and stops at the first older one.
+        """
+        count = 0
+        for memory in reversed(self.memory):
+            if count >= 20 or now - memory['timestamp'] >= 300:
+                break
+            count += 1
+        return count
+
+    def _observe(self, sentiment: float) -> None:
+        """Feed a new sentiment into the momentum, volatility and trend windows."""
+        self._recent_sentiments.append(sentiment)
+        self._volatility_window.push(sentiment)
+        for window in self._trend_windows:
+            window.push(sentiment)
+
+    def _important_count(self) -> int:
+        return min(int(self.config['memory_limit'] * 0.1), 50)
 
     def _select_important_memories(self) -> List[Dict[str, Any]]:
-        """Select important memories based on sentiment extremes and patterns."""
+        """Select the most extreme summarized memories from the summary blocks' extremes."""
         if len(self.memory) < 20:
             return []
         
-        # Sort by absolute sentiment value and select extremes
-        sorted_memories = sorted(self.memory, key=lambda x: abs(x['sentiment']), reverse=True)
-        important_count = min(int(self.config['memory_limit'] * 0.1), 50)
-        
-        return sorted_memories[:important_count]
+        # Every block keeps its own top extremes, so the overall top entries
+        # are found among O(log history) small lists
+        return self._summary.most_extreme(self._important_count())
 
     def _calculate_volatility(self) -> float:
         """Calculate recent sentiment volatility."""
-        if len(self.memory) < 2:
-            return 0.0
-        
-        recent_sentiments = [m['sentiment'] for m in self.memory[-self.config['pattern_window']:]]
-        
-        if len(recent_sentiments) < 2:
+        if len(self._volatility_window.values) < 2:
             return 0.0
         
-        # Calculate standard deviation
-        mean_sentiment = sum(recent_sentiments) / len(recent_sentiments)
-        variance = sum((s - mean_sentiment) ** 2 for s in recent_sentiments) / len(recent_sentiments)
-        volatility = math.sqrt(variance)
+        # Standard deviation from the running sums of the last pattern_window inputs
+        volatility = self._volatility_window.std()
         
         # Track volatility history
-        self.volatility_history.append(volatility)
-        if len(self.volatility_history) > 50:
-            self.volatility_history.pop(0)
+        self._volatility_stats.push(volatility)
         
         return volatility
 
@@ -174,8 +617,7 @@ class Euystacio:
         
         # Decrease learning rate if prediction errors are low (stable performance)
         if self.prediction_errors:
-            avg_error = sum(self.prediction_errors[-10:]) / min(len(self.prediction_errors), 10)
-            error_adjustment = max(0.5, 1 - avg_error)
+            error_adjustment = max(0.5, 1 - self._recent_error_stats.mean())
         else:
             error_adjustment = 1.0
         
@@ -209,37 +651,25 @@ class Euystacio:
 
     def _calculate_momentum(self) -> float:
         """Calculate momentum based on recent sentiment trends."""
-        if len(self.memory) < 5:
+        if len(self._recent_sentiments) < 5:
             return 0.0
         
-        recent_sentiments = [m['sentiment'] for m in self.memory[-5:]]
+        recent_sentiments = list(self._recent_sentiments)
         
         # Calculate simple momentum as difference between recent averages
-        if len(recent_sentiments) >= 3:
-            recent_avg = sum(recent_sentiments[-3:]) / 3
-            older_avg = sum(recent_sentiments[:-3]) / len(recent_sentiments[:-3])
-            return recent_avg - older_avg
-        
-        return 0.0
+        recent_avg = sum(recent_sentiments[-3:]) / 3
+        older_avg = sum(recent_sentiments[:-3]) / 2
+        return recent_avg - older_avg
 
     def _detect_patterns(self) -> None:
         """Detect and store important patterns for future reference."""
-        if len(self.memory) < self.config['pattern_window']:
-            return
-        
-        recent_window = self.memory[-self.config['pattern_window']:]
-        
-        # Detect sentiment cycles
-        sentiments = [m['sentiment'] for m in recent_window]
-        
-        # Simple pattern: detect if there's a clear trend
-        if len(sentiments) >= 10:
-            first_half = sentiments[:len(sentiments)//2]
-            second_half = sentiments[len(sentiments)//2:]
-            
-            first_avg = sum(first_half) / len(first_half)
-            second_avg = sum(second_half) / len(second_half)
+        # Each configured window keeps running half-window sums, so checking
+        # every window for a clear trend is O(1) per input.
+        for window in self._trend_windows:
+            if window.size < 10 or not window.is_full():
+                continue
             
+            first_avg, second_avg = window.half_averages()
             trend_strength = abs(second_avg - first_avg)
             
             if trend_strength > 0.3:  # Significant trend detected
@@ -248,10 +678,12 @@ class Euystacio:
                     'strength': trend_strength,
                     'direction': 'positive' if second_avg > first_avg else 'negative',
                     'timestamp': time.time(),
-                    'window_size': len(sentiments)
+                    'window_size': window.size
                 }
                 
                 self.pattern_memory.append(pattern)
+                if self.on_pattern is not None:
+                    self.on_pattern(pattern)
                 
                 # Update adaptation score based on pattern recognition
                 self.adaptation_score = min(1.0, self.adaptation_score + 0.05)
@@ -267,7 +699,7 @@ class Euystacio:
         
         # More frequent inputs = less frequent decay
         if len(self.memory) > 0:
-            recent_activity = len([m for m in self.memory if time.time() - m['timestamp'] < 300])  # Last 5 minutes
+            recent_activity = self._recent_activity(time.time())  # Last 5 minutes
             activity_factor = min(recent_activity / 10, 2.0)
         else:
             activity_factor = 1.0
@@ -287,20 +719,62 @@ class Euystacio:
             # Gradually reduce adaptation score
             self.adaptation_score *= 0.98
 
-    def get_status(self) -> Dict[str, Any]:
-        """Get comprehensive status information."""
-        avg_error = sum(self.prediction_errors) / len(self.prediction_errors) if self.prediction_errors else 0.0
-        avg_volatility = sum(self.volatility_history) / len(self.volatility_history) if self.volatility_history else 0.0
+    # Status fields and how to compute each one; get_status only evaluates
+    # the requested ones
+    STATUS_FIELDS = {
+        'balance_metric': lambda self: self.balance_metric,
+        'learning_rate': lambda self: self.learning_rate,
+        'adaptation_score': lambda self: self.adaptation_score,
+        'memory_size': lambda self: len(self.memory),
+        'total_inputs': lambda self: self.total_inputs,
+        'average_prediction_error': lambda self: self._error_stats.mean(),
+        'average_volatility': lambda self: self._volatility_stats.mean(),
+        'pattern_count': lambda self: len(self.pattern_memory),
+        'summarized_inputs': lambda self: self._summary.count,
+        'summary_blocks': lambda self: len(self._summary.blocks),
+        'recent_patterns': lambda self: self.pattern_memory[-5:],
+        'config': lambda self: self.config
+    }
+
+    def get_status(self, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get comprehensive status information.
         
-        return {
-            'balance_metric': self.balance_metric,
-            'learning_rate': self.learning_rate,
-            'adaptation_score': self.adaptation_score,
-            'memory_size': len(self.memory),
-            'total_inputs': self.total_inputs,
-            'average_prediction_error': avg_error,
-            'average_volatility': avg_volatility,
-            'pattern_count': len(self.pattern_memory),
-            'recent_patterns': self.pattern_memory[-5:] if self.pattern_memory else [],
-            'config': self.config
-        }
+        Averages come from incrementally maintained sums, so every field is
+        O(1) to compute.
+        
+        Args:
+            fields: Only compute and return these fields (default: all of
+                    ``STATUS_FIELDS``)
+            
+        Returns:
+            Dictionary of the requested status fields
+            
+        Raises:
+            ValueError: If a requested field is unknown
+        """
+        if fields is None:
+            fields = self.STATUS_FIELDS
+        
+        status = {}
+        for field in fields:
+            getter = self.STATUS_FIELDS.get(field)
+            if getter is None:
+                raise ValueError(f"Unknown status field: {field}")
+            status[field] = getter(self)
+        return status
+
+    def read_view(self) -> Mapping[str, Any]:
+        """
+        Freeze the full status into a read-only mapping.
+        
+        Nested values are copies nothing else refers to, so the view can be
+        handed to concurrent readers while ``receive_input`` keeps running.
+        
+        Returns:
+            Read-only mapping of every ``STATUS_FIELDS`` field
+        """
+        status = self.get_status()
+        status['recent_patterns'] = [dict(pattern) for pattern in status['recent_patterns']]
+        status['config'] = dict(status['config'])
+        return MappingProxyType(status)
@@ -0,0 +1,226 @@
+"""
+Inverted index over pulse event descriptions.
+
+Every event is split into lowercase word tokens, and each token maps to the
+sorted posting list of the sequence numbers of the pulses containing it.
+Pulses are indexed as they are ingested and every indexed pulse is appended
+to a JSON Lines file next to the pulse log (``[seq, [tokens...]]``), which
+is reloaded on start; pulses logged after the last persisted one are indexed
+from the log by the caller.
+
+Queries are AND over words, with ``word*`` matching every token starting
+with ``word``, and cost O(postings of the query terms), not O(history).
+
+When retention removes pulses from the log, ``prune`` drops their postings
+and rewrites the file without them, so the index stays as bounded as the log.
+"""
+
+import bisect
+import heapq
+import os
+import re
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from serialization import JSONSerializer, get_serializer
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Any) -> List[str]:
+    """Distinct lowercase word tokens of ``text``, in order of first appearance."""
+    return list(dict.fromkeys(_TOKEN.findall(str(text).casefold())))
+
+
+def parse_query(query: str) -> List[Tuple[str, bool]]:
+    """
+    Split a search query into terms.
+
+    Returns:
+        ``(token, is_prefix)`` pairs; a word ending in ``*`` is a prefix term
+
+    Raises:
+        ValueError: If the query contains no words
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        tokens = tokenize(word)
+        for i, token in enumerate(tokens):
+            # In "state-of-the-art*" only the last token is a prefix
+            terms.append((token, prefix and i == len(tokens) - 1))
+    if not terms:
+        raise ValueError("Search query has no words")
+    return terms
+
+
+def _intersect(small: Iterable[int], large) -> List[int]:
+    """Sorted sequence numbers present in both sorted inputs, probing ``large`` by binary search."""
+    result = []
+    lo = 0
+    size = len(large)
+    for seq in small:
+        lo = bisect.bisect_left(large, seq, lo)
+        if lo == size:
+            break
+        if large[lo] == seq:
+            result.append(seq)
+    return result
+
+
+class EventIndex:
+    """Token to posting list map with a sorted vocabulary for prefix terms."""
+
+    def __init__(self, path: Optional[str] = None, serializer: Optional[JSONSerializer] = None,
+                 load: bool = True):
+        """
+        Load the index from ``path`` (a JSON Lines file), if given.
+
+        Args:
+            path: File indexed pulses are persisted to; ``None`` keeps them in memory only
+            serializer: Serializer for the file (default: fastest available)
+            load: Read ``path`` now; pass False to defer it to ``load()``
+        """
+        self.path = path
+        self.serializer = serializer or get_serializer()
+        self.next_seq = 0
+        self.first_seq = 0
+
+        self._lock = threading.Lock()
+        self._postings: Dict[str, array] = {}
+        self._vocabulary: List[str] = []
+        self._new_tokens: List[str] = []
+
+        if load:
+            self.load()
+
+    def load(self) -> None:
+        """Index the pulses persisted in ``path``, if it exists."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with self._lock, open(self.path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    seq, tokens = self.serializer.loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    continue
+                self._index(seq, tokens)
+            self._sort_vocabulary()
+
+    def _index(self, seq: int, tokens: List[str]) -> None:
+        if seq < self.next_seq:
+            return
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array('q')
+                self._new_tokens.append(token)
+            postings.append(seq)
+        self.next_seq = seq + 1
+
+    def __len__(self) -> int:
+        """Number of distinct tokens."""
+        return len(self._postings)
+
+    def add(self, seq: int, event: Any) -> None:
+        """Index and persist the event of the pulse with sequence number ``seq``."""
+        self.add_many(seq, [event])
+
+    def add_many(self, first_seq: int, events: List[Any]) -> None:
+        """Index and persist consecutive pulses' events, the first having sequence number ``first_seq``."""
+        records = [(seq, tokenize(event)) for seq, event in enumerate(events, first_seq)]
+        with self._lock:
+            records = [record for record in records if record[0] >= self.next_seq]
+            if not records:
+                return
+            for seq, tokens in records:
+                self._index(seq, tokens)
+            if self.path:
+                with open(self.path, "ab") as f:
+                    f.write(b"".join(self.serializer.dumps(record) + b"\n" for record in records))
+
+    def prune(self, before: int) -> int:
+        """
+        Drop the pulses with sequence numbers below ``before`` from the postings and the file.
+
+        Returns:
+            Number of tokens left without postings and dropped
+        """
+        with self._lock:
+            if before <= self.first_seq:
+                return 0
+            self.first_seq = before
+            self.next_seq = max(self.next_seq, before)
+
+            dropped = 0
+            for token, postings in list(self._postings.items()):
+                cut = bisect.bisect_left(postings, before)
+                if cut == len(postings):
+                    del self._postings[token]
+                    dropped += 1
+                elif cut:
+                    self._postings[token] = postings[cut:]
+            if dropped:
+                self._vocabulary = [token for token in self._vocabulary if token in self._postings]
+                self._new_tokens = [token for token in self._new_tokens if token in self._postings]
+
+            if self.path and os.path.exists(self.path):
+                tmp_path = f"{self.path}.tmp"
+                with open(self.path, "rb") as f, open(tmp_path, "wb") as out:
+                    for line in f:
+                        # Records start with "[seq,"; a torn line has no newline and is dropped
+                        if line.endswith(b"\n") and int(line[1:line.index(b",")]) >= before:
+                            out.write(line)
+                os.replace(tmp_path, self.path)
+            return dropped
+
+    def _sort_vocabulary(self) -> None:
+        """Merge tokens first seen since the last prefix query into the sorted vocabulary."""
+        if self._new_tokens:
+            self._vocabulary = list(heapq.merge(self._vocabulary, sorted(self._new_tokens)))
+            self._new_tokens = []
+
+    def _tokens_with_prefix(self, prefix: str) -> List[str]:
+        self._sort_vocabulary()
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\U0010ffff")
+        return self._vocabulary[start:end]
+
+    def search(self, query: str) -> List[int]:
+        """
+        Sequence numbers of the pulses matching every term of ``query``.
+
+        Args:
+            query: Words separated by spaces; ``word*`` matches tokens starting with ``word``
+
+        Returns:
+            Matching sequence numbers, oldest first
+
+        Raises:
+            ValueError: If the query contains no words
+        """
+        terms = parse_query(query)
+        with self._lock:
+            lists = []
+            for token, prefix in terms:
+                if prefix:
+                    matched = [self._postings[match] for match in self._tokens_with_prefix(token)]
+                    if len(matched) == 1:
+                        lists.append(matched[0])
+                    else:
+                        lists.append(sorted(set().union(*matched)))
+                else:
+                    lists.append(self._postings.get(token, ()))
+
+            lists.sort(key=len)
+            result = list(lists[0])
+            for postings in lists[1:]:
+                if not result:
+                    break
+                result = _intersect(result, postings)
+            return result
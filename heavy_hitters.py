@@ -0,0 +1,227 @@
+"""
+Streaming top-K tracking of pulse users, events and roles.
+
+Each dimension keeps a Space-Saving summary: at most ``capacity`` counters,
+updated in O(1) per pulse through buckets of keys with equal counts. When a
+new key arrives and the summary is full, the key with the smallest count is
+replaced and the new key inherits that count as its ``error``, so every
+reported count overestimates the true one by at most ``error`` and every key
+occurring more than ``total / capacity`` times is guaranteed to be tracked.
+
+The recent-window variant splits the window into panes with one summary
+each; panes older than the window are dropped and the rest are merged on
+query. Memory is bounded by ``dimensions * (1 + panes) * capacity`` counters
+whatever the number of distinct users or events.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional
+
+from pulse_archive import parse_timestamp
+
+DIMENSIONS = ("user", "event", "role")
+
+
+class SpaceSaving:
+    """Space-Saving summary of the approximate most frequent keys of a stream."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.total = 0
+
+        self._counters: Dict[str, List[int]] = {}
+        self._buckets: Dict[int, Dict[str, None]] = {}
+        self._min = 0
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def _place(self, key: str, count: int) -> None:
+        self._buckets.setdefault(count, {})[key] = None
+
+    def _unplace(self, key: str, count: int) -> None:
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if count == self._min:
+                # The key moved to count + 1, so nothing lies in between
+                self._min = count + 1
+
+    def add(self, key: str) -> None:
+        """Count one occurrence of ``key`` in O(1)."""
+        self.total += 1
+        counter = self._counters.get(key)
+        if counter is not None:
+            self._unplace(key, counter[0])
+            counter[0] += 1
+        elif len(self._counters) < self.capacity:
+            counter = self._counters[key] = [1, 0]
+            self._min = 1
+        else:
+            # Replace the oldest key among those with the smallest count
+            smallest = self._min
+            evicted = next(iter(self._buckets[smallest]))
+            self._unplace(evicted, smallest)
+            del self._counters[evicted]
+            counter = self._counters[key] = [smallest + 1, smallest]
+        self._place(key, counter[0])
+
+    def counters(self) -> Dict[str, List[int]]:
+        """``key -> [count, error]`` of every tracked key. The lists must not be modified."""
+        return self._counters
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"total": self.total, "counters": [[key, count, error] for key, (count, error) in self._counters.items()]}
+
+    @classmethod
+    def from_snapshot(cls, capacity: int, snapshot: Dict[str, Any]) -> "SpaceSaving":
+        summary = cls(capacity)
+        summary.total = snapshot["total"]
+        # Keep the largest counts if the capacity shrank since the snapshot
+        counters = sorted(snapshot["counters"], key=lambda item: item[1], reverse=True)[:capacity]
+        for key, count, error in counters:
+            summary._counters[key] = [count, error]
+            summary._place(key, count)
+        summary._min = min(summary._buckets, default=0)
+        return summary
+
+
+def _top(summaries: List[SpaceSaving], k: int) -> List[Dict[str, Any]]:
+    """Merge summaries by adding counts and errors per key; returns the ``k`` largest."""
+    if len(summaries) == 1:
+        merged = summaries[0].counters()
+    else:
+        merged = {}
+        for summary in summaries:
+            for key, (count, error) in summary.counters().items():
+                counter = merged.setdefault(key, [0, 0])
+                counter[0] += count
+                counter[1] += error
+    ranked = sorted(merged.items(), key=lambda item: (-item[1][0], item[1][1]))[:k]
+    return [{"value": key, "count": count, "error": error} for key, (count, error) in ranked]
+
+
+class WindowedSpaceSaving:
+    """Space-Saving over the last ``window`` seconds, as ``panes`` rotating summaries."""
+
+    def __init__(self, capacity: int, window: float, panes: int):
+        self.capacity = capacity
+        self.window = window
+        self.panes = panes
+        self.pane_seconds = window / panes
+
+        self._panes = deque()  # (pane id, SpaceSaving), oldest first
+
+    def add(self, key: str, timestamp: float) -> None:
+        pane_id = int(timestamp // self.pane_seconds)
+        if self._panes and pane_id <= self._panes[-1][0] - self.panes:
+            return  # older than the window
+        for existing_id, summary in reversed(self._panes):
+            if existing_id == pane_id:
+                summary.add(key)
+                return
+            if existing_id < pane_id:
+                break
+
+        summary = SpaceSaving(self.capacity)
+        summary.add(key)
+        self._panes.append((pane_id, summary))
+        if len(self._panes) > 1 and self._panes[-2][0] > pane_id:
+            # A late pulse opened a pane between existing ones
+            self._panes = deque(sorted(self._panes, key=lambda pane: pane[0]))
+        while self._panes[0][0] <= self._panes[-1][0] - self.panes:
+            self._panes.popleft()
+
+    def current(self, now: float) -> List[SpaceSaving]:
+        """Summaries of the panes inside the window ending at ``now``."""
+        oldest = int(now // self.pane_seconds) - self.panes
+        return [summary for pane_id, summary in self._panes if pane_id > oldest]
+
+    def snapshot(self) -> List[Any]:
+        return [[pane_id, summary.snapshot()] for pane_id, summary in self._panes]
+
+    def restore(self, snapshot: List[Any]) -> None:
+        self._panes = deque((pane_id, SpaceSaving.from_snapshot(self.capacity, summary))
+                            for pane_id, summary in snapshot)
+
+
+class HeavyHitters:
+    """Global and recent-window top-K of every pulse dimension."""
+
+    def __init__(self, capacity: int = 1000, window: float = 3600.0, panes: int = 6,
+                 dimensions: Iterable[str] = DIMENSIONS):
+        """
+        Args:
+            capacity: Counters kept per dimension (and per pane of the window)
+            window: Length of the recent window in seconds
+            panes: Number of panes the window is split into (its granularity)
+            dimensions: Pulse fields to track
+        """
+        self.capacity = capacity
+        self.window = window
+        self.dimensions = tuple(dimensions)
+
+        self._lock = threading.Lock()
+        self._global = {dimension: SpaceSaving(capacity) for dimension in self.dimensions}
+        self._recent = {dimension: WindowedSpaceSaving(capacity, window, panes) for dimension in self.dimensions}
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Count one pulse entry in every dimension."""
+        self.add_many([entry])
+
+    def add_many(self, entries: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for entry in entries:
+                try:
+                    timestamp = parse_timestamp(entry["timestamp"])
+                except (KeyError, TypeError, AttributeError, ValueError):
+                    timestamp = None  # counted in the global summaries only
+                for dimension in self.dimensions:
+                    key = str(entry.get(dimension))
+                    self._global[dimension].add(key)
+                    if timestamp is not None:
+                        self._recent[dimension].add(key, timestamp)
+
+    def top(self, dimension: str, k: int, recent: bool = False, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        The ``k`` most frequent values of ``dimension``.
+
+        Args:
+            dimension: One of ``dimensions``
+            k: Number of values to return (at most ``capacity`` are tracked)
+            recent: Only count the last ``window`` seconds
+            now: End of the recent window in epoch seconds (default: now)
+
+        Returns:
+            ``items`` (``value``, ``count`` and ``error``, most frequent first),
+            ``total`` pulses counted and ``tracked`` distinct values
+        """
+        with self._lock:
+            if recent:
+                summaries = self._recent[dimension].current(time.time() if now is None else now)
+            else:
+                summaries = [self._global[dimension]]
+            return {
+                "items": _top(summaries, k) if summaries else [],
+                "total": sum(summary.total for summary in summaries),
+                "tracked": len(summaries[0]) if len(summaries) == 1 else len(
+                    set().union(*(summary.counters() for summary in summaries)))
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {dimension: {"global": self._global[dimension].snapshot(),
+                                "recent": self._recent[dimension].snapshot()}
+                    for dimension in self.dimensions}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        with self._lock:
+            for dimension in self.dimensions:
+                saved = snapshot.get(dimension)
+                if saved is None:
+                    continue
+                self._global[dimension] = SpaceSaving.from_snapshot(self.capacity, saved["global"])
+                self._recent[dimension].restore(saved["recent"])
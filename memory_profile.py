@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Memory diagnostics for the backend.
+
+``deep_size`` walks the objects reachable from a structure: containers,
+instance dicts and slots. It skips classes, modules and functions, which
+are shared code rather than data, and counts every object once. Containers
+longer than ``sample`` are walked through an evenly spaced sample of their
+items, and the sampled items' sizes are scaled up, so even a log of
+millions of pulses is measured in milliseconds. Objects shared between
+structures count in each of them.
+
+``AllocationTracer`` wraps ``tracemalloc``: ``mark()`` starts tracing and
+takes a baseline snapshot, and ``diff()`` lists the source lines that
+allocated the most memory since. Tracing slows allocations down, so it only
+runs between a mark and ``stop()``.
+
+The backend serves both through ``/debug/memory`` when started with
+``DEBUG_MEMORY=1``. Run as a script to print the report of a running
+backend, or of the local log and kernel loaded in-process:
+
+    python memory_profile.py --url http://127.0.0.1:5000 --watch 60 --repeat 5
+    python memory_profile.py
+"""
+
+import gc
+import itertools
+import os
+import sys
+import time
+import tracemalloc
+import types
+from array import array
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+_ATOMS = (str, bytes, bytearray, int, float, bool, complex, type(None), array, memoryview, range)
+_MAPPINGS = (dict, types.MappingProxyType)
+_CODE = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+         types.CodeType, types.FrameType)
+
+
+def _sampled(container, sample: Optional[int]) -> Tuple[Any, float]:
+    """Items of ``container`` to walk and the weight each stands for."""
+    items = container.items() if isinstance(container, _MAPPINGS) else container
+    size = len(container)
+    if not sample or size <= sample:
+        return items, 1.0
+    step = size // sample
+    return itertools.islice(items, 0, None, step), size / len(range(0, size, step))
+
+
+def deep_size(obj: Any, sample: Optional[int] = 1000) -> Tuple[int, int]:
+    """
+    Estimate the memory held by ``obj`` and everything it references.
+
+    Args:
+        obj: Structure to measure
+        sample: Walk at most this many items of any container (None: walk everything)
+
+    Returns:
+        ``(bytes, objects)``
+    """
+    seen = set()
+    stack: List[Tuple[Any, float]] = [(obj, 1.0)]
+    size = 0.0
+    count = 0.0
+    while stack:
+        current, weight = stack.pop()
+        if id(current) in seen or isinstance(current, _CODE):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current) * weight
+        count += weight
+
+        if isinstance(current, _ATOMS):
+            continue
+        if isinstance(current, _MAPPINGS):
+            items, scale = _sampled(current, sample)
+            for key, value in items:
+                stack.append((key, weight * scale))
+                stack.append((value, weight * scale))
+        elif isinstance(current, (list, tuple, set, frozenset, deque)):
+            items, scale = _sampled(current, sample)
+            stack.extend((item, weight * scale) for item in items)
+        else:
+            if hasattr(current, "__dict__"):
+                stack.append((current.__dict__, weight))
+            for cls in type(current).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(current, slot):
+                        stack.append((getattr(current, slot), weight))
+    return int(size), int(count)
+
+
+def measure(structures: Dict[str, Any], sample: Optional[int] = 1000) -> Dict[str, Dict[str, Any]]:
+    """
+    Size of every named structure.
+
+    Returns:
+        ``bytes``, ``objects``, ``items`` (its length, if it has one) and
+        ``bytes_per_item`` per name
+    """
+    report = {}
+    for name, obj in structures.items():
+        try:
+            size, objects = deep_size(obj, sample)
+        except RuntimeError as e:
+            # Mutated while it was walked
+            report[name] = {"error": str(e)}
+            continue
+        try:
+            items = len(obj)
+        except TypeError:
+            items = None
+        report[name] = {
+            "bytes": size,
+            "objects": objects,
+            "items": items,
+            "bytes_per_item": round(size / items, 1) if items else None
+        }
+    return report
+
+
+def object_counts(top: int = 20) -> List[Dict[str, Any]]:
+    """Most common types among the objects tracked by the garbage collector."""
+    counts = Counter(type(obj).__name__ for obj in gc.get_objects())
+    return [{"type": name, "count": count} for name, count in counts.most_common(top)]
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class AllocationTracer:
+    """``tracemalloc`` baseline and diff between two points in time."""
+
+    def __init__(self, frames: int = 1):
+        """
+        Args:
+            frames: Stack frames recorded per allocation
+        """
+        self.frames = frames
+        self.marked_at: Optional[float] = None
+        self._baseline = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing() and self._baseline is not None
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ])
+
+    def mark(self) -> None:
+        """Start tracing (if needed) and make now the baseline."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._baseline = self._snapshot()
+        self.marked_at = time.time()
+
+    def stop(self) -> None:
+        self._baseline = None
+        self.marked_at = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def diff(self, top: int = 20) -> Dict[str, Any]:
+        """Source lines with the largest allocation growth since the last mark."""
+        if not self.tracing:
+            return {"tracing": False}
+        stats = self._snapshot().compare_to(self._baseline, "lineno")
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": True,
+            "seconds": round(time.time() - self.marked_at, 1),
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "size_diff": sum(stat.size_diff for stat in stats),
+            "top": [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size": stat.size,
+                    "count": stat.count
+                }
+                for stat in stats[:top]
+            ]
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    rss = report.get("rss_bytes")
+    print(f"🧠 RSS {rss / 1e6:,.1f} MB" if rss else "🧠 RSS unknown")
+    kernel = report.get("kernel", {})
+    if kernel.get("bytes_per_memory_entry") is not None:
+        print(f"   kernel memory: {kernel['memory_entries']:,} entries, "
+              f"{kernel['bytes_per_memory_entry']:,.0f} bytes per entry")
+
+    print(f"\n  {'structure':<28}{'bytes':>16}{'objects':>14}{'items':>12}{'bytes/item':>12}")
+    for name, sizes in sorted(report["structures"].items(), key=lambda item: -item[1].get("bytes", 0)):
+        if "error" in sizes:
+            print(f"  {name:<28}  ⚠️  {sizes['error']}")
+            continue
+        items = "" if sizes["items"] is None else f"{sizes['items']:,}"
+        per_item = "" if sizes["bytes_per_item"] is None else f"{sizes['bytes_per_item']:,.1f}"
+        print(f"  {name:<28}{sizes['bytes']:>16,}{sizes['objects']:>14,}{items:>12}{per_item:>12}")
+
+    print("\n  Most common objects: " + ", ".join(f"{row['type']} {row['count']:,}"
+                                               for row in report["object_counts"][:10]))
+
+    allocations = report.get("allocations", {})
+    if allocations.get("tracing"):
+        print(f"\n  Allocations over {allocations['seconds']}s: {allocations['size_diff']:+,} bytes "
+              f"(traced {allocations['traced_bytes']:,}, peak {allocations['peak_bytes']:,})")
+        for row in allocations["top"]:
+            print(f"  {row['size_diff']:>+14,} B {row['count_diff']:>+9,} obj  {row['location']}")
+
+
+def main():
+    import argparse
+    import json
+    import urllib.request
+
+    parser = argparse.ArgumentParser(description="Report memory use per structure and allocation growth")
+    parser.add_argument("--url", help="Backend started with DEBUG_MEMORY=1 (default: load the local log in-process)")
+    parser.add_argument("--watch", type=float, default=0,
+                        help="Mark, wait this many seconds, then report the allocations in between")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of --watch periods (default: 1)")
+    parser.add_argument("--sample", type=int, default=1000, help="Items walked per container (0: all)")
+    parser.add_argument("--json", action="store_true", help="Print the raw JSON report")
+    args = parser.parse_args()
+
+    if args.url:
+        base_url = args.url.rstrip("/")
+
+        def fetch(path, method="GET"):
+            request = urllib.request.Request(f"{base_url}{path}", method=method)
+            with urllib.request.urlopen(request, timeout=300) as response:
+                return json.loads(response.read())
+
+        def mark():
+            fetch("/debug/memory/mark", method="POST")
+
+        def report():
+            return fetch(f"/debug/memory?sample={args.sample}")
+    else:
+        # The app module loads the log and kernel exactly as the server would
+        os.environ["EUYSTACIO_STARTUP"] = "eager"
+        os.environ["COMPACTION_INTERVAL"] = "0"
+        os.environ["PULSE_LISTENER"] = ""
+        import app
+
+        def mark():
+            app.allocation_tracer.mark()
+
+        def report():
+            return app.memory_report(sample=args.sample or None)
+
+    try:
+        for period in range(args.repeat if args.watch else 1):
+            if args.watch:
+                mark()
+                time.sleep(args.watch)
+            result = report()
+            if args.json:
+                print(json.dumps(result, indent=2))
+            else:
+                if period:
+                    print()
+                print_report(result)
+    except OSError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
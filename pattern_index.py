@@ -0,0 +1,169 @@
+"""
+Persisted index of patterns detected by the Euystacio kernel.
+
+The kernel only keeps its most recent patterns in ``pattern_memory``; every
+pattern is also handed to a ``PatternIndex``, which appends it to a JSON Lines
+file and keeps sorted in-memory keys so history can be queried by time,
+direction and strength in O(log n + k). ``prune`` drops patterns older than
+the pulses retention keeps.
+"""
+
+import bisect
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from serialization import JSONSerializer, get_serializer
+
+
+class PatternIndex:
+    """
+    Append-only pattern history with time, direction and strength indexes.
+
+    Patterns arrive in time order, so the time index is a plain list kept
+    sorted by appending. Each direction has its own time-ordered list, and a
+    strength-ordered list serves queries that only bound the strength; it is
+    sorted once when the file is loaded and kept sorted by insertion after.
+    """
+
+    def __init__(self, path: Optional[str] = None, serializer: Optional[JSONSerializer] = None,
+                 load: bool = True):
+        """
+        Load the index from ``path`` (a JSON Lines file), if given.
+
+        Args:
+            path: File patterns are persisted to; ``None`` keeps them in memory only
+            serializer: Serializer for the file (default: fastest available)
+            load: Read ``path`` now; pass False to defer it to ``load()``
+        """
+        self.path = path
+        self.serializer = serializer or get_serializer()
+
+        self._lock = threading.Lock()
+        self._patterns: List[Dict[str, Any]] = []
+        self._times: List[float] = []
+        self._by_direction: Dict[str, tuple] = {}
+        self._by_strength: List[tuple] = []
+
+        if load:
+            self.load()
+
+    def load(self) -> None:
+        """Index the patterns persisted in ``path``, if it exists."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        loaded = []
+        with self._lock, open(self.path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    loaded.append(self.serializer.loads(line))
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    continue
+            # One sort of the strength index instead of an insort per pattern
+            self._reset(self._patterns + loaded)
+
+    def _reset(self, patterns: List[Dict[str, Any]]) -> None:
+        """Rebuild every index from ``patterns``, sorting the strength index once."""
+        self._patterns = []
+        self._times = []
+        self._by_direction = {}
+        self._by_strength = []
+        for pattern in patterns:
+            self._append(pattern)
+        self._by_strength = sorted((pattern.get('strength', 0.0), seq) for seq, pattern in enumerate(patterns))
+
+    def _append(self, pattern: Dict[str, Any]) -> None:
+        """Add ``pattern`` to every index but the strength index."""
+        seq = len(self._patterns)
+        timestamp = pattern.get('timestamp', 0.0)
+
+        self._patterns.append(pattern)
+        self._times.append(timestamp)
+
+        times, seqs = self._by_direction.setdefault(pattern.get('direction'), ([], []))
+        times.append(timestamp)
+        seqs.append(seq)
+
+    def _index(self, pattern: Dict[str, Any]) -> None:
+        self._append(pattern)
+        bisect.insort(self._by_strength, (pattern.get('strength', 0.0), len(self._patterns) - 1))
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, pattern: Dict[str, Any]) -> None:
+        """Index and persist one pattern. Usable as the kernel's ``on_pattern`` listener."""
+        with self._lock:
+            self._index(pattern)
+            if self.path:
+                with open(self.path, "ab") as f:
+                    f.write(self.serializer.dumps(pattern) + b"\n")
+
+    def prune(self, before: float) -> int:
+        """
+        Drop the patterns detected before ``before`` (epoch seconds) and rewrite the file without them.
+
+        Returns:
+            Number of patterns dropped
+        """
+        with self._lock:
+            cut = bisect.bisect_left(self._times, before)
+            if not cut:
+                return 0
+            self._reset(self._patterns[cut:])
+            if self.path:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(b"".join(self.serializer.dumps(pattern) + b"\n" for pattern in self._patterns))
+                os.replace(tmp_path, self.path)
+            return cut
+
+    def query(self, since: Optional[float] = None, direction: Optional[str] = None,
+              min_strength: Optional[float] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find patterns matching all given conditions.
+
+        Args:
+            since: Only patterns with ``timestamp >= since`` (epoch seconds)
+            direction: Only patterns with this direction (``positive``/``negative``)
+            min_strength: Only patterns with ``strength >= min_strength``
+            limit: Keep only the most recent ``limit`` matches
+
+        Returns:
+            Matching patterns, oldest first
+        """
+        with self._lock:
+            if direction is not None:
+                times, seqs = self._by_direction.get(direction, ([], []))
+            else:
+                times, seqs = self._times, None
+
+            start = bisect.bisect_left(times, since) if since is not None else 0
+            candidates = seqs[start:] if seqs is not None else range(start, len(times))
+
+            # A strength bound is answered from the strength index when it
+            # selects fewer candidates than the time/direction range.
+            if min_strength is not None:
+                strong_from = bisect.bisect_left(self._by_strength, (min_strength, -1))
+                if len(self._by_strength) - strong_from < len(candidates):
+                    candidates = sorted(seq for _, seq in self._by_strength[strong_from:])
+
+            patterns = self._patterns
+            result = []
+            for seq in candidates:
+                pattern = patterns[seq]
+                if since is not None and pattern.get('timestamp', 0.0) < since:
+                    continue
+                if direction is not None and pattern.get('direction') != direction:
+                    continue
+                if min_strength is not None and pattern.get('strength', 0.0) < min_strength:
+                    continue
+                result.append(pattern)
+
+        if limit and limit > 0:
+            result = result[-limit:]
+        return result
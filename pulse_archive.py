@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Cold-history pulse archive.
+
+Pulses older than a threshold are moved out of the JSON log into a columnar
+archive: one fixed-width little-endian file per column plus a string
+dictionary side file.
+
+    timestamp.f64   float64 seconds since the epoch (UTC)
+    sentiment.f32   float32 sentiment
+    user.u32        uint32 id into strings.json["user"]
+    role.u32        uint32 id into strings.json["role"]
+    event.u32       uint32 id into strings.json["event"]
+    strings.json    {"count": N, "user": [...], "role": [...], "event": [...]}
+
+Readers ``mmap`` the column files and slice them as memoryviews without
+copying. ``count`` in the side file is the number of committed rows; column
+bytes beyond it are left over from an interrupted append and are ignored.
+
+Run as a script to archive an existing log:
+
+    python pulse_archive.py --older-than-days 30
+"""
+
+import bisect
+import mmap
+import os
+import sys
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from serialization import get_serializer
+
+COLUMNS = {
+    'timestamp': ('d', 'timestamp.f64'),
+    'sentiment': ('f', 'sentiment.f32'),
+    'user': ('I', 'user.u32'),
+    'role': ('I', 'role.u32'),
+    'event': ('I', 'event.u32'),
+}
+STRING_COLUMNS = ('user', 'role', 'event')
+STRINGS_FILE = "strings.json"
+
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def parse_timestamp(value: str) -> float:
+    """Convert a pulse timestamp (ISO 8601, ``Z`` suffix) to epoch seconds."""
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def format_timestamp(seconds: float) -> str:
+    """Convert epoch seconds back to the ``...Z`` format ``post_pulse`` writes."""
+    moment = datetime.fromtimestamp(round(seconds, 6), timezone.utc).replace(tzinfo=None)
+    return moment.isoformat() + "Z"
+
+
+class PulseArchive:
+    """
+    Append-only columnar archive of pulses, read through ``mmap``.
+
+    Entries must be appended in chronological order so the timestamp column
+    stays sorted and time ranges can be located by binary search.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Open (or lazily create) the archive in ``directory``.
+
+        Args:
+            directory: Directory holding the column files and string dictionary
+        """
+        self.directory = directory
+        self.serializer = get_serializer()
+
+        self._lock = threading.RLock()
+        self._count = 0
+        self._strings: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+        self._string_ids: Dict[str, Dict[str, int]] = {name: {} for name in STRING_COLUMNS}
+        self._views: Dict[str, memoryview] = {name: memoryview(array(typecode))
+                                               for name, (typecode, _) in COLUMNS.items()}
+        self._sentiment_sum = (0, 0.0)
+        self._file_state = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _stat(self):
+        try:
+            st = os.stat(self._path(STRINGS_FILE))
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _refresh(self) -> None:
+        """Reload the dictionary and remap columns if the archive changed on disk."""
+        state = self._stat()
+        if state == self._file_state:
+            return
+
+        if state is None:
+            strings = {'count': 0, **{name: [] for name in STRING_COLUMNS}}
+        else:
+            with open(self._path(STRINGS_FILE), "rb") as f:
+                strings = self.serializer.loads(f.read())
+
+        self._count = strings['count']
+        self._strings = {name: strings[name] for name in STRING_COLUMNS}
+        self._string_ids = {name: {value: i for i, value in enumerate(values)}
+                            for name, values in self._strings.items()}
+        self._views = {name: self._map_column(name) for name in COLUMNS}
+        self._file_state = state
+
+    def _map_column(self, name: str) -> memoryview:
+        """Map a column file and return a typed view of its committed rows."""
+        typecode, filename = COLUMNS[name]
+        if self._count == 0:
+            return memoryview(array(typecode))
+
+        with open(self._path(filename), "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if not _NATIVE_LITTLE_ENDIAN:
+            values = array(typecode, mapped[:self._count * array(typecode).itemsize])
+            values.byteswap()
+            return memoryview(values)
+
+        return memoryview(mapped)[:self._count * array(typecode).itemsize].cast(typecode)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return self._count
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> memoryview:
+        """
+        Zero-copy view of rows ``start:stop`` of a column.
+
+        Args:
+            name: One of ``timestamp``, ``sentiment``, ``user``, ``role``, ``event``
+            start: First row
+            stop: End row (exclusive), default the end of the archive
+
+        Returns:
+            A typed memoryview (``d``, ``f`` or ``I``) over the mapped file
+        """
+        with self._lock:
+            self._refresh()
+            return self._views[name][start:stop]
+
+    def strings(self, name: str) -> List[str]:
+        """Dictionary of a string column; ids index into this list."""
+        with self._lock:
+            self._refresh()
+            return self._strings[name]
+
+    def locate(self, since: Optional[float] = None, until: Optional[float] = None) -> range:
+        """Rows whose timestamp lies in ``[since, until)``, found by binary search."""
+        timestamps = self.column('timestamp')
+        start = bisect.bisect_left(timestamps, since) if since is not None else 0
+        stop = bisect.bisect_left(timestamps, until) if until is not None else len(timestamps)
+        return range(start, max(start, stop))
+
+    def entries(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Decode rows ``start:stop`` back into pulse entry dicts."""
+        with self._lock:
+            self._refresh()
+            views = {name: self._views[name][start:stop] for name in COLUMNS}
+            strings = self._strings
+
+        for i in range(len(views['timestamp'])):
+            yield {
+                "timestamp": format_timestamp(views['timestamp'][i]),
+                "event": strings['event'][views['event'][i]],
+                "sentiment": round(views['sentiment'][i], 6),
+                "role": strings['role'][views['role'][i]],
+                "user": strings['user'][views['user'][i]],
+            }
+
+    def bucket_totals(self, bucket_seconds: float, since: Optional[float] = None,
+                      until: Optional[float] = None) -> Dict[int, List[float]]:
+        """
+        Count and sum sentiments per time bucket over ``[since, until)``.
+
+        Uses NumPy over the mapped columns when it is installed.
+
+        Returns:
+            Mapping of bucket index (``timestamp // bucket_seconds``) to ``[count, sum]``
+        """
+        rows = self.locate(since, until)
+        timestamps = self.column('timestamp', rows.start, rows.stop)
+        sentiments = self.column('sentiment', rows.start, rows.stop)
+        if not len(timestamps):
+            return {}
+
+        try:
+            import numpy as np
+        except ImportError:
+            totals: Dict[int, List[float]] = {}
+            for ts, sentiment in zip(timestamps, sentiments):
+                bucket = totals.setdefault(int(ts // bucket_seconds), [0, 0.0])
+                bucket[0] += 1
+                bucket[1] += sentiment
+            return totals
+
+        keys = np.floor_divide(np.frombuffer(timestamps, dtype=np.float64), bucket_seconds).astype(np.int64)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse)
+        sums = np.bincount(inverse, weights=np.frombuffer(sentiments, dtype=np.float32))
+        return {int(k): [int(c), float(t)] for k, c, t in zip(unique, counts, sums)}
+
+    def sentiment_total(self) -> tuple:
+        """Return ``(count, sum)`` of all archived sentiments, extended incrementally."""
+        with self._lock:
+            self._refresh()
+            counted, total = self._sentiment_sum
+            if counted > self._count:
+                counted, total = 0, 0.0
+            if counted < self._count:
+                total += sum(self._views['sentiment'][counted:self._count])
+                self._sentiment_sum = (self._count, total)
+            return self._count, total
+
+    def append(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Append pulse entries (oldest first) to the archive.
+
+        Column data is written first and the new row count is committed by
+        atomically replacing the string dictionary afterwards.
+
+        Returns:
+            Number of rows appended
+        """
+        if not entries:
+            return 0
+
+        with self._lock:
+            self._refresh()
+            os.makedirs(self.directory, exist_ok=True)
+
+            strings = {name: list(values) for name, values in self._strings.items()}
+            ids = {name: dict(mapping) for name, mapping in self._string_ids.items()}
+            columns = {name: array(typecode) for name, (typecode, _) in COLUMNS.items()}
+
+            for entry in entries:
+                columns['timestamp'].append(parse_timestamp(entry['timestamp']))
+                columns['sentiment'].append(float(entry['sentiment']))
+                for name in STRING_COLUMNS:
+                    value = str(entry.get(name, ""))
+                    index = ids[name].get(value)
+                    if index is None:
+                        index = ids[name][value] = len(strings[name])
+                        strings[name].append(value)
+                    columns[name].append(index)
+
+            for name, (typecode, filename) in COLUMNS.items():
+                values = columns[name]
+                if not _NATIVE_LITTLE_ENDIAN:
+                    values.byteswap()
+                with open(self._path(filename), "ab") as f:
+                    # Drop bytes left over from an interrupted append
+                    f.truncate(self._count * values.itemsize)
+                    f.seek(0, os.SEEK_END)
+                    values.tofile(f)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            count = self._count + len(entries)
+            tmp_path = self._path(STRINGS_FILE + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(self.serializer.dumps({'count': count, **strings}))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path(STRINGS_FILE))
+
+            self._file_state = None
+            self._refresh()
+            return len(entries)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Move old pulses from the JSON log into the columnar archive"
+    )
+    parser.add_argument("--log", default=os.environ.get("PULSE_LOG_FILE", "pulse_log.json"),
+                        help="Pulse log to archive from (default: pulse_log.json)")
+    parser.add_argument("--archive-dir", default=os.environ.get("PULSE_ARCHIVE_DIR", "pulse_archive"),
+                        help="Archive directory (default: pulse_archive)")
+    parser.add_argument("--older-than-days", type=float, required=True,
+                        help="Archive pulses older than this many days")
+    args = parser.parse_args()
+
+    from pulse_store import PulseStore
+
+    store = PulseStore(args.log)
+    archive = PulseArchive(args.archive_dir)
+    cutoff = datetime.now(timezone.utc).timestamp() - args.older_than_days * 86400
+
+    moved = store.archive_older_than(cutoff, archive)
+    print(f"📦 Archived {moved} pulse(s) to {args.archive_dir}; {len(store)} remain in {args.log}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
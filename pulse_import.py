@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Bulk import of historical pulses.
+
+Streams a CSV, JSON Lines or JSON array file without loading it whole,
+validates the rows in worker processes with the same rules as ``POST /pulse``
+and appends them to the pulse log in large batches, each sorted by
+timestamp and written with a single rewrite of the live file:
+
+    python pulse_import.py history.csv --replay
+
+Rows need ``timestamp`` (ISO 8601 or epoch seconds) and ``sentiment``;
+``event``, ``role`` and ``user`` get the ``POST /pulse`` defaults. Rejected
+rows are counted and, with ``--errors``, written out as JSON Lines.
+
+The log only grows at its end and must stay in chronological order, which
+retention and the archive rely on. Rows older than the newest logged pulse
+are therefore rejected rather than merged in. Input only needs to be sorted
+across batches: rows are sorted within every ``--batch-size`` batch, so
+sort the file first (or raise ``--batch-size``) when rows are far out of
+order, and import older history before newer pulses arrive.
+
+Progress is checkpointed after every batch, so an interrupted import is
+resumed by running the same command again. The log, shards, segments and
+kernel snapshot are configured by the same environment variables as the
+server; stop the server while importing.
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from pulse_archive import format_timestamp, parse_timestamp
+from serialization import get_serializer
+from validation import PulseValidationError, validate_pulse
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'json'}
+READ_CHUNK_BYTES = 1 << 20
+VALIDATE_CHUNK_ROWS = 2000
+
+serializer = get_serializer()
+
+
+def detect_format(path: str) -> str:
+    """Input format implied by the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot tell the format of {path}; pass --format")
+    return FORMATS[extension]
+
+
+def iter_json_array(f, chunk_bytes: int = READ_CHUNK_BYTES) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array read incrementally from ``f``.
+
+    Only a chunk of the file plus the element being decoded is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_bytes)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip_whitespace()
+    if buffer[pos:pos + 1] != "[":
+        raise ValueError("JSON input must be an array")
+    pos += 1
+    skip_whitespace()
+    if buffer[pos:pos + 1] == "]":
+        return
+
+    while True:
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+            # A value running up to the end of the buffer may continue in the next chunk
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            fill()
+            continue
+
+        yield value
+        pos = end
+        skip_whitespace()
+        separator = buffer[pos:pos + 1]
+        pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}")
+        skip_whitespace()
+
+
+def read_records(path: str, fmt: str) -> Iterator[Any]:
+    """
+    Stream raw records from the input file.
+
+    JSON Lines records are the undecoded lines and CSV records are cell
+    lists after the header, so decoding happens in the worker processes.
+    """
+    if fmt == 'jsonl':
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield line
+    elif fmt == 'csv':
+        with open(path, newline="", encoding="utf-8") as f:
+            yield from csv.reader(f)
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield from iter_json_array(f)
+
+
+def normalize_timestamp(value: Any) -> tuple:
+    """
+    Parse a row timestamp.
+
+    Returns:
+        ``(epoch_seconds, timestamp)`` with the timestamp in the format ``post_pulse`` writes
+
+    Raises:
+        PulseValidationError: If the timestamp is missing or unreadable
+    """
+    if value is None or value == "":
+        raise PulseValidationError("Timestamp required")
+    try:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            seconds = float(value)
+        else:
+            try:
+                seconds = float(value)
+            except ValueError:
+                seconds = parse_timestamp(str(value))
+        return seconds, format_timestamp(seconds)
+    except (ValueError, TypeError, OverflowError, OSError):
+        raise PulseValidationError("Invalid timestamp")
+
+
+def validate_chunk(task: tuple) -> tuple:
+    """
+    Decode and validate one chunk of records (runs in a worker process).
+
+    Args:
+        task: ``(format, header, first_row, records)``; ``header`` holds the CSV column names
+
+    Returns:
+        ``(pulses, errors)``: ``(epoch_seconds, row, entry)`` triples and ``(row, message)`` pairs
+    """
+    fmt, header, first_row, records = task
+    pulses = []
+    errors = []
+    for row, record in enumerate(records, first_row):
+        try:
+            if fmt == 'jsonl':
+                try:
+                    record = serializer.loads(record)
+                except ValueError:
+                    raise PulseValidationError("Invalid JSON")
+            elif fmt == 'csv':
+                # Empty cells count as missing so the POST /pulse defaults apply
+                record = {name: value for name, value in zip(header, record) if value != ""}
+            if not isinstance(record, dict):
+                raise PulseValidationError("Row is not an object")
+
+            seconds, timestamp = normalize_timestamp(record.get("timestamp"))
+            pulses.append((seconds, row, {"timestamp": timestamp, **validate_pulse(record)}))
+        except PulseValidationError as e:
+            errors.append((row, str(e)))
+    return pulses, errors
+
+
+def _chunks(records: Iterator[Any], fmt: str, header: Optional[List[str]], skip: int) -> Iterator[tuple]:
+    """Group records into validation tasks, skipping the first ``skip`` rows."""
+    chunk = []
+    first_row = skip + 1
+    for row, record in enumerate(records, 1):
+        if row <= skip:
+            continue
+        chunk.append(record)
+        if len(chunk) >= VALIDATE_CHUNK_ROWS:
+            yield fmt, header, first_row, chunk
+            first_row += len(chunk)
+            chunk = []
+    if chunk:
+        yield fmt, header, first_row, chunk
+
+
+def _ordered_results(pool, tasks: Iterator[tuple], window: int) -> Iterator[tuple]:
+    """
+    ``pool.imap(validate_chunk, tasks)`` with at most ``window`` chunks in flight.
+
+    ``imap`` would read the whole input ahead of the workers; this keeps
+    memory bounded by reading only as fast as chunks are validated.
+    """
+    from collections import deque
+
+    in_flight = deque()
+    for task in tasks:
+        in_flight.append(pool.apply_async(validate_chunk, (task,)))
+        if len(in_flight) >= window:
+            yield in_flight.popleft().get()
+    while in_flight:
+        yield in_flight.popleft().get()
+
+
+class ImportState:
+    """
+    Resume checkpoint of an import, kept next to the pulse log.
+
+    Before a batch is written the checkpoint records it as pending along
+    with the log length; after a restart the log length tells whether the
+    pending batch made it to disk. ``replay_from`` is the first sequence
+    number the kernel snapshot did not cover when the import started, so a
+    resumed import still replays the batches written before the interruption.
+    """
+
+    def __init__(self, path: str, source: Dict[str, Any]):
+        self.path = path
+        self.source = source
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.pending = None
+        self.replay_from = 0
+
+    def load(self) -> bool:
+        """Read the checkpoint if it belongs to the same input file; returns whether it did."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved["source"] != self.source:
+            raise ValueError(f"{self.path} belongs to an import of {saved['source']['path']}; "
+                             f"finish that import or pass --restart")
+        self.rows = saved["rows"]
+        self.imported = saved["imported"]
+        self.rejected = saved["rejected"]
+        self.pending = saved["pending"]
+        self.replay_from = saved.get("replay_from", 0)  # checkpoints of older versions rebuild the kernel
+        return True
+
+    def save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "rows": self.rows, "imported": self.imported,
+                       "rejected": self.rejected, "pending": self.pending, "replay_from": self.replay_from}, f)
+        os.replace(tmp_path, self.path)
+
+    def settle(self, next_seq: int) -> None:
+        """Account for a batch left pending by an interrupted run."""
+        if self.pending is None:
+            return
+        if next_seq == self.pending["seq"] + self.pending["count"]:
+            self.commit()
+        elif next_seq == self.pending["seq"]:
+            self.pending = None
+        else:
+            raise ValueError("The pulse log changed since the interrupted batch was written; cannot resume")
+
+    def begin(self, rows: int, count: int, rejected: int, seq: int) -> None:
+        self.pending = {"rows": rows, "count": count, "rejected": rejected, "seq": seq}
+        self.save()
+
+    def commit(self) -> None:
+        self.rows = self.pending["rows"]
+        self.imported += self.pending["count"]
+        self.rejected += self.pending["rejected"]
+        self.pending = None
+        self.save()
+
+
+def _kernel_snapshot_seq(app) -> int:
+    """First sequence number not applied by the saved kernel snapshot (0 without a snapshot)."""
+    if not os.path.exists(app.KERNEL_SNAPSHOT_FILE):
+        return 0
+    with open(app.KERNEL_SNAPSHOT_FILE, "rb") as f:
+        return serializer.loads(f.read())["seq"]
+
+
+def _newest_timestamp(app) -> Optional[float]:
+    """Epoch seconds of the newest logged pulse, in the store or else the archive."""
+    if len(app.pulse_store):
+        entry = app.pulse_store.entries_at([len(app.pulse_store) - 1])[0]
+    elif len(app.pulse_archive):
+        entry = app.pulse_archive.entries(len(app.pulse_archive) - 1, len(app.pulse_archive))[0]
+    else:
+        return None
+    return parse_timestamp(entry["timestamp"])
+
+
+def _source_fingerprint(path: str) -> Dict[str, Any]:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Import historical pulses from CSV, JSON Lines or a JSON array into the pulse log"
+    )
+    parser.add_argument("input", help="File to import")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())),
+                        help="Input format (default: from the file extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Validation worker processes (default: CPU count; 1 validates inline)")
+    parser.add_argument("--batch-size", type=int, default=50000,
+                        help="Pulses written per batch (default: 50000)")
+    parser.add_argument("--replay", action="store_true",
+                        help="Rebuild the kernel from the log afterwards and save a kernel snapshot")
+    parser.add_argument("--errors", help="Append rejected rows to this JSON Lines file")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore the checkpoint of an interrupted import and start over")
+    args = parser.parse_args()
+
+    if os.environ.get("EUYSTACIO_ROLE") == "follower":
+        print("❌ Import into the leader; followers copy its log")
+        return 1
+    try:
+        fmt = args.format or detect_format(args.input)
+        source = _source_fingerprint(args.input)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    # The app module opens the store and kernel exactly as the server would
+    os.environ["EUYSTACIO_STARTUP"] = "eager"
+    os.environ["PULSE_LISTENER"] = ""
+    os.environ["COMPACTION_INTERVAL"] = "0"
+    import app
+
+    state = ImportState(f"{app.PULSE_LOG_FILE}.import-state.json", source)
+    if args.restart and os.path.exists(state.path):
+        os.remove(state.path)
+    try:
+        resumed = state.load()
+        state.settle(app.pulse_store.next_seq())
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if not resumed:
+        state.replay_from = _kernel_snapshot_seq(app)
+    state.save()
+    if resumed:
+        print(f"⏩ Resuming after row {state.rows:,} ({state.imported:,} imported, {state.rejected:,} rejected)")
+
+    records = read_records(args.input, fmt)
+    header = None
+    if fmt == 'csv':
+        header = next(records, [])
+        if "sentiment" not in header:
+            print("❌ CSV header must include a sentiment column")
+            return 1
+    tasks = _chunks(records, fmt, header, state.rows)
+
+    pool = None
+    if args.workers > 1:
+        import multiprocessing
+
+        pool = multiprocessing.Pool(args.workers)
+        results = _ordered_results(pool, tasks, window=args.workers * 4)
+    else:
+        results = map(validate_chunk, tasks)
+
+    errors_file = open(args.errors, "a", encoding="utf-8") if args.errors else None
+    started = time.perf_counter()
+    rows_at_start = state.rows
+    batch = []
+    batch_rejected = 0
+    rows = state.rows
+    newest = _newest_timestamp(app)
+
+    def flush():
+        nonlocal batch, batch_rejected, newest
+        batch.sort(key=lambda pulse: pulse[0])
+        if newest is not None:
+            stale = 0
+            while stale < len(batch) and batch[stale][0] < newest:
+                stale += 1
+            if stale:
+                if errors_file is not None:
+                    for _, row, _ in batch[:stale]:
+                        errors_file.write(json.dumps({"row": row, "error": "Older than the newest logged pulse"}) + "\n")
+                    errors_file.flush()
+                batch_rejected += stale
+                batch = batch[stale:]
+        if batch:
+            newest = batch[-1][0]
+
+        with app.ingest_lock:
+            state.begin(rows, len(batch), batch_rejected, app.pulse_store.next_seq())
+            if batch:
+                entries = [entry for _, _, entry in batch]
+                first = app.pulse_store.extend(entries)
+                app.event_index.add_many(first, [entry["event"] for entry in entries])
+                app.track(first, entries)
+            state.commit()
+        batch = []
+        batch_rejected = 0
+
+        elapsed = time.perf_counter() - started
+        rate = (state.rows - rows_at_start) / elapsed if elapsed > 0 else 0.0
+        print(f"📥 {state.rows:,} rows read, {state.imported:,} imported, {state.rejected:,} rejected "
+              f"({rate:,.0f} rows/s)")
+
+    try:
+        for pulses, errors in results:
+            rows += len(pulses) + len(errors)
+            batch.extend(pulses)
+            batch_rejected += len(errors)
+            if errors_file is not None:
+                for row, message in errors:
+                    errors_file.write(json.dumps({"row": row, "error": message}) + "\n")
+            if len(batch) >= args.batch_size:
+                if errors_file is not None:
+                    errors_file.flush()
+                flush()
+        if batch or rows > state.rows:
+            flush()
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if errors_file is not None:
+            errors_file.close()
+
+    elapsed = time.perf_counter() - started
+    rate = (state.rows - rows_at_start) / elapsed if elapsed > 0 else 0.0
+    print(f"✅ Imported {state.imported:,} pulse(s) from {args.input} in {elapsed:.1f}s "
+          f"({rate:,.0f} rows/s); {state.rejected:,} rejected")
+
+    if args.replay:
+        started = time.perf_counter()
+        with app.ingest_lock:
+            # Startup replayed the log into the kernel, including batches of an
+            # interrupted run; start over from the state the import began with
+            if state.replay_from:
+                if _kernel_snapshot_seq(app) != state.replay_from:
+                    print("❌ The kernel snapshot changed during the import; restart the server to replay the log")
+                    return 1
+                with open(app.KERNEL_SNAPSHOT_FILE, "rb") as f:
+                    app.euystacio.restore(serializer.loads(f.read())["kernel"])
+            else:
+                app.euystacio.restore(app.Euystacio(config=app.euystacio_config).snapshot())
+            replayed = app.replay_log(state.replay_from)
+            app.save_kernel_snapshot(app.pulse_store.next_seq())
+        print(f"🧠 Replayed {replayed:,} pulse(s) into the kernel in {time.perf_counter() - started:.1f}s; "
+              f"snapshot saved to {app.KERNEL_SNAPSHOT_FILE}")
+
+    os.remove(state.path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
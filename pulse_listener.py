@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Socket listener for high-rate pulse ingest.
+
+Edge collectors can stream pulses over a plain TCP or Unix socket instead of
+one HTTP request per pulse. Every frame holds one pulse object and is
+answered with one reply frame, ``{"seq": N}`` or ``{"error": "..."}``, in
+the order received. Two framings are supported:
+
+    line     newline-delimited JSON
+    length   4-byte big-endian length prefix, then a MessagePack (or JSON) pulse
+
+Frames that arrive together are validated, stored and applied to the kernel
+as one batch. Enabled in the backend with ``PULSE_LISTENER``:
+
+    PULSE_LISTENER=tcp://127.0.0.1:7000 python3 app.py
+    PULSE_LISTENER=unix:///tmp/euystacio.sock PULSE_LISTENER_FRAMING=length python3 app.py
+
+or run on its own, without the HTTP API:
+
+    python pulse_listener.py --listen tcp://127.0.0.1:7000
+"""
+
+import os
+import socketserver
+import struct
+import sys
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from serialization import JSONSerializer, get_serializer, msgpack, msgpack_dumps, msgpack_loads
+
+FRAMINGS = ("line", "length")
+MAX_FRAME_BYTES = 1 << 20
+RECV_BYTES = 1 << 16
+
+_LENGTH = struct.Struct(">I")
+
+
+class FrameError(ValueError):
+    """The stream cannot be split into frames; the connection is closed."""
+
+
+def parse_address(address: str) -> tuple:
+    """
+    Split a listener address.
+
+    Returns:
+        ``("tcp", (host, port))`` or ``("unix", path)``
+    """
+    scheme, _, rest = address.partition("://")
+    if scheme == "tcp":
+        host, _, port = rest.rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"Expected tcp://HOST:PORT, got {address!r}")
+        return "tcp", (host.strip("[]"), int(port))
+    if scheme == "unix" and rest:
+        return "unix", rest
+    raise ValueError(f"Listener address must be tcp://HOST:PORT or unix:///PATH, got {address!r}")
+
+
+def split_frames(buffer: bytearray, framing: str) -> tuple:
+    """
+    Cut the complete frames off the front of ``buffer``.
+
+    Returns:
+        ``(frames, consumed)``: frame payloads and the number of bytes they used
+
+    Raises:
+        FrameError: If a frame is longer than ``MAX_FRAME_BYTES``
+    """
+    frames = []
+    pos = 0
+    if framing == "line":
+        while True:
+            end = buffer.find(b"\n", pos)
+            if end < 0:
+                if len(buffer) - pos > MAX_FRAME_BYTES:
+                    raise FrameError(f"Line longer than {MAX_FRAME_BYTES} bytes")
+                break
+            line = bytes(buffer[pos:end]).strip()
+            if line:
+                frames.append(line)
+            pos = end + 1
+    else:
+        while len(buffer) - pos >= _LENGTH.size:
+            (size,) = _LENGTH.unpack_from(buffer, pos)
+            if size > MAX_FRAME_BYTES:
+                raise FrameError(f"Frame longer than {MAX_FRAME_BYTES} bytes")
+            if len(buffer) - pos - _LENGTH.size < size:
+                break
+            start = pos + _LENGTH.size
+            frames.append(bytes(buffer[start:start + size]))
+            pos = start + size
+    return frames, pos
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """One client connection: read frames, submit them in batches, write replies."""
+
+    def handle(self):
+        listener = self.server.listener
+        buffer = bytearray()
+        while True:
+            try:
+                data = self.request.recv(RECV_BYTES)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            try:
+                try:
+                    frames, consumed = split_frames(buffer, listener.framing)
+                except FrameError as e:
+                    self.request.sendall(listener.encode_reply({"error": str(e)}, binary=False))
+                    return
+                del buffer[:consumed]
+
+                # Unix socket peers have no address; they share one rate limit bucket
+                peer = self.client_address[0] if listener.kind == "tcp" else "unix"
+                for start in range(0, len(frames), listener.max_batch):
+                    replies = listener.process(frames[start:start + listener.max_batch], peer)
+                    self.request.sendall(b"".join(replies))
+            except OSError:
+                return
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+class PulseListener:
+    """
+    Threaded socket server feeding framed pulses to ``submit``.
+
+    ``submit`` receives a list of decoded pulses and returns one reply dict
+    per pulse, in order. ``admit``, if given, receives the decoded pulses and
+    the peer address first and returns, per pulse, None to submit it or the
+    reply refusing it.
+    """
+
+    def __init__(self, address: str, submit: Callable[[List[Any]], List[Dict[str, Any]]], framing: str = "line",
+                 max_batch: int = 1000, serializer: Optional[JSONSerializer] = None,
+                 admit: Optional[Callable[[List[Any], str], List[Optional[Dict[str, Any]]]]] = None):
+        """
+        Args:
+            address: ``tcp://HOST:PORT`` (port 0 picks a free one) or ``unix:///PATH``
+            submit: Validates, stores and applies a batch of pulses
+            framing: ``line`` (newline-delimited JSON) or ``length`` (length-prefixed MessagePack/JSON)
+            max_batch: Maximum pulses handed to ``submit`` at once
+            serializer: Serializer for JSON frames (default: fastest available)
+            admit: Rate limiting of decoded pulses by pulse and peer address
+        """
+        if framing not in FRAMINGS:
+            raise ValueError(f"Listener framing must be one of {', '.join(FRAMINGS)}")
+        self.kind, self.bind_address = parse_address(address)
+        self.submit = submit
+        self.admit = admit
+        self.framing = framing
+        self.max_batch = max_batch
+        self.serializer = serializer or get_serializer()
+        self.frames = 0
+        self.errors = 0
+
+        self._counter_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        """Address actually bound (with the chosen port when started on port 0)."""
+        if self.kind == "unix":
+            return f"unix://{self.bind_address}"
+        host, port = self._server.server_address[:2] if self._server is not None else self.bind_address
+        return f"tcp://{host}:{port}"
+
+    def start(self) -> "PulseListener":
+        if self.kind == "unix":
+            if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+                raise RuntimeError("Unix sockets are not supported on this platform")
+            if os.path.exists(self.bind_address):
+                os.remove(self.bind_address)
+            self._server = _UnixServer(self.bind_address, _Handler)
+        else:
+            self._server = _TCPServer(self.bind_address, _Handler)
+        self._server.listener = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="pulse-listener", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            if self.kind == "unix" and os.path.exists(self.bind_address):
+                os.remove(self.bind_address)
+
+    def wait(self) -> None:
+        """Block until the listener is stopped."""
+        self._thread.join()
+
+    def encode_reply(self, reply: Dict[str, Any], binary: bool) -> bytes:
+        """Encode a reply frame; length-prefixed replies to MessagePack frames are MessagePack."""
+        if self.framing == "line":
+            return self.serializer.dumps(reply) + b"\n"
+        payload = msgpack_dumps(reply) if binary and msgpack is not None else self.serializer.dumps(reply)
+        return _LENGTH.pack(len(payload)) + payload
+
+    def decode(self, frame: bytes) -> Any:
+        """Decode one frame; length-prefixed frames are MessagePack unless they start with ``{``."""
+        if self.framing == "line" or frame[:1] == b"{":
+            return self.serializer.loads(frame)
+        return msgpack_loads(frame)
+
+    def process(self, frames: List[bytes], peer: str = "") -> List[bytes]:
+        """Decode, admit and submit a batch of frames from ``peer``; returns the encoded replies in frame order."""
+        replies: List[Optional[Dict[str, Any]]] = [None] * len(frames)
+        positions = []
+        pulses = []
+        for i, frame in enumerate(frames):
+            try:
+                pulses.append(self.decode(frame))
+                positions.append(i)
+            except (ValueError, RuntimeError) as e:
+                replies[i] = {"error": f"Invalid frame: {e}"}
+
+        if pulses and self.admit is not None:
+            admitted = []
+            for i, pulse, refusal in zip(positions, pulses, self.admit(pulses, peer)):
+                if refusal is None:
+                    admitted.append((i, pulse))
+                else:
+                    replies[i] = refusal
+            positions = [i for i, _ in admitted]
+            pulses = [pulse for _, pulse in admitted]
+
+        if pulses:
+            try:
+                results = self.submit(pulses)
+            except Exception as e:
+                results = [{"error": f"Ingest failed: {str(e)}"}] * len(pulses)
+            for i, result in zip(positions, results):
+                replies[i] = result
+
+        with self._counter_lock:
+            self.frames += len(frames)
+            self.errors += sum(1 for reply in replies if "error" in reply)
+        return [self.encode_reply(reply, binary=frame[:1] != b"{") for frame, reply in zip(frames, replies)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            return {"address": self.address, "framing": self.framing, "frames": self.frames, "errors": self.errors}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the pulse socket listener without the HTTP API")
+    parser.add_argument("--listen", default=os.environ.get("PULSE_LISTENER") or "tcp://127.0.0.1:7000",
+                        help="tcp://HOST:PORT or unix:///PATH (default: tcp://127.0.0.1:7000)")
+    parser.add_argument("--framing", choices=FRAMINGS, default=os.environ.get("PULSE_LISTENER_FRAMING", "line"),
+                        help="Frame format (default: line)")
+    args = parser.parse_args()
+
+    # The app module opens the store and kernel and starts the listener
+    os.environ["PULSE_LISTENER"] = args.listen
+    os.environ["PULSE_LISTENER_FRAMING"] = args.framing
+    os.environ["EUYSTACIO_STARTUP"] = "eager"
+    import app
+
+    print(f"📡 Listening for pulses on {app.pulse_listener.address} ({args.framing} framing)")
+    try:
+        app.pulse_listener.wait()
+    except KeyboardInterrupt:
+        app.pulse_listener.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
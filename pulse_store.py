@@ -0,0 +1,538 @@
+"""
+Pulse log storage.
+
+The log is kept on disk as a compact JSON array and cached in memory
+together with the encoded bytes of every entry, so responses can join
+pre-encoded entries and rewrites never re-encode old pulses.
+
+With a ``segment_size``, the live file only holds the newest entries: once
+it reaches ``segment_size`` entries they are sealed into a compressed,
+immutable segment next to it (``pulse_log.seg-000001.json.gz``), so appends
+rewrite only the short live tail. Segments are read back transparently.
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from compression import SEGMENT_CODECS, available_codecs, codec_for_path, compress, decompress
+from serialization import JSONSerializer, get_serializer
+
+
+class PulseStore:
+    """
+    In-memory cache of the pulse log backed by a JSON array file.
+
+    The file is reloaded whenever it changes on disk (e.g. replaced by hand or
+    by another process) and rewritten atomically on every append. Sealed
+    segments are never rewritten except when archiving or compaction removes entries.
+
+    Every entry has a sequence number: its position in the full history,
+    counting the ``offset`` entries that were moved to the archive before it.
+    """
+
+    def __init__(self, path: str, serializer: Optional[JSONSerializer] = None, offset: int = 0,
+                 segment_size: int = 0, codec: Optional[str] = None):
+        """
+        Create a store for the log at ``path``.
+
+        Args:
+            path: Location of the JSON array file (need not exist yet)
+            serializer: Serializer for disk and entry encoding (default: fastest available)
+            offset: Number of older entries held elsewhere (the archive)
+            segment_size: Seal the live file into a compressed segment at this
+                          many entries (0 keeps everything in the live file)
+            codec: Segment compression, ``gzip`` or ``zstd`` (default: best available)
+        """
+        self.path = path
+        self.serializer = serializer or get_serializer()
+        self.version = 0
+        self.offset = offset
+        self.segment_size = segment_size
+        self.codec = codec or available_codecs()[0]
+        if self.codec not in SEGMENT_CODECS:
+            raise ValueError(f"Unknown segment codec: {self.codec}")
+
+        root, ext = os.path.splitext(path)
+        self._directory = os.path.dirname(path) or "."
+        self._segment_prefix = os.path.basename(root) + ".seg-"
+        self._segment_pattern = re.compile(re.escape(self._segment_prefix) + r"(\d+)" + re.escape(ext or ".json") +
+                                           r"(\.gz|\.zst)?$")
+        self._segment_ext = ext or ".json"
+        self._segments: List[list] = []
+        self._sealed = 0
+        # Never reused while the process runs, even after compaction deletes every segment
+        self._segment_number = 0
+
+        self._lock = threading.RLock()
+        self._appended = threading.Condition(self._lock)
+        self._entries: List[Dict[str, Any]] = []
+        self._blobs: List[bytes] = []
+        self._sentiment_sum = 0.0
+        self._file_state = None
+
+    def _stat(self):
+        # The directory's mtime changes whenever segments are added or removed
+        try:
+            st = os.stat(self.path)
+            live = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            live = None
+        try:
+            directory = os.stat(self._directory).st_mtime_ns
+        except FileNotFoundError:
+            directory = None
+        return (live, directory)
+
+    def _segment_files(self) -> List[str]:
+        """Sealed segment paths, oldest first."""
+        try:
+            names = os.listdir(self._directory)
+        except FileNotFoundError:
+            return []
+        numbered = []
+        for name in names:
+            match = self._segment_pattern.match(name)
+            if match:
+                numbered.append((int(match.group(1)), os.path.join(self._directory, name)))
+        return [path for _, path in sorted(numbered)]
+
+    def _read_array(self, path: str) -> List[Dict[str, Any]]:
+        with open(path, "rb") as f:
+            data = f.read()
+        codec = codec_for_path(path)
+        if codec:
+            data = decompress(data, codec)
+        return self.serializer.loads(data) if data.strip() else []
+
+    def _refresh(self) -> None:
+        """Load the segments and live file if they changed since last read or written."""
+        state = self._stat()
+        if state == self._file_state:
+            return
+        if (self._file_state is not None and state[0] == self._file_state[0]
+                and self._segment_files() == [path for path, _ in self._segments]):
+            # Another file in the directory changed (a snapshot, index or checkpoint)
+            self._file_state = state
+            return
+
+        entries = []
+        segments = []
+        for path in self._segment_files():
+            segment = self._read_array(path)
+            entries.extend(segment)
+            segments.append([path, len(segment)])
+
+        live = self._read_array(self.path) if state[0] is not None else []
+        # A seal interrupted before the live file was emptied leaves the
+        # sealed entries in both places
+        if segments and live[:segments[-1][1]] == entries[len(entries) - segments[-1][1]:]:
+            live = live[segments[-1][1]:]
+        entries.extend(live)
+
+        self._entries = entries
+        self._blobs = [self.serializer.dumps(entry) for entry in entries]
+        self._sentiment_sum = sum(entry['sentiment'] for entry in entries)
+        self._segments = segments
+        self._sealed = len(entries) - len(live)
+        self._file_state = state
+        self.version += 1
+
+    def _write(self) -> None:
+        """Atomically replace the live file with the entries not yet sealed."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"[" + b",".join(self._blobs[self._sealed:]) + b"]")
+        os.replace(tmp_path, self.path)
+        self._file_state = self._stat()
+
+    def _write_segment(self, path: str, blobs: List[bytes]) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compress(b"[" + b",".join(blobs) + b"]", codec_for_path(path)))
+        os.replace(tmp_path, path)
+
+    def _seal(self, count: Optional[int] = None) -> None:
+        """Move the oldest ``count`` live entries (default: all) into a new compressed segment."""
+        if self._segments:
+            last = int(self._segment_pattern.match(os.path.basename(self._segments[-1][0])).group(1))
+            self._segment_number = max(self._segment_number, last)
+        self._segment_number += 1
+        path = os.path.join(self._directory, f"{self._segment_prefix}{self._segment_number:06d}{self._segment_ext}"
+                                             f"{SEGMENT_CODECS[self.codec]}")
+
+        end = None if count is None else self._sealed + count
+        blobs = self._blobs[self._sealed:end]
+        self._write_segment(path, blobs)
+        self._segments.append([path, len(blobs)])
+        self._sealed += len(blobs)
+        self._write()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return all entries in insertion order. The list must not be modified."""
+        with self._lock:
+            self._refresh()
+            return self._entries
+
+    def next_seq(self) -> int:
+        """Sequence number the next appended entry will get."""
+        with self._lock:
+            self._refresh()
+            return self.offset + len(self._entries)
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Append one pulse entry and persist the log.
+
+        Returns:
+            Sequence number of the entry
+        """
+        blob = self.serializer.dumps(entry)
+        with self._lock:
+            self._refresh()
+            self._entries.append(entry)
+            self._blobs.append(blob)
+            self._sentiment_sum += entry['sentiment']
+            self._write()
+            if self.segment_size and len(self._entries) - self._sealed >= self.segment_size:
+                self._seal()
+            self.version += 1
+            self._appended.notify_all()
+            return self.offset + len(self._entries) - 1
+
+    def extend(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Append many pulse entries with a single rewrite of the live file.
+
+        Full ``segment_size`` runs of the live entries are then sealed one
+        segment at a time, so a large batch never leaves an oversized live file.
+
+        Returns:
+            Sequence number of the first entry
+        """
+        blobs = [self.serializer.dumps(entry) for entry in entries]
+        with self._lock:
+            self._refresh()
+            first = self.offset + len(self._entries)
+            if not entries:
+                return first
+            self._entries.extend(entries)
+            self._blobs.extend(blobs)
+            self._sentiment_sum += sum(entry['sentiment'] for entry in entries)
+            self._write()
+            while self.segment_size and len(self._entries) - self._sealed >= self.segment_size:
+                self._seal(self.segment_size)
+            self.version += 1
+            self._appended.notify_all()
+            return first
+
+    def wait_for(self, seq: int, timeout: float) -> bool:
+        """Block until the entry with sequence number ``seq`` exists or ``timeout`` passes."""
+        with self._appended:
+            return self._appended.wait_for(lambda: self.offset + len(self._entries) > seq, timeout)
+
+    def read_from(self, seq: int, limit: int) -> tuple:
+        """
+        Encoded entries starting at sequence number ``seq``.
+
+        Args:
+            seq: First sequence number wanted (at least ``offset``)
+            limit: Maximum number of entries
+
+        Returns:
+            ``(blobs, next_seq)``
+
+        Raises:
+            ValueError: ``seq`` was trimmed from the store
+        """
+        with self._lock:
+            self._refresh()
+            if seq < self.offset:
+                raise ValueError(f"Entries before {self.offset} are no longer in the store")
+            start = seq - self.offset
+            blobs = self._blobs[start:start + limit]
+            return blobs, self.offset + start + len(blobs)
+
+    def archive_older_than(self, cutoff: float, archive) -> int:
+        """
+        Move the leading entries older than ``cutoff`` into ``archive``.
+
+        Args:
+            cutoff: Epoch seconds; entries with an earlier timestamp are moved
+            archive: ``PulseArchive`` receiving the entries
+
+        Returns:
+            Number of entries moved
+        """
+        from pulse_archive import parse_timestamp
+
+        with self._lock:
+            self._refresh()
+            count = 0
+            for entry in self._entries:
+                if parse_timestamp(entry['timestamp']) >= cutoff:
+                    break
+                count += 1
+
+            if count:
+                archive.append(self._entries[:count])
+                # Replace rather than mutate: callers may hold the old list
+                self._entries = self._entries[count:]
+                self._blobs = self._blobs[count:]
+                self._sentiment_sum = sum(entry['sentiment'] for entry in self._entries)
+                self.offset += count
+
+                # Drop fully archived segments and trim a partially archived one
+                remaining = count
+                while remaining and self._segments:
+                    path, size = self._segments[0]
+                    if size <= remaining:
+                        os.remove(path)
+                        self._segments.pop(0)
+                        self._sealed -= size
+                        remaining -= size
+                    else:
+                        self._write_segment(path, self._blobs[:size - remaining])
+                        self._segments[0][1] = size - remaining
+                        self._sealed -= remaining
+                        remaining = 0
+                self._write()
+                self.version += 1
+
+            return count
+
+    def disk_bytes(self) -> int:
+        """Bytes the live file and sealed segments take on disk."""
+        with self._lock:
+            self._refresh()
+            paths = [path for path, _ in self._segments] + [self.path]
+        total = 0
+        for path in paths:
+            try:
+                total += os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+        return total
+
+    def expired(self, cutoff: Optional[float] = None, keep: Optional[int] = None) -> int:
+        """
+        Number of leading entries outside the retention limits.
+
+        Args:
+            cutoff: Epoch seconds; leading entries with an earlier timestamp are expired
+            keep: Only the newest ``keep`` entries are retained
+        """
+        from pulse_archive import parse_timestamp
+
+        with self._lock:
+            self._refresh()
+            count = max(0, len(self._entries) - keep) if keep is not None else 0
+            if cutoff is not None:
+                aged = 0
+                for entry in self._entries:
+                    if parse_timestamp(entry['timestamp']) >= cutoff:
+                        break
+                    aged += 1
+                count = max(count, aged)
+            return count
+
+    def prepare_trim(self, count: int) -> Dict[str, Any]:
+        """
+        Plan the removal of the oldest ``count`` entries.
+
+        Expired entries still in the live file are sealed first, so the trim
+        only deletes whole segments and rewrites at most one. Nothing is
+        removed until ``commit_trim``; appends continue meanwhile.
+
+        Returns:
+            A plan with the ``entries`` to remove and the file ``actions``
+            (``path``, ``size`` in entries, ``keep``: newest entries to keep)
+        """
+        with self._lock:
+            self._refresh()
+            count = min(count, len(self._entries))
+            if count > self._sealed:
+                self._seal(count - self._sealed)
+                self.version += 1
+
+            actions = []
+            keep_blobs = None
+            start = 0
+            for path, size in self._segments:
+                if start >= count:
+                    break
+                keep = max(0, start + size - count)
+                actions.append({"path": path, "size": size, "keep": keep})
+                if keep:
+                    keep_blobs = self._blobs[count:start + size]
+                start += size
+            return {"count": count, "entries": self._entries[:count], "actions": actions, "keep_blobs": keep_blobs}
+
+    def write_trim(self, plan: Dict[str, Any]) -> None:
+        """Write the kept part of a partially expired segment to a temporary file (no lock held)."""
+        if plan["keep_blobs"] is not None:
+            path = plan["actions"][-1]["path"]
+            with open(f"{path}.compact.tmp", "wb") as f:
+                f.write(compress(b"[" + b",".join(plan["keep_blobs"]) + b"]", codec_for_path(path)))
+
+    def commit_trim(self, plan: Dict[str, Any]) -> None:
+        """Swap in the trimmed segments and drop the planned entries from memory."""
+        actions = plan["actions"]
+        count = plan["count"]
+        with self._lock:
+            self._refresh()
+            if [path for path, _ in self._segments[:len(actions)]] != [action["path"] for action in actions]:
+                raise RuntimeError("Pulse log segments changed during compaction")
+
+            for action in actions:
+                if action["keep"]:
+                    os.replace(f"{action['path']}.compact.tmp", action["path"])
+                else:
+                    os.remove(action["path"])
+            self._segments = [[path, size] for path, size in self._segments[len(actions):]]
+            if actions and actions[-1]["keep"]:
+                self._segments.insert(0, [actions[-1]["path"], actions[-1]["keep"]])
+
+            # Replace rather than mutate: callers may hold the old lists
+            self._sentiment_sum -= sum(entry['sentiment'] for entry in self._entries[:count])
+            self._entries = self._entries[count:]
+            self._blobs = self._blobs[count:]
+            self._sealed -= count
+            self.offset += count
+            self._file_state = self._stat()
+            self.version += 1
+
+    def finish_trim(self, actions: List[Dict[str, Any]]) -> None:
+        """Redo the file changes of a trim interrupted by a crash; every step is idempotent."""
+        with self._lock:
+            for action in actions:
+                path = action["path"]
+                if not self._segment_pattern.match(os.path.basename(path)) or \
+                        os.path.dirname(path) != self._directory:
+                    continue  # another store's segment
+                if os.path.exists(f"{path}.compact.tmp"):
+                    os.remove(f"{path}.compact.tmp")
+                if not os.path.exists(path):
+                    continue
+                if not action["keep"]:
+                    os.remove(path)
+                    continue
+                entries = self._read_array(path)
+                if len(entries) == action["size"]:
+                    self._write_segment(path, [self.serializer.dumps(entry)
+                                               for entry in entries[-action["keep"]:]])
+            self._file_state = None
+
+    def select(self, user: Optional[str] = None, role: Optional[str] = None,
+               limit: Optional[int] = None, positions: Optional[List[int]] = None) -> List[int]:
+        """
+        Find entries matching the given filters.
+
+        Args:
+            user: Only entries from this user
+            role: Only entries with this role
+            limit: Keep only the last ``limit`` matches
+            positions: Only consider these positions (ascending), e.g. search hits
+
+        Returns:
+            Positions of the matching entries, oldest first
+        """
+        with self._lock:
+            self._refresh()
+            entries = self._entries
+            if positions is None:
+                positions = range(len(entries))
+            else:
+                positions = [i for i in positions if 0 <= i < len(entries)]
+
+            if user:
+                positions = [i for i in positions if entries[i].get('user') == user]
+            if role:
+                positions = [i for i in positions if entries[i].get('role') == role]
+            if limit and limit > 0:
+                positions = positions[-limit:]
+
+            return list(positions)
+
+    def blobs(self, positions: List[int]) -> List[bytes]:
+        """Cached encoded bytes of the entries at ``positions``."""
+        with self._lock:
+            blobs = self._blobs
+            return [blobs[i] for i in positions]
+
+    def encode(self, positions: List[int]) -> bytes:
+        """Encode the entries at ``positions`` as a JSON array from cached bytes."""
+        return b"[" + b",".join(self.blobs(positions)) + b"]"
+
+    def encode_selection(self, user: Optional[str] = None, role: Optional[str] = None,
+                         limit: Optional[int] = None, seqs: Optional[List[int]] = None) -> tuple:
+        """
+        Select and encode matching entries under one lock, so a trim cannot shift positions in between.
+
+        Args:
+            seqs: Only consider these sequence numbers (ascending), e.g. search hits;
+                those below ``offset`` were archived and are skipped
+
+        Returns:
+            ``(json_array, matched, total)``: the encoded entries, their number and the store length
+        """
+        with self._lock:
+            positions = None if seqs is None else [seq - self.offset for seq in seqs if seq >= self.offset]
+            positions = self.select(user=user, role=role, limit=limit, positions=positions)
+            return self.encode(positions), len(positions), len(self)
+
+    def tail(self, count: int) -> List[Dict[str, Any]]:
+        """The last ``count`` entries. The dicts must not be modified."""
+        with self._lock:
+            self._refresh()
+            return self._entries[-count:] if count > 0 else []
+
+    def entries_at(self, positions: List[int]) -> List[Dict[str, Any]]:
+        """Entries at ``positions``. The dicts must not be modified."""
+        with self._lock:
+            entries = self._entries
+            return [entries[i] for i in positions]
+
+    def sentiment_total(self) -> tuple:
+        """Return ``(count, sum)`` of all sentiments, maintained on append."""
+        with self._lock:
+            self._refresh()
+            return len(self._entries), self._sentiment_sum
+
+    def bucket_totals(self, bucket_seconds: float, since: Optional[float] = None,
+                      until: Optional[float] = None) -> Dict[int, List[float]]:
+        """
+        Count and sum sentiments per time bucket over ``[since, until)``.
+
+        Returns:
+            Mapping of bucket index (``timestamp // bucket_seconds``) to ``[count, sum]``,
+            mergeable with ``PulseArchive.bucket_totals``
+        """
+        from pulse_archive import parse_timestamp
+
+        totals: Dict[int, List[float]] = {}
+        for entry in self.entries():
+            ts = parse_timestamp(entry['timestamp'])
+            if (since is not None and ts < since) or (until is not None and ts >= until):
+                continue
+            bucket = totals.setdefault(int(ts // bucket_seconds), [0, 0.0])
+            bucket[0] += 1
+            bucket[1] += entry['sentiment']
+        return totals
+
+
+def merge_bucket_totals(parts: List[Dict[int, List[float]]]) -> Dict[int, List[float]]:
+    """Merge ``bucket_totals`` results from several stores (or the archive)."""
+    merged: Dict[int, List[float]] = {}
+    for part in parts:
+        for key, (count, total) in part.items():
+            bucket = merged.setdefault(key, [0, 0.0])
+            bucket[0] += count
+            bucket[1] += total
+    return merged
@@ -0,0 +1,141 @@
+"""
+Leader/follower replication of the pulse log.
+
+One leader owns the append-only pulse log. Followers tail it through the
+leader's ``GET /replication/feed`` long-poll endpoint, append every entry to
+their own local log, apply it to their own kernel replica in log order and
+serve reads locally. Writes received by a follower are forwarded to the
+leader.
+
+Configured through the environment of each backend process:
+
+    EUYSTACIO_ROLE=leader
+    EUYSTACIO_ROLE=follower EUYSTACIO_LEADER_URL=http://10.0.0.5:5000
+
+Replicas converge because every node applies the same pulses in the same
+order. The kernel's decay timing also looks at wall-clock activity, so
+replicas match exactly while they keep up with the leader (within the
+kernel's 5-minute activity window); entries served from the leader's archive
+carry its float32 sentiments.
+"""
+
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Callable, Dict, Optional
+
+from serialization import JSONSerializer, get_serializer
+
+ROLES = ("standalone", "leader", "follower")
+
+# Entries per feed response and seconds a feed request may wait for new ones
+FEED_BATCH = 500
+FEED_WAIT = 10.0
+
+
+class Follower:
+    """
+    Background tail of a leader's pulse log.
+
+    Entries are handed to ``apply`` strictly in sequence order; ``seq`` is
+    the sequence number of the next entry expected from the leader.
+    """
+
+    def __init__(self, leader_url: str, apply: Callable[[Dict[str, Any]], None], start_seq: int = 0,
+                 serializer: Optional[JSONSerializer] = None, retry_delay: float = 1.0):
+        """
+        Args:
+            leader_url: Base URL of the leader, e.g. ``http://127.0.0.1:5000``
+            apply: Called with every replicated entry, in order
+            start_seq: Sequence number of the first entry not yet applied
+            serializer: Serializer for feed responses (default: fastest available)
+            retry_delay: Seconds to wait after a failed feed request
+        """
+        self.leader_url = leader_url.rstrip("/")
+        self.apply = apply
+        self.seq = start_seq
+        self.serializer = serializer or get_serializer()
+        self.retry_delay = retry_delay
+        self.last_error = None
+
+        self._applied = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="replication-follower", daemon=True)
+
+    def start(self) -> "Follower":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.poll(wait=FEED_WAIT)
+                self.last_error = None
+            except (OSError, ValueError) as e:
+                self.last_error = str(e)
+                self._stopped.wait(self.retry_delay)
+
+    def poll(self, wait: float = 0.0) -> int:
+        """
+        Fetch and apply one batch from the leader's feed.
+
+        Returns:
+            Number of entries applied
+        """
+        query = urllib.parse.urlencode({'start': self.seq, 'limit': FEED_BATCH, 'wait': wait})
+        with urllib.request.urlopen(f"{self.leader_url}/replication/feed?{query}", timeout=wait + 10) as response:
+            feed = self.serializer.loads(response.read())
+
+        if feed['start'] != self.seq:
+            raise ValueError(f"Leader feed starts at {feed['start']}, expected {self.seq}")
+
+        for entry in feed['entries']:
+            self.apply(entry)
+            with self._applied:
+                self.seq += 1
+                self._applied.notify_all()
+        return len(feed['entries'])
+
+    def wait_for(self, seq: int, timeout: float) -> bool:
+        """Block until the entry with sequence number ``seq`` has been applied."""
+        with self._applied:
+            return self._applied.wait_for(lambda: self.seq > seq, timeout)
+
+    def forward(self, path: str, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None,
+                timeout: float = 10.0) -> tuple:
+        """
+        Send a write request to the leader.
+
+        Args:
+            path: Request path and query string
+            body: Raw request body
+            content_type: Content type of the body
+            headers: Extra request headers; None values are skipped
+            timeout: Seconds to wait for the leader
+
+        Returns:
+            ``(status_code, response_body)``; the leader's error responses are
+            passed through, an unreachable leader raises ``OSError``
+        """
+        request_headers = {name: value for name, value in (headers or {}).items() if value is not None}
+        request_headers['Content-Type'] = content_type or 'application/json'
+        request = urllib.request.Request(f"{self.leader_url}{path}", data=body, method="POST",
+                                         headers=request_headers)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'leader_url': self.leader_url,
+            'applied_seq': self.seq,
+            'last_error': self.last_error,
+            'checked_at': time.time()
+        }
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Retention and background compaction of the pulse log.
+
+Pulses older than ``max_age_days`` or beyond the newest ``max_entries``
+expire. A ``Compactor`` thread moves them out of the pulse store without
+blocking writers. First it plans the trim under the store lock, sealing
+expired live pulses into a segment. Then, without the lock, it writes the
+kept part of a partially expired segment to a temporary file. Next it
+commits the expired pulses to their destination. Last, it swaps the files
+and the in-memory lists under the lock. Expired pulses either go to the
+columnar archive or are rolled up into per-bucket totals (count and
+sentiment sum) and dropped.
+
+After every pass the compactor calls ``on_trim`` with the removed pulses,
+so the backend can prune its indexes of them.
+
+Sequence numbers stay stable. The retention state file
+(``pulse_log.retention.json``) records the history before the store as runs
+of archived and dropped pulses. It is also the commit point of a
+compaction: the planned file changes are recorded in it before anything is
+removed. After a crash, ``Compactor.recover`` redoes them.
+
+Run as a script for one compaction pass:
+
+    python retention.py --days 30 --archive
+"""
+
+import contextlib
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from serialization import JSONSerializer, get_serializer
+
+RUN_KINDS = ("archive", "dropped")
+
+
+class RetentionState:
+    """Runs of archived and dropped pulses before the store, roll-up totals and the pending compaction."""
+
+    def __init__(self, path: str, bucket_seconds: float = 3600, serializer: Optional[JSONSerializer] = None):
+        """
+        Args:
+            path: JSON file the state is kept in
+            bucket_seconds: Width of the roll-up buckets of dropped pulses
+            serializer: Serializer for the file (default: fastest available)
+        """
+        self.path = path
+        self.bucket_seconds = bucket_seconds
+        self.serializer = serializer or get_serializer()
+
+        self.runs: List[List[Any]] = []  # [kind, count], oldest first
+        self.buckets: Dict[int, List[float]] = {}
+        self.pending: Optional[Dict[str, Any]] = None
+
+    def load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            saved = self.serializer.loads(f.read())
+        self.runs = saved["runs"]
+        # Buckets keep the width they were rolled up with
+        self.bucket_seconds = saved["bucket_seconds"]
+        self.buckets = {bucket: [count, total] for bucket, count, total in saved["buckets"]}
+        self.pending = saved["pending"]
+
+    def save(self) -> None:
+        """Atomically replace the state file; this is the commit point of a compaction."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.serializer.dumps({
+                "runs": self.runs,
+                "bucket_seconds": self.bucket_seconds,
+                "buckets": [[bucket, count, total] for bucket, (count, total) in sorted(self.buckets.items())],
+                "pending": self.pending
+            }))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    @property
+    def offset(self) -> int:
+        """Sequence number of the first pulse in the store."""
+        return sum(count for _, count in self.runs)
+
+    def archived(self) -> int:
+        """Pulses in the archive."""
+        return sum(count for kind, count in self.runs if kind == "archive")
+
+    def available_from(self) -> int:
+        """First sequence number from which every pulse is still logged (the end of the last dropped run)."""
+        end = 0
+        seq = 0
+        for kind, count in self.runs:
+            seq += count
+            if kind == "dropped":
+                end = seq
+        return end
+
+    def add_run(self, kind: str, count: int) -> None:
+        if self.runs and self.runs[-1][0] == kind:
+            self.runs[-1][1] += count
+        else:
+            self.runs.append([kind, count])
+
+    def run_at(self, seq: int) -> Optional[Tuple[str, int, int, int]]:
+        """
+        The run holding sequence number ``seq``.
+
+        Returns:
+            ``(kind, first_seq, end_seq, first archive row)``, or None past the runs
+        """
+        start = 0
+        row = 0
+        for kind, count in self.runs:
+            if seq < start + count:
+                return kind, start, start + count, row
+            start += count
+            if kind == "archive":
+                row += count
+        return None
+
+    def roll_up(self, entries: List[Dict[str, Any]]) -> None:
+        """Add entries to the per-bucket totals."""
+        from pulse_archive import parse_timestamp
+
+        for entry in entries:
+            bucket = self.buckets.setdefault(int(parse_timestamp(entry['timestamp']) // self.bucket_seconds), [0, 0.0])
+            bucket[0] += 1
+            bucket[1] += entry['sentiment']
+
+    def sentiment_total(self) -> tuple:
+        """Return ``(count, sum)`` of all rolled-up sentiments."""
+        buckets = list(self.buckets.values())
+        return sum(count for count, _ in buckets), sum(total for _, total in buckets)
+
+    def bucket_totals(self, bucket_seconds: float, since: Optional[float] = None,
+                      until: Optional[float] = None) -> Dict[int, List[float]]:
+        """
+        Rolled-up totals regrouped into ``bucket_seconds`` buckets, mergeable with ``PulseStore.bucket_totals``.
+
+        A roll-up bucket counts as a whole in the bucket holding its start, so
+        buckets narrower than the roll-up width are approximate.
+        """
+        totals: Dict[int, List[float]] = {}
+        for bucket, (count, total) in list(self.buckets.items()):
+            start = bucket * self.bucket_seconds
+            if (since is not None and start < since) or (until is not None and start >= until):
+                continue
+            merged = totals.setdefault(int(start // bucket_seconds), [0, 0.0])
+            merged[0] += count
+            merged[1] += total
+        return totals
+
+
+class Compactor:
+    """Background thread applying the retention limits to a pulse store."""
+
+    def __init__(self, store, archive, state: RetentionState, max_age_days: float = 0, max_entries: int = 0,
+                 use_archive: bool = False, interval: float = 3600,
+                 on_trim: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        """
+        Args:
+            store: ``PulseStore`` or ``ShardedPulseStore`` to compact
+            archive: ``PulseArchive`` receiving expired pulses when ``use_archive``
+            state: Retention state (history runs, roll-ups, pending compaction)
+            max_age_days: Keep pulses for this many days (0: no age limit)
+            max_entries: Keep at most this many pulses in the store (0: no limit)
+            use_archive: Archive expired pulses instead of rolling them up and dropping them
+            interval: Seconds between compaction passes
+            on_trim: Called with the removed entries after every pass that removed some
+        """
+        self.store = store
+        self.archive = archive
+        self.state = state
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.use_archive = use_archive
+        self.interval = interval
+        self.on_trim = on_trim
+
+        self.passes = 0
+        self.removed = 0
+        self.reclaimed_bytes = 0
+        self.last: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_age_days > 0 or self.max_entries > 0
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Hold off compactions, so the archive and the store can be read as of one moment."""
+        with self._lock:
+            yield
+
+    def recover(self) -> None:
+        """Load the state and finish a compaction interrupted by a crash; call before the store is read."""
+        self.state.load()
+        pending = self.state.pending
+        if pending is not None:
+            archive_rows = pending["archive_rows"]
+            if archive_rows is not None and len(self.archive) == archive_rows:
+                # The archive append never committed: keep the pulses in the store
+                for action in pending["actions"]:
+                    if os.path.exists(f"{action['path']}.compact.tmp"):
+                        os.remove(f"{action['path']}.compact.tmp")
+            else:
+                if archive_rows is not None and self.state.archived() == archive_rows:
+                    self.state.add_run("archive", pending["count"])
+                self.store.finish_trim(pending["actions"])
+            self.state.pending = None
+            self.state.save()
+
+        # Rows archived outside the compactor (pulse_archive.py, or before retention existed)
+        unrecorded = len(self.archive) - self.state.archived()
+        if unrecorded > 0:
+            self.state.add_run("archive", unrecorded)
+            self.state.save()
+
+    def run_once(self) -> Optional[Dict[str, Any]]:
+        """
+        Remove the expired pulses from the store.
+
+        Returns:
+            Report of the pass (``removed``, ``reclaimed_bytes``, ``disk_bytes``,
+            ``seconds``), or None if nothing had expired
+        """
+        with self._lock:
+            started = time.perf_counter()
+            cutoff = time.time() - self.max_age_days * 86400 if self.max_age_days > 0 else None
+            count = self.store.expired(cutoff, self.max_entries or None)
+            if not count:
+                return None
+
+            disk_before = self.store.disk_bytes()
+            plan = self.store.prepare_trim(count)
+            self.store.write_trim(plan)
+            count = plan["count"]
+            pending = {"count": count, "actions": plan["actions"], "archive_rows": None}
+            if self.use_archive:
+                pending["archive_rows"] = len(self.archive)
+                self.state.pending = pending
+                self.state.save()
+                self.archive.append(plan["entries"])
+                self.state.add_run("archive", count)
+            else:
+                self.state.roll_up(plan["entries"])
+                self.state.add_run("dropped", count)
+                self.state.pending = pending
+            self.state.save()
+
+            self.store.commit_trim(plan)
+            self.state.pending = None
+            self.state.save()
+            if self.on_trim is not None:
+                self.on_trim(plan["entries"])
+
+            disk_after = self.store.disk_bytes()
+            report = {
+                "at": datetime.utcnow().isoformat() + "Z",
+                "removed": count,
+                "destination": "archive" if self.use_archive else "rollup",
+                "reclaimed_bytes": max(0, disk_before - disk_after),
+                "disk_bytes": disk_after,
+                "seconds": round(time.perf_counter() - started, 3)
+            }
+            self.passes += 1
+            self.removed += count
+            self.reclaimed_bytes += report["reclaimed_bytes"]
+            self.last = report
+            return report
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+            if self._stopped.wait(self.interval):
+                return
+
+    def start(self) -> "Compactor":
+        self._thread = threading.Thread(target=self._run, name="compactor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_age_days": self.max_age_days,
+            "max_entries": self.max_entries,
+            "destination": "archive" if self.use_archive else "rollup",
+            "passes": self.passes,
+            "removed": self.removed,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "last": self.last,
+            "last_error": self.last_error
+        }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Apply the retention limits to the pulse log once")
+    parser.add_argument("--days", type=float, default=None, help="Keep pulses for this many days")
+    parser.add_argument("--max-entries", type=int, default=None, help="Keep at most this many pulses in the log")
+    parser.add_argument("--archive", action="store_true",
+                        help="Move expired pulses to the archive instead of rolling them up")
+    args = parser.parse_args()
+
+    # The app module recovers the retention state and opens the store
+    os.environ["EUYSTACIO_STARTUP"] = "eager"
+    os.environ["COMPACTION_INTERVAL"] = "0"
+    os.environ["PULSE_LISTENER"] = ""
+    import app
+
+    compactor = app.compactor
+    if args.days is not None:
+        compactor.max_age_days = args.days
+    if args.max_entries is not None:
+        compactor.max_entries = args.max_entries
+    if args.archive:
+        compactor.use_archive = True
+    if not compactor.enabled:
+        print("❌ No retention limit set (use --days or --max-entries, or RETENTION_DAYS / RETENTION_MAX_ENTRIES)")
+        return 1
+
+    report = compactor.run_once()
+    if report is None:
+        print(f"✅ Nothing expired; {len(app.pulse_store)} pulse(s) in {app.PULSE_LOG_FILE}")
+        return 0
+    print(f"🧹 Moved {report['removed']:,} pulse(s) to the {report['destination']} in {report['seconds']}s; "
+          f"reclaimed {report['reclaimed_bytes']:,} bytes, log now {report['disk_bytes']:,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
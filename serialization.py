@@ -0,0 +1,127 @@
+"""
+Pluggable JSON serialization for the pulse store and API responses.
+
+Every serializer produces compact UTF-8 bytes (no indentation, no spaces
+after separators). The fastest installed backend is used by default:
+orjson, then ujson, then the standard library. Set ``EUYSTACIO_JSON_BACKEND``
+to ``orjson``, ``ujson`` or ``json`` to force one.
+
+Request bodies and socket frames may also be MessagePack, decoded with
+``msgpack_loads`` when the ``msgpack`` package is installed.
+"""
+
+import json
+import os
+from typing import Any, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+BACKENDS = ("orjson", "ujson", "json")
+
+# Content types accepted for MessagePack request bodies
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+
+class JSONSerializer:
+    """Standard library serializer; the reference every backend must match."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Encode ``obj`` as compact UTF-8 JSON bytes."""
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Any) -> Any:
+        """Decode JSON from bytes or str."""
+        return json.loads(data)
+
+
+class OrjsonSerializer(JSONSerializer):
+    """Serializer backed by orjson (already compact, returns bytes)."""
+
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: Any) -> Any:
+        return self._orjson.loads(data)
+
+
+class UjsonSerializer(JSONSerializer):
+    """Serializer backed by ujson."""
+
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+    def loads(self, data: Any) -> Any:
+        return self._ujson.loads(data)
+
+
+_SERIALIZERS = {
+    "orjson": OrjsonSerializer,
+    "ujson": UjsonSerializer,
+    "json": JSONSerializer,
+}
+
+
+def get_serializer(name: Optional[str] = None) -> JSONSerializer:
+    """
+    Return a serializer instance.
+
+    Args:
+        name: Backend name (``orjson``, ``ujson``, ``json``) or ``auto``.
+              Defaults to ``EUYSTACIO_JSON_BACKEND``, then ``auto``.
+
+    Returns:
+        The requested serializer; with ``auto`` the first importable backend
+    """
+    name = (name or os.environ.get("EUYSTACIO_JSON_BACKEND") or "auto").lower()
+
+    if name == "auto":
+        for backend in BACKENDS:
+            try:
+                return _SERIALIZERS[backend]()
+            except ImportError:
+                continue
+
+    if name not in _SERIALIZERS:
+        raise ValueError(f"Unknown JSON backend {name!r}; choose from {', '.join(BACKENDS)} or auto")
+
+    return _SERIALIZERS[name]()
+
+
+def msgpack_loads(data: bytes) -> Any:
+    """
+    Decode a MessagePack document.
+
+    Raises:
+        RuntimeError: If the msgpack package is not installed
+        ValueError: If ``data`` is not one complete MessagePack document
+    """
+    if msgpack is None:
+        raise RuntimeError("msgpack is required to decode MessagePack")
+    try:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    except Exception as e:
+        raise ValueError(f"Invalid MessagePack: {str(e) or type(e).__name__}")
+
+
+def msgpack_dumps(obj: Any) -> bytes:
+    """Encode ``obj`` as MessagePack (requires the msgpack package)."""
+    if msgpack is None:
+        raise RuntimeError("msgpack is required to encode MessagePack")
+    return msgpack.packb(obj, use_bin_type=True)
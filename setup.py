@@ -9,6 +9,29 @@ import zipfile
 import shutil
 import argparse
 
+# Backend modules imported by app.py besides the kernel
+BACKEND_MODULES = [
+    "admission.py",
+    "anomaly_detector.py",
+    "coalescing.py",
+    "compression.py",
+    "dedup_index.py",
+    "euystacio_numpy.py",
+    "event_index.py",
+    "heavy_hitters.py",
+    "memory_profile.py",
+    "pattern_index.py",
+    "pulse_archive.py",
+    "pulse_import.py",
+    "pulse_listener.py",
+    "pulse_store.py",
+    "replication.py",
+    "retention.py",
+    "serialization.py",
+    "sharded_store.py",
+    "validation.py",
+]
+
 
 def extract_zip(zip_path, extract_to, overwrite=False):
     """Extract a ZIP file to the specified directory."""
@@ -43,7 +66,7 @@ def setup_backend(overwrite=False):
     
     if extract_zip(backend_zip, backend_dir, overwrite):
         # Copy enhanced files to override the ones from ZIP
-        enhanced_files = ["app.py", "euystacio.py", "requirements.txt"]
+        enhanced_files = ["app.py", "euystacio.py", "requirements.txt"] + BACKEND_MODULES
         for enhanced_file in enhanced_files:
             if os.path.exists(enhanced_file):
                 shutil.copy2(enhanced_file, backend_dir)
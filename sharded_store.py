@@ -0,0 +1,513 @@
+"""
+Pulse log sharded by user.
+
+Pulses are hash-partitioned by ``user`` into N ``PulseStore`` shard files
+(``pulse_log.shard-00.json``, ...). Every shard is written independently, so
+an append only rewrites its own shard, and per-user queries read a single
+shard. Global queries fan out over a thread pool and merge the per-shard
+results.
+
+``ShardedPulseStore`` has the same interface as ``PulseStore``; positions
+and sequence numbers refer to the global order, which is the append order.
+The shard of every appended entry is also recorded in an order file
+(``pulse_log.shards.order``, two bytes per entry), from which the global
+order is rebuilt when the shards are loaded, so sequence numbers survive a
+restart even for pulses with equal timestamps. Entries the order file does
+not cover (a crash between a shard write and its record, or shards written
+by an older version) are merged in by timestamp after the recorded ones.
+"""
+
+import contextlib
+import heapq
+import os
+import threading
+import zlib
+from array import array
+from typing import Any, Dict, List, Optional
+
+from pulse_archive import parse_timestamp
+from pulse_store import PulseStore, merge_bucket_totals
+from serialization import JSONSerializer, get_serializer
+
+
+class _Discard:
+    """Archive stand-in that drops entries already archived elsewhere."""
+
+    def append(self, entries):
+        return len(entries)
+
+
+class ShardedPulseStore:
+    """
+    ``PulseStore`` interface over N user-partitioned shards.
+
+    A global order maps every position to ``(shard, local position)`` and
+    every shard's local positions back to global ones.
+    """
+
+    def __init__(self, path: str, shards: int, serializer: Optional[JSONSerializer] = None, offset: int = 0,
+                 **store_options):
+        """
+        Open the shards of the log at ``path``.
+
+        An existing unsharded log at ``path`` is split into the shards the
+        first time (the original file is left in place).
+
+        Args:
+            path: Location of the unsharded log; shard files are named after it
+            shards: Number of shards
+            serializer: Serializer for disk and entry encoding (default: fastest available)
+            offset: Number of older entries held elsewhere (the archive)
+            **store_options: Passed to every shard's ``PulseStore`` (e.g. ``segment_size``)
+        """
+        self.path = path
+        self.serializer = serializer or get_serializer()
+        self.offset = offset
+
+        root, ext = os.path.splitext(path)
+        self.paths = [f"{root}.shard-{i:02d}{ext or '.json'}" for i in range(shards)]
+        self.order_path = f"{root}.shards.order"
+        self.shards = [PulseStore(shard_path, serializer=self.serializer, **store_options)
+                       for shard_path in self.paths]
+
+        self._lock = threading.RLock()
+        self._appended = threading.Condition(self._lock)
+        self._shard_locks = [threading.Lock() for _ in range(shards)]
+        self._order: List[tuple] = []
+        self._positions: List[List[int]] = [[] for _ in range(shards)]
+        self._versions = None
+        self._pending = [0] * shards
+        self._pool = None
+
+        if os.path.exists(path) and not any(os.path.exists(shard_path) for shard_path in self.paths):
+            self._split(path)
+
+    def _split(self, path: str) -> None:
+        """Distribute an unsharded log over the shards, recording its order."""
+        by_shard: Dict[int, List[Dict[str, Any]]] = {}
+        records = array("H")
+        for entry in PulseStore(path, serializer=self.serializer).entries():
+            index = self.shard_for(entry.get('user'))
+            by_shard.setdefault(index, []).append(entry)
+            records.append(index)
+        for index, entries in by_shard.items():
+            self.shards[index].extend(entries)
+        self._write_order(records)
+
+    def shard_for(self, user: Optional[str]) -> int:
+        """Index of the shard holding ``user``'s pulses (stable across processes)."""
+        return zlib.crc32(str(user).encode("utf-8")) % len(self.shards)
+
+    def _map(self, func, *iterables) -> list:
+        """Run ``func`` over the shards on the thread pool."""
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._pool = ThreadPoolExecutor(max_workers=min(len(self.shards), os.cpu_count() or 1),
+                                            thread_name_prefix="pulse-shard")
+        return list(self._pool.map(func, *iterables))
+
+    def _read_order(self) -> array:
+        records = array("H")
+        try:
+            with open(self.order_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return records
+        # A torn final write leaves half a record
+        records.frombytes(data[:len(data) - len(data) % records.itemsize])
+        return records
+
+    def _write_order(self, records: array) -> None:
+        """Atomically replace the order file."""
+        tmp_path = f"{self.order_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            records.tofile(f)
+        os.replace(tmp_path, self.order_path)
+
+    def _record_order(self, indexes: List[int]) -> None:
+        """Append the shards of newly registered entries to the order file (under ``_lock``)."""
+        with open(self.order_path, "ab") as f:
+            f.write(array("H", indexes).tobytes())
+
+    def _load_order(self, lengths: List[int]) -> List[tuple]:
+        """
+        Global order of shards holding ``lengths`` entries, from the order file.
+
+        Records beyond a shard's length at the front of that shard's records
+        are entries already trimmed from it (the file is rewritten after the
+        shards); they are skipped. Unrecorded entries at the end of the
+        shards are merged by timestamp, keeping every shard's own order.
+        """
+        records = self._read_order()
+        recorded = [0] * len(self.shards)
+        for index in records:
+            if index >= len(self.shards):
+                records, recorded = array("H"), [0] * len(self.shards)  # written with another shard count
+                break
+            recorded[index] += 1
+        skip = [max(0, count - length) for count, length in zip(recorded, lengths)]
+
+        order = []
+        next_local = [0] * len(self.shards)
+        for index in records:
+            if skip[index]:
+                skip[index] -= 1
+            elif next_local[index] < lengths[index]:
+                order.append((index, next_local[index]))
+                next_local[index] += 1
+
+        tails = [[(parse_timestamp(entry['timestamp']), index, local)
+                  for local, entry in enumerate(shard.entries()[next_local[index]:], next_local[index])]
+                 for index, shard in enumerate(self.shards)]
+        order.extend((index, local) for _, index, local in heapq.merge(*tails, key=lambda item: item[0]))
+        rebuilt = array("H", [index for index, _ in order])
+        if rebuilt != records:
+            self._write_order(rebuilt)
+        return order
+
+    def _refresh(self) -> None:
+        """Rebuild the global order if any shard changed other than through ``append``."""
+        versions = []
+        for shard in self.shards:
+            len(shard)
+            versions.append(shard.version)
+        if self._versions is not None and all(
+                pending or version == known
+                for pending, version, known in zip(self._pending, versions, self._versions)):
+            # Shards with an append in flight are registered by that append
+            return
+
+        lengths = [len(shard.entries()) for shard in self.shards]
+        self._order = self._load_order(lengths)
+        self._positions = [[0] * length for length in lengths]
+        for position, (index, local) in enumerate(self._order):
+            self._positions[index][local] = position
+        self._versions = versions
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._order)
+
+    @property
+    def version(self) -> int:
+        return sum(shard.version for shard in self.shards)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return all entries in global order. The dicts must not be modified."""
+        with self._lock:
+            self._refresh()
+            return self.entries_at(range(len(self._order)))
+
+    def next_seq(self) -> int:
+        """Sequence number the next appended entry will get."""
+        with self._lock:
+            self._refresh()
+            return self.offset + len(self._order)
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """
+        Append one pulse entry to its user's shard.
+
+        Only that shard is rewritten; appends to different shards do not wait
+        for each other's disk writes.
+
+        Returns:
+            Sequence number of the entry
+        """
+        index = self.shard_for(entry.get('user'))
+        shard = self.shards[index]
+        with self._shard_locks[index]:
+            with self._lock:
+                self._refresh()
+                self._pending[index] += 1
+            try:
+                local = shard.append(entry) - shard.offset
+            except BaseException:
+                with self._lock:
+                    self._pending[index] -= 1
+                raise
+
+            # Registered in the same critical section that ends the append: a
+            # refresh in between would merge the entry in by its timestamp
+            with self._lock:
+                self._pending[index] -= 1
+                positions = self._positions[index]
+                if len(positions) <= local:
+                    positions.append(len(self._order))
+                    self._order.append((index, local))
+                    self._record_order([index])
+                self._versions[index] = shard.version
+                self._appended.notify_all()
+                return self.offset + positions[local]
+
+    def extend(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Append many pulse entries, rewriting each affected shard once.
+
+        The entries keep their given order in the global order.
+
+        Returns:
+            Sequence number of the first entry
+        """
+        by_shard: Dict[int, List[Dict[str, Any]]] = {}
+        targets = []
+        for entry in entries:
+            index = self.shard_for(entry.get('user'))
+            targets.append((index, len(by_shard.setdefault(index, []))))
+            by_shard[index].append(entry)
+
+        locks = [self._shard_locks[index] for index in sorted(by_shard)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            with self._lock:
+                self._refresh()
+                first = self.offset + len(self._order)
+                starts = {index: len(self.shards[index].entries()) for index in by_shard}
+                for index in by_shard:
+                    self._pending[index] += 1
+            try:
+                for index, shard_entries in by_shard.items():
+                    self.shards[index].extend(shard_entries)
+            except BaseException:
+                with self._lock:
+                    for index in by_shard:
+                        self._pending[index] -= 1
+                raise
+
+            with self._lock:
+                for index in by_shard:
+                    self._pending[index] -= 1
+                for index, count in targets:
+                    self._positions[index].append(len(self._order))
+                    self._order.append((index, starts[index] + count))
+                self._record_order([index for index, _ in targets])
+                for index in by_shard:
+                    self._versions[index] = self.shards[index].version
+                self._appended.notify_all()
+                return first
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def wait_for(self, seq: int, timeout: float) -> bool:
+        """Block until the entry with sequence number ``seq`` exists or ``timeout`` passes."""
+        with self._appended:
+            return self._appended.wait_for(lambda: self.offset + len(self._order) > seq, timeout)
+
+    def read_from(self, seq: int, limit: int) -> tuple:
+        """Encoded entries starting at sequence number ``seq``; returns ``(blobs, next_seq)``."""
+        with self._lock:
+            self._refresh()
+            if seq < self.offset:
+                raise ValueError(f"Entries before {self.offset} are no longer in the store")
+            start = seq - self.offset
+            stop = min(len(self._order), start + limit)
+            return self.blobs(range(start, stop)), self.offset + stop
+
+    def archive_older_than(self, cutoff: float, archive) -> int:
+        """
+        Move every shard's leading entries older than ``cutoff`` into ``archive``.
+
+        Entries are collected from all shards and archived in global order
+        before they are dropped from the shards.
+
+        Returns:
+            Number of entries moved
+        """
+        with self._lock:
+            self._refresh()
+            moved = []
+            for index, shard in enumerate(self.shards):
+                for local, entry in enumerate(shard.entries()):
+                    if parse_timestamp(entry['timestamp']) >= cutoff:
+                        break
+                    moved.append((self._positions[index][local], entry))
+            if not moved:
+                return 0
+
+            moved.sort(key=lambda item: item[0])
+            archive.append([entry for _, entry in moved])
+            for shard in self.shards:
+                shard.archive_older_than(cutoff, _Discard())
+            self.offset += len(moved)
+            self._refresh()
+            return len(moved)
+
+    def disk_bytes(self) -> int:
+        """Bytes all shards take on disk."""
+        return sum(shard.disk_bytes() for shard in self.shards)
+
+    def expired(self, cutoff: Optional[float] = None, keep: Optional[int] = None) -> int:
+        """Number of leading entries in global order outside the retention limits (see ``PulseStore.expired``)."""
+        with self._lock:
+            self._refresh()
+            count = max(0, len(self._order) - keep) if keep is not None else 0
+            if cutoff is not None:
+                shard_entries = [shard.entries() for shard in self.shards]
+                aged = 0
+                for index, local in self._order:
+                    if parse_timestamp(shard_entries[index][local]['timestamp']) >= cutoff:
+                        break
+                    aged += 1
+                count = max(count, aged)
+            return count
+
+    def prepare_trim(self, count: int) -> Dict[str, Any]:
+        """
+        Plan the removal of the oldest ``count`` entries in global order.
+
+        They form a prefix of every shard, so each shard plans its own trim.
+        """
+        with self._all_shards_locked():
+            with self._lock:
+                self._refresh()
+                counts = [0] * len(self.shards)
+                removed = 0
+                for index, local in self._order[:count]:
+                    if local != counts[index]:
+                        # Unrecorded entries merged by timestamp: stop where it is no longer a prefix
+                        break
+                    counts[index] += 1
+                    removed += 1
+                count = removed
+                entries = self.entries_at(range(count))
+            plans = [shard.prepare_trim(shard_count) if shard_count else None
+                     for shard, shard_count in zip(self.shards, counts)]
+            with self._lock:
+                # Sealing changed the shard versions but not their entries
+                self._versions = [shard.version for shard in self.shards]
+        return {"count": count, "entries": entries, "counts": counts, "shards": plans,
+                "actions": [action for plan in plans if plan for action in plan["actions"]]}
+
+    def write_trim(self, plan: Dict[str, Any]) -> None:
+        for shard, shard_plan in zip(self.shards, plan["shards"]):
+            if shard_plan:
+                shard.write_trim(shard_plan)
+
+    def commit_trim(self, plan: Dict[str, Any]) -> None:
+        """Commit every shard's trim and shift the global order past the removed entries."""
+        count = plan["count"]
+        counts = plan["counts"]
+        # Readers must not see trimmed shards before the order is shifted
+        with self._all_shards_locked(), self._lock:
+            for shard, shard_plan in zip(self.shards, plan["shards"]):
+                if shard_plan:
+                    shard.commit_trim(shard_plan)
+            self._order = [(index, local - counts[index]) for index, local in self._order[count:]]
+            self._positions = [[position - count for position in positions[shard_count:]]
+                               for positions, shard_count in zip(self._positions, counts)]
+            self._versions = [shard.version for shard in self.shards]
+            self.offset += count
+            self._write_order(array("H", [index for index, _ in self._order]))
+
+    def finish_trim(self, actions: List[Dict[str, Any]]) -> None:
+        """Redo the file changes of an interrupted trim (see ``PulseStore.finish_trim``)."""
+        for shard in self.shards:
+            shard.finish_trim(actions)
+        self._versions = None
+
+    @contextlib.contextmanager
+    def _all_shards_locked(self):
+        """Hold every shard lock, so no append is between writing a shard and registering its positions."""
+        for lock in self._shard_locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._shard_locks):
+                lock.release()
+
+    def select(self, user: Optional[str] = None, role: Optional[str] = None,
+               limit: Optional[int] = None, positions: Optional[List[int]] = None) -> List[int]:
+        """
+        Find entries matching the given filters.
+
+        A ``user`` filter reads only that user's shard; otherwise the shards
+        are filtered in parallel and the results merged. Given candidate
+        ``positions`` (ascending, e.g. search hits), only those are checked.
+
+        Returns:
+            Global positions of the matching entries, oldest first
+        """
+        with self._lock:
+            self._refresh()
+            if positions is not None:
+                positions = [i for i in positions if 0 <= i < len(self._order)]
+                if user or role:
+                    entries = self.entries_at(positions)
+                    positions = [i for i, entry in zip(positions, entries)
+                                 if (not user or entry.get('user') == user) and (not role or entry.get('role') == role)]
+            elif user:
+                index = self.shard_for(user)
+                shard_positions = self._positions[index]
+                positions = sorted(shard_positions[local] for local in self.shards[index].select(user=user, role=role))
+            elif role:
+                matches = self._map(lambda shard: shard.select(role=role), self.shards)
+                positions = sorted(shard_positions[local]
+                                   for shard_positions, local_matches in zip(self._positions, matches)
+                                   for local in local_matches)
+            else:
+                positions = range(len(self._order))
+
+            if limit and limit > 0:
+                positions = positions[-limit:]
+            return list(positions)
+
+    def _gather(self, positions: List[int], fetch) -> list:
+        """Fetch items for global ``positions`` with one ``fetch(shard, locals)`` call per shard."""
+        with self._lock:
+            wanted = [self._order[position] for position in positions]
+            by_shard: Dict[int, List[int]] = {}
+            for index, local in wanted:
+                by_shard.setdefault(index, []).append(local)
+            fetched = {index: iter(fetch(self.shards[index], locals_)) for index, locals_ in by_shard.items()}
+            return [next(fetched[index]) for index, _ in wanted]
+
+    def blobs(self, positions: List[int]) -> List[bytes]:
+        """Cached encoded bytes of the entries at ``positions``."""
+        return self._gather(positions, lambda shard, locals_: shard.blobs(locals_))
+
+    def encode(self, positions: List[int]) -> bytes:
+        """Encode the entries at ``positions`` as a JSON array from cached bytes."""
+        return b"[" + b",".join(self.blobs(positions)) + b"]"
+
+    def encode_selection(self, user: Optional[str] = None, role: Optional[str] = None,
+                         limit: Optional[int] = None, seqs: Optional[List[int]] = None) -> tuple:
+        """
+        Select and encode matching entries under one lock, so a trim cannot shift positions in between.
+
+        Args:
+            seqs: Only consider these sequence numbers (ascending), e.g. search hits;
+                those below ``offset`` were archived and are skipped
+
+        Returns:
+            ``(json_array, matched, total)``: the encoded entries, their number and the store length
+        """
+        with self._lock:
+            positions = None if seqs is None else [seq - self.offset for seq in seqs if seq >= self.offset]
+            positions = self.select(user=user, role=role, limit=limit, positions=positions)
+            return self.encode(positions), len(positions), len(self)
+
+    def tail(self, count: int) -> List[Dict[str, Any]]:
+        """The last ``count`` entries. The dicts must not be modified."""
+        with self._lock:
+            self._refresh()
+            return self.entries_at(range(max(0, len(self._order) - count), len(self._order)))
+
+    def entries_at(self, positions: List[int]) -> List[Dict[str, Any]]:
+        """Entries at ``positions``. The dicts must not be modified."""
+        return self._gather(positions, lambda shard, locals_: shard.entries_at(locals_))
+
+    def sentiment_total(self) -> tuple:
+        """Return ``(count, sum)`` of all sentiments, merged from the shards."""
+        totals = self._map(lambda shard: shard.sentiment_total(), self.shards)
+        return sum(count for count, _ in totals), sum(total for _, total in totals)
+
+    def bucket_totals(self, bucket_seconds: float, since: Optional[float] = None,
+                      until: Optional[float] = None) -> Dict[int, List[float]]:
+        """Per-bucket ``[count, sum]`` computed per shard in parallel and merged."""
+        return merge_bucket_totals(self._map(lambda shard: shard.bucket_totals(bucket_seconds, since, until),
+                                             self.shards))
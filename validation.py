@@ -0,0 +1,41 @@
+"""
+Validation of submitted pulses, shared by ``POST /pulse`` and the bulk importer.
+"""
+
+from typing import Any, Dict
+
+
+class PulseValidationError(ValueError):
+    """A pulse that must be rejected; the message is safe to return to clients."""
+
+
+def validate_pulse(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check a submitted pulse and fill in defaults.
+
+    Args:
+        data: Pulse fields as submitted (``event``, ``sentiment``, ``role``, ``user``)
+
+    Returns:
+        Dictionary with ``event``, ``sentiment`` (float in [-1, 1]), ``role`` and ``user``
+
+    Raises:
+        PulseValidationError: If the sentiment is missing, not a number or out of range
+    """
+    sentiment = data.get("sentiment")
+    if sentiment is None:
+        raise PulseValidationError("Sentiment value required")
+
+    try:
+        sentiment = float(sentiment)
+    except (ValueError, TypeError):
+        raise PulseValidationError("Invalid sentiment value")
+    if not -1 <= sentiment <= 1:
+        raise PulseValidationError("Sentiment must be between -1 and 1")
+
+    return {
+        "event": data.get("event", "Unnamed Pulse"),
+        "sentiment": sentiment,
+        "role": data.get("role", "visitor"),
+        "user": data.get("user", "anonymous")
+    }